@@ -1,14 +1,6 @@
 import streamlit as st
-import pandas as pd
-from PIL import Image
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import r2_score
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
-import io
-import plotly.graph_objects as go
-from datetime import datetime
+import metricas
+from activos import logo_uta
 
 st.set_page_config(page_title="Plataforma de Indicadores Intangibles y Rentabilidad", layout="wide")
 if "pagina" not in st.session_state:
@@ -50,13 +42,14 @@ def aplicar_animaciones_css():
     </style>
     """, unsafe_allow_html=True)
 
+@metricas.medido("pagina.inicio")
 def mostrar_inicio():   
     col1, col2 = st.columns([1, 2])
     with col1:
-        try:
-            img = Image.open("UTA.png")
+        img = logo_uta()
+        if img is not None:
             st.image(img, width=250)
-        except:
+        else:
             st.warning("Logo UTA no encontrado.")
     with col2:
         st.markdown("""
@@ -99,330 +92,8 @@ def mostrar_inicio():
     """, unsafe_allow_html=True)
     st.info("“El conocimiento se ha convertido en el activo más valioso de la economía actual.” — Stewart, 1997")
 
-# ==============================================
-# === FUNCIÓN INDICADORES (CON BOTÓN REINICIAR) ===
-# ==============================================
-def mostrar_indicadores():
-    st.title("Indicadores calculados")
-    
-    # === CSS LOCAL ===
-    st.markdown("""
-    <style>
-        div[data-testid="stNumberInput"] input {
-            font-size: 20px !important;
-            padding: 10px !important;
-            border: 2px solid #1D4ED8 !important;
-            border-radius: 8px !important;
-            background-color: #ffffff !important;
-            color: #111827 !important;
-            width: 100% !important;
-        }
-        div[data-testid="stNumberInput"] label {
-            font-size: 20px !important;
-            color: #111827 !important;
-            font-weight: bold !important;
-            text-align: center !important;
-        }
-        div[data-testid="column"] .stMarkdown.readonly {
-            font-size: 20px !important;
-            padding: 10px !important;
-            border: 2px solid #E5E7EB !important;
-            border-radius: 8px !important;
-            background-color: #F8FAFC !important;
-            color: #111827 !important;
-            margin-bottom: 10px !important;
-            text-align: center !important;
-        }
-        div.stButton > button {
-            font-size: 20px !important;
-            padding: 10px !important;
-            border: 2px solid #1E3A8A !important;
-            border-radius: 8px !important;
-            background-color: #1D4ED8 !important;
-            color: #ffffff !important;
-            width: 100% !important;
-            transition: all 0.3s ease !important;
-        }
-        div.stButton > button:hover {
-            background-color: #1E40AF !important;
-            color: #ffffff !important;
-            border-color: #1E40AF !important;
-            transform: translateY(-2px) !important;
-            box-shadow: 0 4px 8px rgba(17,24,39,0.15) !important;
-        }
-        div.stButton > button:active {
-            transform: translateY(0) !important;
-            box-shadow: 0 2px 4px rgba(17,24,39,0.12) !important;
-        }
-        div[data-testid="stSelectbox"] select {
-            font-size: 20px !important;
-            padding: 10px !important;
-            border: 2px solid #1D4ED8 !important;
-            border-radius: 8px !important;
-            background-color: #ffffff !important;
-            color: #111827 !important;
-            width: 100% !important;
-        }
-    </style>
-    """, unsafe_allow_html=True)
-        
-    # === INICIALIZAR VARIABLES ===
-    keys = ["va", "hce", "sce", "vaic", "roa", "roe", "it", "cv", "hc", "ce", "sector_indicadores"]
-    defaults = {
-        "va": 0.0, "hce": 0.0, "sce": 0.0, "vaic": 0.0, "roa": 0.0, "roe": 0.0,
-        "it": 0.0, "cv": 0.0, "hc": 0.0, "ce": 0.0, "sector_indicadores": "Inmobiliario"
-    }
-    for k in keys:
-        if k not in st.session_state:
-            st.session_state[k] = defaults[k]
-
-    # === BOTONES: REINICIAR + CALCULAR ===
-    col_btn1, col_btn2 = st.columns([1, 1])
-    with col_btn1:
-        if st.button("Reiniciar Todo", key="btn_reset"):
-            for k in keys:
-                st.session_state[k] = defaults[k]
-            st.success("¡Campos reiniciados! Listo para nuevo cálculo.")
-            # st.rerun()  # Elimina esta línea
-
-    with col_btn2:
-        calcular = st.button("Calcular Indicadores", key="btn_calcular")
-
-    # === SELECTOR DE SECTOR ===
-    opciones = ["Inmobiliario", "Primario", "Comercial"]
-    st.session_state.sector_indicadores = st.selectbox("Selecciona un sector:", opciones, index=opciones.index(st.session_state.sector_indicadores))
-
-    # === ENTRADAS ===
-    col1, col2, col3 = st.columns([2, 3, 3])
-    with col2:
-        # Usar keys diferentes para los inputs o eliminar las keys
-        it_input = st.number_input("Ingresos Totales (IT)", min_value=0.0, value=st.session_state.it, step=0.01, format="%.2f")
-        st.session_state.it = it_input
-        
-        cv_input = st.number_input("Costos de Ventas (CV)", min_value=0.0, value=st.session_state.cv, step=0.01, format="%.2f")
-        st.session_state.cv = cv_input
-
-    with col3:
-        hc_input = st.number_input("Sueldos y Salarios (HC)", min_value=0.0, value=st.session_state.hc, step=0.01, format="%.2f")
-        st.session_state.hc = hc_input
-        
-        ce_input = st.number_input("Activo Total (CE)", min_value=0.0, value=st.session_state.ce, step=0.01, format="%.2f")
-        st.session_state.ce = ce_input    
-    
-            
-    # === CÁLCULO ===
-    if calcular:
-        it = st.session_state.it
-        cv = st.session_state.cv
-        hc = st.session_state.hc
-        ce = st.session_state.ce
-
-        va_calculado = max(it - cv, 0.0)
-        hce_calculado = va_calculado / hc if hc != 0 else 0.0
-        sc = max(va_calculado - hc, 0.0)
-        sce_calculado = sc / va_calculado if va_calculado != 0 else 0.0
-        ice_calculado = hce_calculado + sce_calculado
-        cee_calculado = va_calculado / ce if ce != 0 else 0.0
-        vaic_calculado = ice_calculado + cee_calculado
-
-        sector = st.session_state.sector_indicadores
-        if sector == "Comercial":
-            roa = 0.017000167 + 0.000090463 * ice_calculado + 0.065590993 * cee_calculado
-            roe = -0.15508027 + 0.00774242 * ice_calculado + 0.930391243 * cee_calculado
-        elif sector == "Primaria":
-            roa = 0.027048998 - 0.004791466 * ice_calculado + 0.083361825 * cee_calculado
-            roe = 0.084135634 - 0.008724684 * ice_calculado + 0.151617468 * cee_calculado
-        else:
-            roa = -0.001171129 + 0.005704393 * ice_calculado + 0.028213145 * cee_calculado
-            roe = 0.010838631 + 0.009842492 * ice_calculado + 0.069439342 * cee_calculado
-
-        st.session_state.update({
-            "va": va_calculado, "hce": hce_calculado, "sce": sce_calculado,
-            "vaic": vaic_calculado, "roa": roa, "roe": roe
-        })
-        st.success("¡Cálculo realizado!")
-
-    # === RESULTADOS ===
-    with col1:
-        st.markdown('<span style="font-weight:bold; font-size:22px; color:#111827;">ROA:</span>', unsafe_allow_html=True)
-        st.markdown(f'<div class="readonly" style="font-weight:bold; font-size:22px;margin-left: 1cm;"> {st.session_state.roa:.4f}</div>', unsafe_allow_html=True)
-        st.markdown('<span style="font-weight:bold; font-size:22px; color:#111827;">ROE:</span>', unsafe_allow_html=True)
-        st.markdown(f'<div class="readonly" style="font-weight:bold; font-size:22px;margin-left: 1cm;"> {st.session_state.roe:.4f}</div>', unsafe_allow_html=True)
-
-    st.markdown("---")
-    col_a, col_b = st.columns(2)
-    with col_a:
-        st.markdown(f'<div class="readonly">Valor Añadido (VA): {st.session_state.va:,.2f}</div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="readonly">VAIC™: {st.session_state.vaic:.4f}</div>', unsafe_allow_html=True)
-    with col_b:
-        st.markdown(f'<div class="readonly">HCE: {st.session_state.hce:.4f}</div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="readonly">SCE: {st.session_state.sce:.4f}</div>', unsafe_allow_html=True)
-    st.markdown("---")
-
-    # === GRÁFICAS ===
-    st.markdown("### Visualización de Resultados")
-    cee_actual = st.session_state.va / st.session_state.ce if st.session_state.ce != 0 else 0.0
-
-    fig_radar = go.Figure()
-    fig_radar.add_trace(go.Scatterpolar(
-        r=[cee_actual, st.session_state.hce, st.session_state.sce, st.session_state.vaic],
-        theta=['CEE', 'HCE', 'SCE', 'VAIC™'],
-        fill='toself',
-        line_color='#1D4ED8',
-        fillcolor='rgba(29, 78, 216, 0.25)'
-    ))
-    fig_radar.update_layout(
-        polar=dict(radialaxis=dict(visible=True, range=[0, max(cee_actual, st.session_state.hce, st.session_state.sce, st.session_state.vaic, 1) + 0.5])),
-        showlegend=False, title="Perfil VAIC™", height=480
-    )
-
-    fig_bar = go.Figure()
-    fig_bar.add_trace(go.Bar(
-        y=['ROA', 'ROE'], x=[st.session_state.roa, st.session_state.roe],
-        orientation='h', marker_color=['#1D4ED8', '#DC2626'],
-        text=[f"{st.session_state.roa:.4f}", f"{st.session_state.roe:.4f}"], textposition='outside'
-    ))
-    fig_bar.update_layout(title="ROA y ROE", height=350, showlegend=False)
-
-    col_g1, col_g2 = st.columns(2)
-    with col_g1: st.plotly_chart(fig_radar, use_container_width=True)
-    with col_g2: st.plotly_chart(fig_bar, use_container_width=True)
-
-    # === TABLA ===
-    st.markdown("### Resumen")
-    resumen_df = pd.DataFrame({
-        "Indicador": ["VA", "HCE", "SCE", "CEE", "VAIC™", "ROA", "ROE"],
-        "Valor": [
-            f"{st.session_state.va:,.2f}", f"{st.session_state.hce:.4f}",
-            f"{st.session_state.sce:.4f}", f"{cee_actual:.4f}",
-            f"{st.session_state.vaic:.4f}", f"{st.session_state.roa:.4f}",
-            f"{st.session_state.roe:.4f}"
-        ]
-    })
-    st.dataframe(resumen_df, use_container_width=True, hide_index=True)
-
-# === LAS DEMÁS FUNCIONES QUEDAN IGUALES ===
-def mostrar_exportacion():
-    st.title("Exportar resultados en PDF")
-    st.markdown("""
-    <style>
-        div.stButton > button {
-            font-size: 20px !important; padding: 12px !important; background-color: #1D4ED8 !important;
-            color: white !important; border: 2px solid #1E3A8A !important; border-radius: 10px !important;
-            font-weight: bold !important;
-        }
-        div.stButton > button:hover {
-            background-color: #1E40AF !important; transform: translateY(-3px) !important;
-            box-shadow: 0 8px 20px rgba(29, 78, 216, 0.3) !important;
-        }
-    </style>
-    """, unsafe_allow_html=True)
-
-    if st.session_state.va == 0.0:
-        st.warning("Por favor, calcula los indicadores primero en la página de Indicadores.")
-        return
-
-    st.markdown("### Resultados Calculados")
-    col1, col2 = st.columns(2)
-    with col1:
-        st.markdown(f"**VA:** {st.session_state.va:,.2f}")
-        st.markdown(f"**HCE:** {st.session_state.hce:.4f}")
-        st.markdown(f"**SCE:** {st.session_state.sce:.4f}")
-    with col2:
-        st.markdown(f"**VAIC™:** {st.session_state.vaic:.4f}")
-        st.markdown(f"**ROA:** {st.session_state.roa:.4f}")
-        st.markdown(f"**ROE:** {st.session_state.roe:.4f}")
-
-    if st.button("Generar PDF", use_container_width=True):
-        buffer = io.BytesIO()
-        c = canvas.Canvas(buffer, pagesize=letter)
-        width, height = letter
-        c.setFillColorRGB(120/255, 31/255, 25/255)
-        c.rect(0, height - 100, width, 100, fill=1)
-        try:
-            c.drawImage("UTA.png", 50, height - 110, width=80, preserveAspectRatio=True)
-        except: pass
-        c.setFillColorRGB(1, 1, 1)
-        c.setFont("Helvetica-Bold", 20)
-        c.drawCentredString(width / 2, height - 60, " INDICADORES INTANGIBLES")
-        c.setFont("Helvetica", 14)
-        c.drawCentredString(width / 2, height - 85, "Universidad Técnica de Ambato | Ecuador")
-        c.setStrokeColorRGB(0.9, 0.9, 0.9)
-        c.setLineWidth(3)
-        c.line(50, height - 105, width - 50, height - 105)
-        y = height - 140
-        c.setFillColorRGB(0, 0, 0)
-        c.setFont("Helvetica-Bold", 16)
-        c.drawString(70, y, "Resultados del Análisis VAIC™ y Rentabilidad")
-        y -= 30
-        c.setFont("Helvetica", 12)
-        c.drawString(70, y, f"Sector seleccionado: {st.session_state.sector_indicadores}")
-        y -= 25
-        c.drawString(70, y, f"Fecha de generación: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
-        y -= 40
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(70, y, "Indicadores Calculados:")
-        y -= 20
-        datos = [
-            ["Valor Añadido (VA)", f"${st.session_state.va:,.2f}"],
-            ["Eficiencia Capital Humano (HCE)", f"{st.session_state.hce:.4f}"],
-            ["Eficiencia Capital Estructural (SCE)", f"{st.session_state.sce:.4f}"],
-            ["Eficiencia Capital Empleado (CEE)", f"{(st.session_state.va / st.session_state.ce if st.session_state.ce != 0 else 0):.4f}"],
-            ["VAIC™", f"{st.session_state.vaic:.4f}"],
-            ["ROA", f"{st.session_state.roa:.4f}"],
-            ["ROE", f"{st.session_state.roe:.4f}"]
-        ]
-        c.setFont("Helvetica", 11)
-        for label, valor in datos:
-            c.drawString(90, y, f"• {label}:")
-            c.setFont("Helvetica-Bold", 11)
-            c.drawString(300, y, valor)
-            c.setFont("Helvetica", 11)
-            y -= 20
-        y -= 30
-        try:
-            cee_actual = st.session_state.va / st.session_state.ce if st.session_state.ce != 0 else 0.0
-            fig_radar = go.Figure()
-            fig_radar.add_trace(go.Scatterpolar(
-                r=[cee_actual, st.session_state.hce, st.session_state.sce, st.session_state.vaic],
-                theta=['CEE', 'HCE', 'SCE', 'VAIC™'],
-                fill='toself', line_color="#D8491D", fillcolor='rgba(29, 78, 216, 0.25)'
-            ))
-            fig_radar.update_layout(polar=dict(radialaxis=dict(visible=True)), showlegend=False, height=400, width=550)
-            radar_img = io.BytesIO()
-            fig_radar.write_image(radar_img, format="png")
-            radar_img.seek(0)
-            c.drawImage(radar_img, 40, y - 320, width=500, height=300)
-            fig_bar = go.Figure()
-            fig_bar.add_trace(go.Bar(
-                y=['ROA', 'ROE'], x=[st.session_state.roa, st.session_state.roe],
-                orientation='h', marker_color=['#1D4ED8', '#DC2626'],
-                text=[f"{st.session_state.roa:.4f}", f"{st.session_state.roe:.4f}"], textposition='outside'
-            ))
-            fig_bar.update_layout(title="ROA y ROE Calculados", height=300, width=500, margin=dict(l=50, r=50, t=50, b=50))
-            bar_img = io.BytesIO()
-            fig_bar.write_image(bar_img, format="png")
-            bar_img.seek(0)
-            c.drawImage(bar_img, 40, y - 650, width=500, height=250)
-        except Exception as e:
-            c.setFont("Helvetica", 10)
-            c.drawString(70, y - 400, f"Advertencia: No se pudieron generar las gráficas: {str(e)}")
-        c.setFillColorRGB(120/255, 31/255, 25/255)
-        c.rect(0, 0, width, 70, fill=1)
-        c.setFillColorRGB(1, 1, 1)
-        c.setFont("Helvetica-Bold", 12)
-        c.drawCentredString(width / 2, 35, "Proyecto de Investigación - Universidad Técnica de Ambato")
-        c.save()
-        buffer.seek(0)
-        st.success("¡PDF generado con éxito!")
-        st.download_button(
-            label="Descargar Reporte Completo (PDF)",
-            data=buffer,
-            file_name=f"Reporte_VAIC_{st.session_state.sector_indicadores}_{datetime.now().strftime('%Y%m%d')}.pdf",
-            mime="application/pdf",
-            use_container_width=True
-        )
 
+@metricas.medido("pagina.ayuda")
 def mostrar_ayuda():
    
     # ------------------------------
@@ -448,7 +119,9 @@ def mostrar_ayuda():
     # Sidebar Navigation
     # ------------------------------
     with st.sidebar:
-        st.image("UTA.png", caption="Material de apoyo", use_column_width=True)
+        logo = logo_uta()
+        if logo is not None:
+            st.image(logo, caption="Material de apoyo", use_column_width=True)
         st.markdown("### Navegación")
         section = st.radio(
             "Ir a:",
@@ -566,12 +239,27 @@ def mostrar_ayuda():
         )
     st.markdown('---')
 
+
 # === MAIN ===
 def main():
-    aplicar_animaciones_css()
+    # Cada rerun completo queda en el tramo "rerun.<página>"; con cProfile si el operador lo pidió
+    perfilar = st.session_state.pop("perfilar_rerun", False)
+    with metricas.Tramo("rerun") as tramo, metricas.Perfil(activo=perfilar) as perfil:
+        try:
+            mostrar_pagina()
+        finally:
+            tramo.nombre = f"rerun.{st.session_state.pagina}"
+    if perfil.texto:
+        st.session_state.perfil_rerun = perfil.texto
+    if "operador" in st.query_params:
+        mostrar_estado_cache()
+
+def mostrar_pagina():
+    with metricas.Tramo("css"):
+        aplicar_animaciones_css()
     st.markdown("""
     <style>
-        div.stButton > button {
+        div.stButton > button, div.stFormSubmitButton > button {
             font-size: 18px !important;
             height: 60px !important;
             padding: 10px !important;
@@ -581,7 +269,7 @@ def main():
             background-color: #1D4ED8 !important;
             color: #ffffff !important;
         }
-        div.stButton > button:hover {
+        div.stButton > button:hover, div.stFormSubmitButton > button:hover {
             background-color: #1E40AF !important;
             transform: translateY(-2px) !important;
             box-shadow: 0 4px 12px rgba(29,78,216,0.3) !important;
@@ -603,16 +291,56 @@ def main():
         if st.button("Ayuda", use_container_width=True, key="btn_ayuda"):
             cambiar_pagina("ayuda")
     st.markdown("---")
+    # Las páginas pesadas (pandas, Plotly, ReportLab) se importan la primera vez que se abren
     if st.session_state.pagina == "inicio":
         mostrar_inicio()
     elif st.session_state.pagina == "indicadores":
+        from pagina_indicadores import mostrar_indicadores
         mostrar_indicadores()
     elif st.session_state.pagina == "exportar":
+        from pagina_exportar import mostrar_exportacion
         mostrar_exportacion()
     elif st.session_state.pagina == "ayuda":
         mostrar_ayuda()
     st.markdown("<style>.stApp { background-color: #F8FAFC; }</style>", unsafe_allow_html=True)
 
+def mostrar_estado_cache():
+    # Visible solo con ?operador en la URL
+    import pandas as pd
+    import cache_lru
+    from sesion import gestor_trabajos
+
+    with st.sidebar.expander("Estado de caché (operador)", expanded=True):
+        st.dataframe(pd.DataFrame(cache_lru.estadisticas()), use_container_width=True, hide_index=True)
+        if st.button("Vaciar cachés", key="btn_vaciar_cache"):
+            for cache in (cache_lru.ACTIVOS, cache_lru.FIGURAS, cache_lru.TABLAS):
+                cache.limpiar()
+        trabajos = gestor_trabajos().listar()
+        if trabajos:
+            st.markdown("**Trabajos en segundo plano**")
+            st.dataframe(pd.DataFrame(trabajos)[["id", "estado", "progreso", "duracion"]], use_container_width=True, hide_index=True)
+
+    with st.sidebar.expander("Latencias por tramo (operador)", expanded=True):
+        # Histogramas del proceso: suman los reruns de todas las sesiones desde el último reinicio
+        filas = metricas.resumen()
+        if filas:
+            st.dataframe(pd.DataFrame(filas), use_container_width=True, hide_index=True)
+            st.download_button("Descargar métricas", metricas.texto(), file_name="metricas.txt", key="btn_descargar_metricas")
+        else:
+            st.caption("Aún no hay tramos registrados.")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Reiniciar", key="btn_limpiar_metricas"):
+                metricas.limpiar()
+                st.rerun()
+        with col2:
+            if st.button("Perfilar rerun", key="btn_perfilar"):
+                st.session_state.perfilar_rerun = True
+                st.rerun()
+        if st.session_state.get("perfil_rerun"):
+            st.caption("cProfile del último rerun perfilado (tiempo acumulado)")
+            st.code(st.session_state.perfil_rerun, language=None)
+
 if __name__ == '__main__':
     main()
 
@@ -621,3 +349,4 @@ if __name__ == '__main__':
 
 
 
+
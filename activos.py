@@ -0,0 +1,19 @@
+"""Activos visuales compartidos (logo), sin dependencias pesadas: Inicio y Ayuda solo necesitan esto."""
+import os
+
+from cache_lru import ACTIVOS
+
+RUTA_LOGO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "UTA.png")
+
+
+def logo_uta():
+    """Logo decodificado una sola vez por proceso (None si no existe)."""
+    def cargar():
+        from PIL import Image
+        try:
+            with Image.open(RUTA_LOGO) as img:
+                img.load()
+                return img.copy()
+        except OSError:
+            return None
+    return ACTIVOS.obtener(("imagen", RUTA_LOGO), cargar)
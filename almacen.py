@@ -0,0 +1,146 @@
+"""Almacén persistente (SQLite) de empresas puntuadas, indexado por empresa, año y sector.
+
+Cada fila guarda una huella de sus entradas (IT, CV, HC, CE, sector) y de los
+coeficientes usados; al volver a guardar un lote solo se puntúan las filas nuevas
+o cuyas entradas cambiaron.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from nucleo import COEFICIENTES_SECTOR, INDICADORES_LOTE, normalizar_sector, puntuar_lote
+
+RUTA_ALMACEN = os.environ.get(
+    "UTA_ALMACEN", os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos", "resultados_vaic.sqlite")
+)
+COLUMNAS_ALMACEN = ["empresa", "anio", "sector", "IT", "CV", "HC", "CE"] + INDICADORES_LOTE + ["huella", "actualizado"]
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    empresa TEXT NOT NULL,
+    anio INTEGER NOT NULL,
+    sector TEXT NOT NULL,
+    IT REAL, CV REAL, HC REAL, CE REAL,
+    VA REAL, HCE REAL, SCE REAL, CEE REAL, VAIC REAL, ROA REAL, ROE REAL,
+    huella INTEGER NOT NULL,
+    actualizado TEXT NOT NULL,
+    PRIMARY KEY (empresa, anio)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_resultados_sector_anio ON resultados (sector, anio);
+CREATE INDEX IF NOT EXISTS idx_resultados_anio ON resultados (anio);
+"""
+
+
+def huella_coeficientes(coeficientes=None):
+    coeficientes = COEFICIENTES_SECTOR if coeficientes is None else coeficientes
+    return int(hashlib.sha256(json.dumps(coeficientes, sort_keys=True).encode()).hexdigest()[:15], 16)
+
+
+def huellas_entradas(df, coeficientes=None):
+    """Huella entera por fila de IT, CV, HC, CE, sector y coeficientes (vectorizada)."""
+    entradas = df[["IT", "CV", "HC", "CE"]].astype(float).assign(
+        sector=normalizar_sector(df["sector"]), coeficientes=huella_coeficientes(coeficientes)
+    )
+    # uint64 -> int64: SQLite solo guarda enteros con signo
+    return pd.Series(pd.util.hash_pandas_object(entradas, index=False).to_numpy().view(np.int64), index=df.index)
+
+
+class AlmacenResultados:
+    """Conexión única por proceso, protegida con un candado (sesiones de Streamlit en hilos)."""
+
+    def __init__(self, ruta=RUTA_ALMACEN):
+        if ruta != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        self.ruta = ruta
+        self._candado = threading.Lock()
+        # Escrituras de este proceso: "actualizado" va al segundo y no distingue dos guardados seguidos
+        self._escrituras = 0
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.executescript(ESQUEMA)
+
+    def cerrar(self):
+        with self._candado:
+            self._conexion.close()
+
+    def guardar_lote(self, df, coeficientes=None):
+        """Inserta o actualiza filas con empresa y anio en una sola transacción.
+
+        Devuelve (filas_puntuadas, filas_sin_cambios).
+        """
+        faltantes = [c for c in ["empresa", "anio"] if c not in df.columns]
+        if faltantes:
+            raise ValueError(f"Faltan columnas para guardar en el histórico: {', '.join(faltantes)}")
+        df = df.assign(empresa=df["empresa"].astype(str), anio=df["anio"].astype(int))
+        df = df.drop_duplicates(["empresa", "anio"], keep="last")
+        huellas = huellas_entradas(df, coeficientes)
+
+        with self._candado:
+            conexion = self._conexion
+            # Huellas guardadas de las mismas claves, vía tabla temporal (un solo join)
+            conexion.execute("CREATE TEMP TABLE IF NOT EXISTS claves (empresa TEXT, anio INTEGER, PRIMARY KEY (empresa, anio))")
+            conexion.execute("DELETE FROM claves")
+            conexion.executemany("INSERT INTO claves VALUES (?, ?)", zip(df["empresa"], df["anio"].tolist()))
+            guardadas = pd.read_sql_query(
+                "SELECT r.empresa, r.anio, r.huella FROM resultados r JOIN claves c USING (empresa, anio)", conexion
+            )
+            previas = df[["empresa", "anio"]].merge(guardadas, on=["empresa", "anio"], how="left")["huella"].to_numpy()
+            cambiadas = previas != huellas.to_numpy()
+            pendientes = df[cambiadas]
+            if len(pendientes):
+                puntuadas = puntuar_lote(pendientes, coeficientes)
+                puntuadas = puntuadas.assign(huella=huellas[cambiadas], actualizado=datetime.now().isoformat(timespec="seconds"))
+                valores = puntuadas[COLUMNAS_ALMACEN].astype(object).where(puntuadas[COLUMNAS_ALMACEN].notna(), None)
+                columnas = ", ".join(COLUMNAS_ALMACEN)
+                actualizar = ", ".join(f"{c} = excluded.{c}" for c in COLUMNAS_ALMACEN if c not in ("empresa", "anio"))
+                with conexion:
+                    conexion.executemany(
+                        f"INSERT INTO resultados ({columnas}) VALUES ({', '.join('?' * len(COLUMNAS_ALMACEN))}) "
+                        f"ON CONFLICT (empresa, anio) DO UPDATE SET {actualizar}",
+                        valores.itertuples(index=False, name=None)
+                    )
+                self._escrituras += 1
+        return int(cambiadas.sum()), int((~cambiadas).sum())
+
+    def consultar(self, empresa=None, anio=None, sector=None, desde=None, limite=10_000):
+        """Filas guardadas; ``desde`` filtra por fecha de actualización (inclusive), ``limite=-1`` no limita."""
+        condiciones, parametros = [], []
+        for columna, valor in (("empresa", empresa), ("anio", anio), ("sector", sector)):
+            if valor is not None:
+                condiciones.append(f"{columna} = ?")
+                parametros.append(valor)
+        if desde is not None:
+            condiciones.append("actualizado >= ?")
+            parametros.append(desde)
+        donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        with self._candado:
+            return pd.read_sql_query(
+                f"SELECT * FROM resultados {donde} ORDER BY empresa, anio LIMIT ?", self._conexion,
+                params=parametros + [limite]
+            )
+
+    def empresas(self):
+        with self._candado:
+            return [fila[0] for fila in self._conexion.execute("SELECT DISTINCT empresa FROM resultados ORDER BY empresa")]
+
+    def total(self):
+        with self._candado:
+            return self._conexion.execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+
+    def version(self):
+        """(filas, última actualización, escrituras): cambia cada vez que se guarda algo."""
+        with self._candado:
+            filas, actualizado = self._conexion.execute("SELECT COUNT(*), MAX(actualizado) FROM resultados").fetchone()
+            return filas, actualizado, self._escrituras
+
+    def indicadores_por_sector(self):
+        """Sector e indicadores de todas las filas, para las distribuciones de referencia."""
+        with self._candado:
+            return pd.read_sql_query(f"SELECT sector, {', '.join(INDICADORES_LOTE)} FROM resultados", self._conexion)
@@ -0,0 +1,117 @@
+"""Benchmark de arranque en frío de la app de Streamlit.
+
+Cada repetición corre en un intérprete nuevo (``python -X importtime``) que
+ejecuta UTA.py con el arnés de pruebas de Streamlit: primero la página Inicio
+y luego Indicadores, Exportar y Ayuda. Se informa el tiempo de cada página, el
+tiempo de importación (acumulado) de los módulos vigilados y qué dependencias
+pesadas cargó Inicio.
+
+Ejemplos:
+    python benchmarks/arranque.py
+    python benchmarks/arranque.py --presupuesto 0.8 --repeticiones 5 --json arranque.json
+
+Sale con código 1 si la mediana del arranque de Inicio supera ``--presupuesto``
+(segundos) o si Inicio importa alguna dependencia pesada.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTA_APP = os.path.join(RAIZ, "UTA.py")
+PRESUPUESTO = 1.0
+# Inicio y Ayuda no deben cargar nada de esto ("graficos" arrastra las figuras de Plotly)
+PESADOS = ["pandas", "graficos", "reportlab", "pyarrow", "openpyxl"]
+VIGILADOS = PESADOS + [
+    "streamlit", "numpy", "PIL", "plotly", "activos", "sesion", "nucleo", "almacen", "graficos_pdf",
+    "reporte_pdf", "pagina_indicadores", "pagina_exportar"
+]
+
+HIJO = """
+import json, sys, time
+sys.path.insert(0, {raiz!r})
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+tiempos = {{"streamlit": time.perf_counter() - inicio}}
+at = AppTest.from_file({app!r}, default_timeout=120)
+marca = time.perf_counter()
+at.run()
+tiempos["inicio"] = time.perf_counter() - marca
+cargados = [m for m in {pesados!r} if m in sys.modules]
+for pagina in ("indicadores", "exportar", "ayuda"):
+    marca = time.perf_counter()
+    at.button(key="btn_" + pagina).click().run()
+    tiempos[pagina] = time.perf_counter() - marca
+errores = [str(e.value) for e in at.exception]
+print(json.dumps({{"tiempos": tiempos, "pesados_en_inicio": cargados, "errores": errores}}))
+"""
+
+
+def _importaciones(salida_importtime):
+    """{módulo: segundos acumulados} de las líneas de ``-X importtime`` para los módulos vigilados."""
+    tiempos = {}
+    for linea in salida_importtime.splitlines():
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        _, acumulado, nombre = linea.split("|")
+        nombre = nombre.strip()
+        if nombre in VIGILADOS and acumulado.strip().isdigit():
+            tiempos[nombre] = int(acumulado) / 1e6
+    return tiempos
+
+
+def medir():
+    codigo = HIJO.format(raiz=RAIZ, app=RUTA_APP, pesados=PESADOS)
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo], capture_output=True, text=True, cwd=RAIZ
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr[-2000:])
+    resultado = json.loads(proceso.stdout.strip().splitlines()[-1])
+    resultado["importaciones"] = _importaciones(proceso.stderr)
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el arranque en frío de UTA.py y lo compara con un presupuesto.")
+    parser.add_argument("--presupuesto", type=float, default=PRESUPUESTO, help="Segundos máximos para la primera ejecución de Inicio")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Intérpretes nuevos a medir (se usa la mediana)")
+    parser.add_argument("--json", help="Archivo donde guardar el resultado")
+    args = parser.parse_args(argv)
+
+    corridas = [medir() for _ in range(args.repeticiones)]
+    paginas = corridas[0]["tiempos"].keys()
+    tiempos = {p: statistics.median(c["tiempos"][p] for c in corridas) for p in paginas}
+    modulos = sorted({m for c in corridas for m in c["importaciones"]})
+    importaciones = {m: statistics.median(c["importaciones"].get(m, 0.0) for c in corridas) for m in modulos}
+    pesados = sorted({m for c in corridas for m in c["pesados_en_inicio"]})
+    errores = sorted({e for c in corridas for e in c["errores"]})
+
+    print(f"Arranque en frío (mediana de {args.repeticiones}):")
+    for pagina, segundos in tiempos.items():
+        print(f"  {pagina:<12} {segundos * 1000:8.0f} ms")
+    print("Importación (acumulada):")
+    for modulo, segundos in sorted(importaciones.items(), key=lambda x: -x[1]):
+        print(f"  {modulo:<20} {segundos * 1000:8.1f} ms")
+
+    fallos = []
+    if tiempos["inicio"] > args.presupuesto:
+        fallos.append(f"Inicio tardó {tiempos['inicio']:.2f} s (presupuesto {args.presupuesto:.2f} s)")
+    if pesados:
+        fallos.append(f"Inicio importó dependencias pesadas: {', '.join(pesados)}")
+    fallos += [f"Excepción en la app: {e}" for e in errores]
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"presupuesto": args.presupuesto, "tiempos": tiempos, "importaciones": importaciones,
+                       "pesados_en_inicio": pesados, "fallos": fallos}, f, indent=2)
+    for fallo in fallos:
+        print(f"FALLO: {fallo}", file=sys.stderr)
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
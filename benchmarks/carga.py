@@ -0,0 +1,261 @@
+"""Prueba de carga: N sesiones simultáneas contra un servidor de Streamlit local.
+
+Cada nivel de concurrencia arranca un ``streamlit run UTA.py`` sin interfaz en
+un puerto libre y conecta N clientes por el mismo websocket que usa el
+navegador. Cada cliente recorre la app de punta a punta: Inicio → Indicadores →
+cuatro entradas → Calcular → Exportar → Generar PDF, y cada rerun se cronometra
+desde que se envía el evento hasta que el servidor anuncia el fin del script
+(como reruns completos: el cliente no usa los reruns parciales de fragmentos).
+El servidor se precalienta con una sesión que no se mide, y cada nivel usa un
+servidor nuevo para que las cachés y la memoria de uno no afecten al siguiente.
+
+Por nivel se informa el rendimiento (recorridos y reruns por segundo), p50/p99
+de la latencia de rerun y el crecimiento de memoria residente del servidor por
+sesión abierta.
+
+Requiere ``websockets`` (``pip install -r benchmarks/requirements.txt``).
+
+Ejemplos:
+    python benchmarks/carga.py
+    python benchmarks/carga.py --niveles 1 4 16 --recorridos 5 --p99 2 --json carga.json
+
+Sale con código 1 si en algún nivel el p50 o el p99 superan ``--p50``/``--p99``
+(segundos) o si alguna sesión falla.
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTA_APP = os.path.join(RAIZ, "UTA.py")
+NIVELES = [1, 2, 4, 8]
+RECORRIDOS = 3
+SLO_P50 = 1.0
+SLO_P99 = 3.0
+TIEMPO_MAXIMO = 120
+# Etiquetas de los cuatro campos del cálculo individual y el valor que escribe cada sesión
+ENTRADAS = {
+    "Ingresos Totales (IT)": 1000.0, "Costos de Ventas (CV)": 400.0,
+    "Sueldos y Salarios (HC)": 100.0, "Activo Total (CE)": 2000.0
+}
+
+
+# ==============================================
+# === SERVIDOR ===
+# ==============================================
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _memoria_residente(pid):
+    """Memoria residente de un proceso en bytes (Linux: /proc)."""
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def arrancar_servidor(puerto):
+    entorno = dict(os.environ)
+    # El histórico de la prueba no debe mezclarse con el de la app
+    entorno["UTA_ALMACEN"] = os.path.join(tempfile.mkdtemp(prefix="uta_carga_"), "resultados.sqlite")
+    servidor = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", RUTA_APP, "--server.headless", "true",
+         "--server.port", str(puerto), "--server.address", "127.0.0.1",
+         "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+        cwd=RAIZ, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    limite = time.monotonic() + TIEMPO_MAXIMO
+    while time.monotonic() < limite:
+        if servidor.poll() is not None:
+            raise RuntimeError(servidor.stderr.read().decode(errors="replace")[-2000:])
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/_stcore/health", timeout=1):
+                return servidor
+        except OSError:
+            time.sleep(0.2)
+    servidor.kill()
+    raise RuntimeError("El servidor de Streamlit no respondió")
+
+
+# ==============================================
+# === CLIENTE (protocolo del navegador) ===
+# ==============================================
+class Sesion:
+    """Un navegador simulado: envía reruns con el estado de los widgets y espera el fin del script."""
+
+    def __init__(self, url):
+        self.url = url
+        self.widgets = {}  # clave del widget (o etiqueta si no tiene clave) -> id
+        self.elementos = []
+        self.latencias = []
+        self.recorridos = 0
+
+    async def __aenter__(self):
+        import websockets
+
+        self._ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+        return self
+
+    async def __aexit__(self, *excepcion):
+        await self._ws.close()
+
+    def _registrar(self, elemento):
+        tipo = elemento.WhichOneof("type")
+        self.elementos.append((tipo, elemento))
+        widget = getattr(elemento, tipo)
+        identificador = getattr(widget, "id", "")
+        if identificador:
+            clave = identificador.rsplit("-", 1)[-1]
+            self.widgets[getattr(widget, "label", clave) if clave == "None" else clave] = identificador
+
+    async def rerun(self, disparar=None, valores=None):
+        """Rerun completo; ``disparar`` es la clave del botón pulsado y ``valores`` {etiqueta: número}."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        mensaje = BackMsg()
+        mensaje.rerun_script.query_string = ""
+        if disparar is not None:
+            estado = mensaje.rerun_script.widget_states.widgets.add()
+            estado.id, estado.trigger_value = self.widgets[disparar], True
+        for etiqueta, valor in (valores or {}).items():
+            estado = mensaje.rerun_script.widget_states.widgets.add()
+            estado.id, estado.double_value = self.widgets[etiqueta], valor
+        self.elementos = []
+        marca = time.perf_counter()
+        await self._ws.send(mensaje.SerializeToString())
+        while True:
+            respuesta = ForwardMsg()
+            respuesta.ParseFromString(await asyncio.wait_for(self._ws.recv(), TIEMPO_MAXIMO))
+            tipo = respuesta.WhichOneof("type")
+            if tipo == "delta" and respuesta.delta.HasField("new_element"):
+                self._registrar(respuesta.delta.new_element)
+            elif tipo == "script_finished":
+                break
+        self.latencias.append(time.perf_counter() - marca)
+        excepciones = [e.exception.message for t, e in self.elementos if t == "exception"]
+        if excepciones:
+            raise RuntimeError(excepciones[0])
+
+    async def recorrido(self):
+        if not self.widgets:
+            await self.rerun()
+        await self.rerun("btn_inicio")
+        await self.rerun("btn_indicadores")
+        await self.rerun("btn_calcular", ENTRADAS)
+        await self.rerun("btn_exportar")
+        await self.rerun("btn_pdf")
+        if not any(t == "download_button" for t, _ in self.elementos):
+            raise RuntimeError("No se generó el PDF")
+        self.recorridos += 1
+
+
+# ==============================================
+# === NIVELES DE CONCURRENCIA ===
+# ==============================================
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(int(p / 100 * len(ordenados)), len(ordenados) - 1)]
+
+
+async def _medir(url, pid, sesiones, recorridos):
+    async with Sesion(url) as calentamiento:
+        await calentamiento.recorrido()
+    memoria_base = _memoria_residente(pid)
+
+    clientes = [Sesion(url) for _ in range(sesiones)]
+    errores = []
+
+    async def trabajar(indice, cliente):
+        try:
+            for _ in range(recorridos):
+                await cliente.recorrido()
+        except Exception as e:
+            errores.append(f"sesión {indice}: {e}")
+
+    inicio = time.perf_counter()
+    for cliente in clientes:
+        await cliente.__aenter__()
+    try:
+        await asyncio.gather(*(trabajar(i, c) for i, c in enumerate(clientes)))
+        duracion = time.perf_counter() - inicio
+        # Con las sesiones aún abiertas: su estado sigue en la memoria del servidor
+        memoria = _memoria_residente(pid) - memoria_base
+    finally:
+        for cliente in clientes:
+            await cliente.__aexit__()
+
+    todas = [t for c in clientes for t in c.latencias]
+    completados = sum(c.recorridos for c in clientes)
+    return {
+        "sesiones": sesiones, "recorridos": completados, "duracion_s": duracion,
+        "recorridos_por_s": completados / duracion, "reruns_por_s": len(todas) / duracion,
+        "p50_s": _percentil(todas, 50) if todas else None,
+        "p99_s": _percentil(todas, 99) if todas else None,
+        "max_s": max(todas) if todas else None,
+        "memoria_por_sesion_mb": memoria / sesiones / 2**20,
+        "errores": errores,
+    }
+
+
+def medir_nivel(sesiones, recorridos):
+    puerto = _puerto_libre()
+    servidor = arrancar_servidor(puerto)
+    try:
+        return asyncio.run(_medir(f"ws://127.0.0.1:{puerto}/_stcore/stream", servidor.pid, sesiones, recorridos))
+    finally:
+        servidor.terminate()
+        servidor.wait(timeout=30)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga con sesiones simultáneas de UTA.py.")
+    parser.add_argument("--niveles", type=int, nargs="+", default=NIVELES, help="Sesiones simultáneas a probar")
+    parser.add_argument("--recorridos", type=int, default=RECORRIDOS, help="Recorridos completos por sesión")
+    parser.add_argument("--p50", type=float, default=SLO_P50, help="Objetivo de latencia p50 por rerun (s)")
+    parser.add_argument("--p99", type=float, default=SLO_P99, help="Objetivo de latencia p99 por rerun (s)")
+    parser.add_argument("--json", help="Archivo donde guardar el resultado")
+    args = parser.parse_args(argv)
+    if importlib.util.find_spec("websockets") is None:
+        parser.error("falta el paquete websockets: pip install -r benchmarks/requirements.txt")
+
+    print(f"{'sesiones':>8} {'recorr/s':>9} {'reruns/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'MB/sesión':>10}")
+    niveles, fallos = [], []
+    for sesiones in args.niveles:
+        nivel = medir_nivel(sesiones, args.recorridos)
+        niveles.append(nivel)
+        fallos += nivel["errores"]
+        if nivel["p50_s"] is None:
+            continue
+        print(f"{sesiones:>8} {nivel['recorridos_por_s']:9.2f} {nivel['reruns_por_s']:9.2f} {nivel['p50_s'] * 1000:9.0f} "
+              f"{nivel['p99_s'] * 1000:9.0f} {nivel['memoria_por_sesion_mb']:10.2f}")
+        if nivel["p50_s"] > args.p50:
+            fallos.append(f"{sesiones} sesiones: p50 {nivel['p50_s']:.2f} s (objetivo {args.p50:.2f} s)")
+        if nivel["p99_s"] > args.p99:
+            fallos.append(f"{sesiones} sesiones: p99 {nivel['p99_s']:.2f} s (objetivo {args.p99:.2f} s)")
+
+    if len(niveles) > 1 and niveles[0]["recorridos_por_s"]:
+        escala = statistics.fmean(n["recorridos_por_s"] for n in niveles[1:]) / niveles[0]["recorridos_por_s"]
+        print(f"Rendimiento medio con concurrencia: {escala:.2f}x el de una sesión")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"objetivos": {"p50_s": args.p50, "p99_s": args.p99}, "recorridos": args.recorridos,
+                       "niveles": niveles, "fallos": fallos}, f, indent=2)
+    for fallo in fallos:
+        print(f"FALLO: {fallo}", file=sys.stderr)
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
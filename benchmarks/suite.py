@@ -0,0 +1,254 @@
+"""Benchmarks de los caminos calientes: cálculo, figuras, PDF y reruns de cada página.
+
+Cada caso se cronometra con ``timeit`` (número de llamadas calibrado con
+``autorange``, varias repeticiones) y se guarda la mediana y el mínimo por
+llamada en un JSON. Con ``--comparar`` el resultado se contrasta con una línea
+base y el programa sale con código 1 si algún caso es más lento que la base por
+encima de ``--tolerancia``.
+
+Ejemplos:
+    python benchmarks/suite.py
+    python benchmarks/suite.py -k pdf -k pagina --repeticiones 7
+    python benchmarks/suite.py --comparar benchmarks/base.json
+    python benchmarks/suite.py --salida benchmarks/base.json        # nueva línea base
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+# El histórico de los benchmarks no debe mezclarse con el de la app
+os.environ.setdefault("UTA_ALMACEN", os.path.join(tempfile.mkdtemp(prefix="uta_bench_"), "resultados.sqlite"))
+
+import numpy as np  # noqa: E402
+
+RUTA_APP = os.path.join(RAIZ, "UTA.py")
+SALIDA = os.path.join(RAIZ, "benchmarks", "resultados.json")
+TOLERANCIA = 0.25
+INDICADORES = {"VA": 600.0, "HCE": 6.0, "SCE": 0.8333, "CEE": 0.3, "VAIC": 7.1333, "ROA": 0.0373, "ROE": 0.1769}
+SECTOR = "Comercial"
+ENTRADAS = {"IT": 1000.0, "CV": 400.0, "HC": 100.0, "CE": 2000.0}
+
+CASOS = {}
+
+
+def caso(nombre):
+    """Registra una función que prepara el caso y devuelve lo que se cronometra (o None si no aplica)."""
+    def registrar(preparar):
+        CASOS[nombre] = preparar
+        return preparar
+    return registrar
+
+
+# ==============================================
+# === CÁLCULO ===
+# ==============================================
+@caso("calculo.escalar")
+def _calculo_escalar():
+    from nucleo import calcular_indicadores_lote
+
+    # Como el cálculo individual de la app: el núcleo por lotes sobre una sola fila
+    return lambda: calcular_indicadores_lote([ENTRADAS["IT"]], [ENTRADAS["CV"]], [ENTRADAS["HC"]], [ENTRADAS["CE"]], [SECTOR])
+
+
+def _lote(n):
+    from nucleo import calcular_indicadores_lote, COEFICIENTES_SECTOR
+
+    rng = np.random.default_rng(0)
+    it, cv = rng.uniform(1000, 5000, n), rng.uniform(100, 900, n)
+    hc, ce = rng.uniform(50, 300, n), rng.uniform(1000, 8000, n)
+    sector = rng.choice(list(COEFICIENTES_SECTOR), n)
+    return lambda: calcular_indicadores_lote(it, cv, hc, ce, sector)
+
+
+@caso("calculo.lote_10k")
+def _calculo_lote_10k():
+    return _lote(10_000)
+
+
+@caso("calculo.lote_1m")
+def _calculo_lote_1m():
+    return _lote(1_000_000)
+
+
+# ==============================================
+# === FIGURAS ===
+# ==============================================
+@caso("figuras.radar")
+def _figuras_radar():
+    from graficos import _construir_radar
+
+    return lambda: _construir_radar(INDICADORES, "app")
+
+
+@caso("figuras.barras")
+def _figuras_barras():
+    from graficos import _construir_barras
+
+    return lambda: _construir_barras(INDICADORES, "app")
+
+
+@caso("figuras.radar_cache")
+def _figuras_radar_cache():
+    from graficos import figura_radar
+
+    figura_radar(INDICADORES, SECTOR)
+    return lambda: figura_radar(INDICADORES, SECTOR)
+
+
+# ==============================================
+# === PDF ===
+# ==============================================
+@caso("pdf.vectorial")
+def _pdf_vectorial():
+    from reporte_pdf import generar_reporte_pdf
+
+    return lambda: generar_reporte_pdf(INDICADORES, SECTOR, graficas="vectorial")
+
+
+@caso("pdf.sin_graficas")
+def _pdf_sin_graficas():
+    from reporte_pdf import generar_reporte_pdf
+
+    return lambda: generar_reporte_pdf(INDICADORES, SECTOR, graficas=None)
+
+
+@caso("pdf.raster")
+def _pdf_raster():
+    if importlib.util.find_spec("kaleido") is None:
+        return None
+    from cache_lru import FIGURAS
+    from reporte_pdf import generar_reporte_pdf
+
+    def generar():
+        # Sin caché: se mide la rasterización de Plotly en cada llamada
+        FIGURAS.limpiar()
+        generar_reporte_pdf(INDICADORES, SECTOR, graficas="raster")
+    return generar
+
+
+# ==============================================
+# === RERUN DE PÁGINAS (AppTest) ===
+# ==============================================
+def _pagina(boton, preparar=None):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(RUTA_APP, default_timeout=120)
+    at.run()
+    at.button(key=boton).click().run()
+    if preparar is not None:
+        preparar(at)
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return lambda: at.run()
+
+
+def _calcular(at):
+    for i, variable in enumerate(["IT", "CV", "HC", "CE"]):
+        at.number_input[i].set_value(ENTRADAS[variable])
+    at.button(key="btn_calcular").click().run()
+
+
+@caso("pagina.inicio")
+def _pagina_inicio():
+    return _pagina("btn_inicio")
+
+
+@caso("pagina.indicadores")
+def _pagina_indicadores():
+    return _pagina("btn_indicadores")
+
+
+@caso("pagina.indicadores_calculados")
+def _pagina_indicadores_calculados():
+    return _pagina("btn_indicadores", _calcular)
+
+
+@caso("pagina.exportar")
+def _pagina_exportar():
+    def preparar(at):
+        at.button(key="btn_indicadores").click().run()
+        _calcular(at)
+        at.button(key="btn_exportar").click().run()
+    return _pagina("btn_inicio", preparar)
+
+
+@caso("pagina.ayuda")
+def _pagina_ayuda():
+    return _pagina("btn_ayuda")
+
+
+# ==============================================
+# === EJECUCIÓN Y COMPARACIÓN ===
+# ==============================================
+def cronometrar(funcion, repeticiones):
+    temporizador = timeit.Timer(funcion)
+    numero, _ = temporizador.autorange()
+    tiempos = [t / numero for t in temporizador.repeat(repeat=repeticiones, number=numero)]
+    return {"mediana": statistics.median(tiempos), "minimo": min(tiempos), "llamadas": numero, "repeticiones": repeticiones}
+
+
+def correr(filtros=(), repeticiones=5):
+    resultados = {}
+    for nombre, preparar in CASOS.items():
+        if filtros and not any(f in nombre for f in filtros):
+            continue
+        funcion = preparar()
+        if funcion is None:
+            print(f"  {nombre:<32} omitido (dependencia no disponible)", file=sys.stderr)
+            continue
+        resultados[nombre] = cronometrar(funcion, repeticiones)
+        print(f"  {nombre:<32} {resultados[nombre]['mediana'] * 1000:10.3f} ms", file=sys.stderr)
+    return resultados
+
+
+def comparar(resultados, base, tolerancia):
+    """Filas (caso, base, actual, razón, regresión) para los casos presentes en ambos."""
+    filas = []
+    for nombre, actual in resultados.items():
+        if nombre not in base:
+            continue
+        razon = actual["mediana"] / base[nombre]["mediana"]
+        filas.append((nombre, base[nombre]["mediana"], actual["mediana"], razon, razon > 1 + tolerancia))
+    return filas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de cálculo, figuras, PDF y páginas de la app.")
+    parser.add_argument("-k", dest="filtros", action="append", default=[], help="Solo casos cuyo nombre contenga este texto")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--salida", default=SALIDA, help="JSON de resultados")
+    parser.add_argument("--comparar", help="JSON de línea base con el que comparar")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="Regresión admitida (0.25 = 25 %% más lento)")
+    args = parser.parse_args(argv)
+
+    print("Casos (mediana por llamada):", file=sys.stderr)
+    resultados = correr(args.filtros, args.repeticiones)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump({
+            "fecha": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+            "plataforma": platform.platform(), "procesadores": os.cpu_count(), "casos": resultados
+        }, f, indent=2)
+    print(f"Resultados -> {args.salida}", file=sys.stderr)
+
+    if not args.comparar:
+        return 0
+    with open(args.comparar, encoding="utf-8") as f:
+        base = json.load(f)["casos"]
+    filas = comparar(resultados, base, args.tolerancia)
+    print(f"\n{'caso':<32} {'base (ms)':>10} {'actual (ms)':>12} {'razón':>7}")
+    for nombre, antes, ahora, razon, regresion in filas:
+        print(f"{nombre:<32} {antes * 1000:10.3f} {ahora * 1000:12.3f} {razon:7.2f}{'  REGRESIÓN' if regresion else ''}")
+    return 1 if any(f[4] for f in filas) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
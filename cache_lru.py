@@ -0,0 +1,67 @@
+"""Caché LRU en memoria compartida por todas las sesiones del proceso.
+
+Se usa para activos estáticos (logo decodificado) y para figuras y tablas
+construidas a partir de la tupla de indicadores. Cada caché lleva contadores
+de aciertos y fallos que la página de operador muestra.
+"""
+import threading
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """Diccionario acotado a ``capacidad`` entradas que descarta la menos usada."""
+
+    def __init__(self, nombre, capacidad):
+        self.nombre = nombre
+        self.capacidad = capacidad
+        self.aciertos = 0
+        self.fallos = 0
+        self.descartes = 0
+        self._datos = OrderedDict()
+        self._candado = threading.Lock()
+
+    def obtener(self, clave, construir):
+        """Devuelve el valor de ``clave``; si no está, lo construye con ``construir()``."""
+        with self._candado:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+            self.fallos += 1
+        # Se construye fuera del candado para no bloquear a otras sesiones
+        valor = construir()
+        with self._candado:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.capacidad:
+                self._datos.popitem(last=False)
+                self.descartes += 1
+        return valor
+
+    def limpiar(self):
+        with self._candado:
+            self._datos.clear()
+            self.aciertos = self.fallos = self.descartes = 0
+
+    def estadisticas(self):
+        with self._candado:
+            consultas = self.aciertos + self.fallos
+            return {
+                "cache": self.nombre, "entradas": len(self._datos), "capacidad": self.capacidad,
+                "aciertos": self.aciertos, "fallos": self.fallos, "descartes": self.descartes,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0
+            }
+
+
+ACTIVOS = CacheLRU("activos", 8)
+FIGURAS = CacheLRU("figuras", 256)
+TABLAS = CacheLRU("tablas", 256)
+
+
+def clave_indicadores(indicadores, sector):
+    """Clave (VA, HCE, SCE, CEE, VAIC, ROA, ROE, sector) para figuras y tablas."""
+    return tuple(float(indicadores[k]) for k in ("VA", "HCE", "SCE", "CEE", "VAIC", "ROA", "ROE")) + (sector,)
+
+
+def estadisticas():
+    return [cache.estadisticas() for cache in (ACTIVOS, FIGURAS, TABLAS)]
@@ -0,0 +1,103 @@
+"""Línea de comandos: puntúa un archivo de empresas sin levantar Streamlit.
+
+Ejemplos:
+    python cli.py panel.csv -o resultados.csv
+    python cli.py panel.csv -o resultados.csv --resumen resumen.csv --reportes reportes/ --columna-id empresa
+    python cli.py panel.csv -o resultados.csv --zip - --columna-id empresa > reportes.zip
+    python cli.py panel.csv -o resultados.csv --rechazos rechazos.csv --umbral-atipicos 0
+    python cli.py panel.csv -o resultados.csv --parquet resultados.parquet --arrow resultados.arrow
+"""
+import argparse
+import os
+import sys
+import time
+
+from exportacion import FORMATOS, exportar, lotes
+from nucleo import TAMANO_BLOQUE, UMBRAL_ATIPICOS, cargar_coeficientes, procesar_por_bloques
+
+
+def _filas_resultados(ruta_resultados, tamano_bloque):
+    import pandas as pd
+
+    for bloque in pd.read_csv(ruta_resultados, chunksize=tamano_bloque):
+        yield from bloque.to_dict("records")
+
+
+def _escribir_reportes(filas, carpeta, **opciones):
+    from reporte_pdf import generar_reportes
+
+    os.makedirs(carpeta, exist_ok=True)
+    total = 0
+    for nombre, pdf in generar_reportes(filas, **opciones):
+        with open(os.path.join(carpeta, nombre), "wb") as f:
+            f.write(pdf)
+        total += 1
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calcula VA, HCE, SCE, CEE, VAIC™, ROA y ROE para un archivo CSV/XLSX.")
+    parser.add_argument("entrada", help="Archivo CSV o XLSX con las columnas IT, CV, HC, CE y sector")
+    parser.add_argument("-o", "--salida", required=True, help="CSV de resultados")
+    parser.add_argument("--resumen", help="CSV con los estadísticos por sector")
+    parser.add_argument("--rechazos", help="CSV con las filas rechazadas por la validación y sus motivos")
+    parser.add_argument("--umbral-atipicos", type=float, default=UMBRAL_ATIPICOS,
+                        help="|z| robusto por sector a partir del cual se rechaza una fila (0 desactiva la regla)")
+    for formato in FORMATOS:
+        parser.add_argument(f"--{formato}", help=f"Copia de los resultados en {FORMATOS[formato][0]}")
+    parser.add_argument("--reportes", help="Carpeta donde escribir un reporte PDF por fila")
+    parser.add_argument("--zip", help="ZIP con un reporte PDF por fila ('-' para escribirlo en stdout)")
+    parser.add_argument("--procesos", type=int, help="Procesos para generar reportes (por defecto, todos los núcleos)")
+    parser.add_argument("--columna-id", help="Columna usada para nombrar los reportes (p. ej. empresa)")
+    parser.add_argument("--graficas", choices=["vectorial", "raster", "ninguna"], default="vectorial",
+                        help="Motor de gráficas de los reportes PDF (raster requiere kaleido)")
+    parser.add_argument("--coeficientes", help="JSON con coeficientes sectoriales alternativos")
+    parser.add_argument("--tamano-bloque", type=int, default=TAMANO_BLOQUE, help="Filas por bloque de lectura")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    acumulador, _, filas, rechazos = procesar_por_bloques(
+        args.entrada, destino=args.salida, tamano_bloque=args.tamano_bloque,
+        limite_memoria=0, coeficientes=cargar_coeficientes(args.coeficientes),
+        destino_rechazos=args.rechazos, umbral_atipicos=args.umbral_atipicos or None
+    )
+    duracion = time.perf_counter() - inicio
+    velocidad = (filas + rechazos.filas) / duracion * 60 if duracion > 0 else 0.0
+    print(f"{filas:,} filas puntuadas en {duracion:.2f} s ({velocidad:,.0f} filas/min) -> {args.salida}", file=sys.stderr)
+    if rechazos.filas:
+        motivos = ", ".join(f"{m} {n:,}" for m, n in rechazos.motivos.items() if n)
+        destino = f" -> {args.rechazos}" if args.rechazos else " (usa --rechazos para guardarlas)"
+        print(f"{rechazos.filas:,} filas rechazadas ({motivos}){destino}", file=sys.stderr)
+
+    if args.resumen:
+        acumulador.resumen().to_csv(args.resumen, index=False)
+    for formato in FORMATOS:
+        destino = getattr(args, formato)
+        if destino:
+            inicio = time.perf_counter()
+            total = exportar(lotes(args.salida, formato), destino, formato)
+            print(f"{total:,} filas en {FORMATOS[formato][0]} en {time.perf_counter() - inicio:.2f} s -> {destino}", file=sys.stderr)
+    opciones = {
+        "columna_id": args.columna_id, "procesos": args.procesos,
+        "graficas": None if args.graficas == "ninguna" else args.graficas
+    }
+    if args.reportes:
+        inicio = time.perf_counter()
+        total = _escribir_reportes(_filas_resultados(args.salida, args.tamano_bloque), args.reportes, **opciones)
+        print(f"{total:,} reportes PDF en {time.perf_counter() - inicio:.2f} s -> {args.reportes}", file=sys.stderr)
+    if args.zip:
+        from reporte_pdf import reportes_en_zip
+
+        inicio = time.perf_counter()
+        filas_zip = _filas_resultados(args.salida, args.tamano_bloque)
+        if args.zip == "-":
+            total = reportes_en_zip(filas_zip, sys.stdout.buffer, **opciones)
+        else:
+            with open(args.zip, "wb") as f:
+                total = reportes_en_zip(filas_zip, f, **opciones)
+        print(f"{total:,} reportes PDF en {time.perf_counter() - inicio:.2f} s -> {args.zip}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Tabla de resultados indexada para explorarla por páginas desde el servidor.
+
+Los filtros (sector, año) usan índices invertidos que se construyen una sola vez
+y el orden por cada columna se calcula la primera vez que se pide y se
+reutiliza. Una consulta combina máscaras booleanas sobre esos índices y solo
+materializa las filas de la página pedida, con sus tipos originales: el
+formato de los números queda para quien las muestra.
+"""
+import numpy as np
+import pandas as pd
+
+COLUMNAS_FILTRO = ["sector", "anio"]
+TAMANOS_PAGINA = [25, 50, 100, 250]
+
+
+class TablaIndexada:
+    def __init__(self, df, filtros=COLUMNAS_FILTRO):
+        self.df = df.reset_index(drop=True)
+        self.indices = {}
+        for columna in filtros:
+            if columna not in self.df:
+                continue
+            codigos, valores = pd.factorize(self.df[columna], sort=True)
+            orden = np.argsort(codigos, kind="stable")
+            # Filas con valor faltante (código -1) quedan fuera de todos los grupos
+            cortes = np.searchsorted(codigos[orden], np.arange(len(valores) + 1))
+            self.indices[columna] = {
+                valor: orden[cortes[i]:cortes[i + 1]] for i, valor in enumerate(valores.tolist())
+            }
+        self._ordenes = {}
+
+    def __len__(self):
+        return len(self.df)
+
+    def valores(self, columna):
+        """Valores distintos (ordenados) de una columna de filtro."""
+        return list(self.indices.get(columna, {}))
+
+    def _orden(self, columna, descendente):
+        clave = (columna, descendente)
+        if clave not in self._ordenes:
+            # Los faltantes van al final en los dos sentidos
+            self._ordenes[clave] = self.df[columna].sort_values(
+                ascending=not descendente, kind="stable", na_position="last"
+            ).index.to_numpy()
+        return self._ordenes[clave]
+
+    def seleccionar(self, filtros=None, orden=None, descendente=False):
+        """Posiciones de las filas que cumplen ``filtros`` ({columna: [valores]}), en el orden pedido.
+
+        Una lista vacía no filtra esa columna.
+        """
+        mascara = None
+        for columna, elegidos in (filtros or {}).items():
+            if not elegidos:
+                continue
+            indice = self.indices[columna]
+            posiciones = [indice[v] for v in elegidos if v in indice]
+            actual = np.zeros(len(self.df), dtype=bool)
+            if posiciones:
+                actual[np.concatenate(posiciones)] = True
+            mascara = actual if mascara is None else mascara & actual
+        if orden is not None:
+            filas = self._orden(orden, descendente)
+            return filas if mascara is None else filas[mascara[filas]]
+        return np.arange(len(self.df)) if mascara is None else np.flatnonzero(mascara)
+
+    def pagina(self, filas, numero, tamano):
+        """Filas de la página ``numero`` (desde 1) de una selección."""
+        inicio = (numero - 1) * tamano
+        return self.df.iloc[filas[inicio:inicio + tamano]]
@@ -0,0 +1,158 @@
+"""Exportación masiva de los resultados puntuados: Parquet, Arrow IPC y XLSX.
+
+Los resultados se recorren por lotes de Arrow. Desde un DataFrame en memoria,
+las columnas numéricas se envuelven sin copiarse (los NaN de las columnas float
+pasan a nulos con solo un mapa de validez); desde el CSV de resultados, los
+lotes se leen en streaming. Parquet escribe un grupo de filas por lote y Arrow
+IPC escribe los búferes tal cual. XLSX usa el modo de solo escritura de
+openpyxl, que vuelca cada fila al disco: la memoria no crece con el archivo,
+aunque es mucho más lento que los formatos columnares.
+"""
+import numpy as np
+
+from nucleo import COLUMNAS_LOTE, INDICADORES_LOTE
+
+TAMANO_LOTE = 100_000
+# XLSX escribe celda por celda en Python: lotes más chicos dan progreso y cancelación fluidos
+TAMANO_LOTE_XLSX = 10_000
+FILAS_HOJA_XLSX = 1_048_575  # límite de filas de Excel, menos el encabezado
+FORMATOS = {
+    "parquet": ("Parquet", ".parquet", "application/vnd.apache.parquet"),
+    "arrow": ("Arrow IPC (Feather v2)", ".arrow", "application/vnd.apache.arrow.file"),
+    "xlsx": ("Excel (XLSX)", ".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+# ==============================================
+# === LOTES DE ARROW ===
+# ==============================================
+def _columna(serie):
+    import pyarrow as pa
+
+    valores = serie.to_numpy()
+    if valores.dtype.kind == "f" and valores.flags.c_contiguous:
+        nulos = np.isnan(valores)
+        if nulos.any():
+            validez = pa.py_buffer(np.packbits(~nulos, bitorder="little"))
+            return pa.Array.from_buffers(pa.from_numpy_dtype(valores.dtype), len(valores),
+                                         [validez, pa.py_buffer(valores)], null_count=int(nulos.sum()))
+        return pa.array(valores)
+    if valores.dtype.kind in "iub" and valores.flags.c_contiguous:
+        return pa.array(valores)
+    # Texto: las columnas "string" de pandas ya guardan Arrow y salen como ChunkedArray
+    columna = pa.array(serie, from_pandas=True)
+    if isinstance(columna, pa.ChunkedArray):
+        columna = columna.chunk(0) if columna.num_chunks == 1 else columna.combine_chunks()
+    return columna
+
+
+def lotes_dataframe(df, tamano=TAMANO_LOTE):
+    """Lotes de Arrow de un DataFrame; las columnas numéricas comparten memoria con ``df``."""
+    import pyarrow as pa
+
+    esquema = None
+    for desde in range(0, len(df), tamano):
+        tramo = df.iloc[desde:desde + tamano]
+        lote = pa.RecordBatch.from_arrays([_columna(tramo[c]) for c in tramo.columns], names=[str(c) for c in tramo.columns])
+        if esquema is None:
+            esquema = lote.schema
+        yield lote if lote.schema.equals(esquema) else lote.cast(esquema)
+
+
+def lotes_csv(ruta, tamano_bytes=TAMANO_LOTE * 160):
+    """Lotes de Arrow leídos en streaming de un CSV (p. ej. el de resultados por lotes)."""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    # Los tipos se infieren del primer bloque; las columnas conocidas se fijan para que
+    # un bloque posterior (p. ej. con decimales o vacíos) no contradiga esa inferencia
+    tipos = {c: pa.float64() for c in COLUMNAS_LOTE[:-1] + INDICADORES_LOTE}
+    tipos["sector"] = pa.string()
+    lector = pa_csv.open_csv(ruta, read_options=pa_csv.ReadOptions(block_size=tamano_bytes),
+                             convert_options=pa_csv.ConvertOptions(column_types=tipos))
+    yield from lector
+
+
+def lotes(fuente, formato):
+    """Lotes para exportar en ``formato`` desde un DataFrame o la ruta del CSV de resultados."""
+    tamano = TAMANO_LOTE_XLSX if formato == "xlsx" else TAMANO_LOTE
+    if isinstance(fuente, str):
+        # ~160 bytes por fila en el CSV de resultados
+        return lotes_csv(fuente, tamano_bytes=tamano * 160)
+    return lotes_dataframe(fuente, tamano)
+
+
+# ==============================================
+# === ESCRITORES ===
+# ==============================================
+def _escribir_parquet(lotes, destino, al_lote):
+    import pyarrow.parquet as pq
+
+    escritor = None
+    try:
+        for lote in lotes:
+            if escritor is None:
+                escritor = pq.ParquetWriter(destino, lote.schema, compression="zstd")
+            escritor.write_batch(lote)
+            al_lote(lote)
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+
+def _escribir_arrow(lotes, destino, al_lote):
+    import pyarrow as pa
+
+    escritor = None
+    try:
+        for lote in lotes:
+            if escritor is None:
+                escritor = pa.ipc.new_file(destino, lote.schema)
+            escritor.write_batch(lote)
+            al_lote(lote)
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+
+def _escribir_xlsx(lotes, destino, al_lote):
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    hoja, en_hoja, hojas = None, FILAS_HOJA_XLSX, 0
+    for lote in lotes:
+        # Una lista por columna y lote: los nulos llegan como None (celda vacía)
+        columnas = [columna.to_pylist() for columna in lote.columns]
+        for fila in zip(*columnas):
+            if en_hoja == FILAS_HOJA_XLSX:
+                hojas += 1
+                hoja = libro.create_sheet("Resultados" if hojas == 1 else f"Resultados {hojas}")
+                hoja.append(lote.schema.names)
+                en_hoja = 0
+            hoja.append(fila)
+            en_hoja += 1
+        al_lote(lote)
+    if hoja is None:
+        libro.create_sheet("Resultados")
+    libro.save(destino)
+
+
+ESCRITORES = {"parquet": _escribir_parquet, "arrow": _escribir_arrow, "xlsx": _escribir_xlsx}
+
+
+def exportar(lotes, destino, formato, al_avanzar=None):
+    """Escribe los ``lotes`` en ``destino`` con el ``formato`` pedido y devuelve las filas escritas.
+
+    ``al_avanzar(filas)`` se llama después de cada lote.
+    """
+    if formato not in ESCRITORES:
+        raise ValueError(f"Formato no soportado: {formato} (usa {', '.join(ESCRITORES)})")
+    filas = 0
+
+    def al_lote(lote):
+        nonlocal filas
+        filas += lote.num_rows
+        if al_avanzar is not None:
+            al_avanzar(filas)
+    ESCRITORES[formato](lotes, destino, al_lote)
+    return filas
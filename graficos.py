@@ -0,0 +1,146 @@
+"""Figuras Plotly y tabla resumen, memorizadas en cache_lru.
+
+Las figuras devueltas se comparten entre sesiones: no deben modificarse después
+de obtenerlas.
+"""
+import math
+
+import pandas as pd
+import plotly.graph_objects as go
+
+import metricas
+from cache_lru import FIGURAS, TABLAS, clave_indicadores
+
+
+@metricas.medido("figura.radar")
+def _construir_radar(indicadores, estilo):
+    valores = [indicadores["CEE"], indicadores["HCE"], indicadores["SCE"], indicadores["VAIC"]]
+    fig_radar = go.Figure()
+    if estilo == "reporte":
+        fig_radar.add_trace(go.Scatterpolar(
+            r=valores, theta=['CEE', 'HCE', 'SCE', 'VAIC™'],
+            fill='toself', line_color="#D8491D", fillcolor='rgba(29, 78, 216, 0.25)'
+        ))
+        fig_radar.update_layout(polar=dict(radialaxis=dict(visible=True)), showlegend=False, height=400, width=550)
+        return fig_radar
+    fig_radar.add_trace(go.Scatterpolar(
+        r=valores,
+        theta=['CEE', 'HCE', 'SCE', 'VAIC™'],
+        fill='toself',
+        line_color='#1D4ED8',
+        fillcolor='rgba(29, 78, 216, 0.25)'
+    ))
+    fig_radar.update_layout(
+        polar=dict(radialaxis=dict(visible=True, range=[0, max(*valores, 1) + 0.5])),
+        showlegend=False, title="Perfil VAIC™", height=480
+    )
+    return fig_radar
+
+
+@metricas.medido("figura.barras")
+def _construir_barras(indicadores, estilo):
+    fig_bar = go.Figure()
+    fig_bar.add_trace(go.Bar(
+        y=['ROA', 'ROE'], x=[indicadores["ROA"], indicadores["ROE"]],
+        orientation='h', marker_color=['#1D4ED8', '#DC2626'],
+        text=[f"{indicadores['ROA']:.4f}", f"{indicadores['ROE']:.4f}"], textposition='outside'
+    ))
+    if estilo == "reporte":
+        fig_bar.update_layout(title="ROA y ROE Calculados", height=300, width=500, margin=dict(l=50, r=50, t=50, b=50))
+    else:
+        fig_bar.update_layout(title="ROA y ROE", height=350, showlegend=False)
+    return fig_bar
+
+
+def figura_radar(indicadores, sector, estilo="app"):
+    clave = ("radar", estilo) + clave_indicadores(indicadores, sector)
+    return FIGURAS.obtener(clave, lambda: _construir_radar(indicadores, estilo))
+
+
+def figura_barras(indicadores, sector, estilo="app"):
+    clave = ("barras", estilo) + clave_indicadores(indicadores, sector)
+    return FIGURAS.obtener(clave, lambda: _construir_barras(indicadores, estilo))
+
+
+def tabla_resumen(indicadores, sector):
+    def construir():
+        return pd.DataFrame({
+            "Indicador": ["VA", "HCE", "SCE", "CEE", "VAIC™", "ROA", "ROE"],
+            # Numérico: el formato se aplica al mostrarla
+            "Valor": [float(indicadores[k]) for k in ("VA", "HCE", "SCE", "CEE", "VAIC", "ROA", "ROE")]
+        })
+    return TABLAS.obtener(("resumen",) + clave_indicadores(indicadores, sector), construir)
+
+
+@metricas.medido("figura.barras_bandas")
+def figura_barras_bandas(resumen):
+    """Barras ROA/ROE en la mediana simulada, con bandas P5–P95 y marcas P25/P75 (sin caché)."""
+    nombres = ["ROA", "ROE"]
+    medianas = [resumen[k]["P50"] for k in nombres]
+    fig_bar = go.Figure()
+    fig_bar.add_trace(go.Bar(
+        y=nombres, x=medianas, orientation='h', marker_color=['#1D4ED8', '#DC2626'], name="P50",
+        error_x=dict(
+            type="data", symmetric=False,
+            array=[resumen[k]["P95"] - resumen[k]["P50"] for k in nombres],
+            arrayminus=[resumen[k]["P50"] - resumen[k]["P5"] for k in nombres],
+            color="#111827", thickness=1.5, width=10
+        ),
+        text=[f"{m:.4f}" for m in medianas], textposition='inside'
+    ))
+    for percentil in ("P25", "P75"):
+        fig_bar.add_trace(go.Scatter(
+            y=nombres, x=[resumen[k][percentil] for k in nombres], mode="markers", name=percentil,
+            marker=dict(symbol="line-ns-open", size=22, line=dict(width=3, color="#F59E0B"))
+        ))
+    fig_bar.update_layout(title="ROA y ROE simulados (P5–P95, P25/P75)", height=350, showlegend=False)
+    return fig_bar
+
+
+@metricas.medido("figura.radar_pares")
+def figura_radar_pares(indicadores, sector, cuartiles):
+    """Perfil VAIC™ de la empresa sobre la banda Q1–Q3 y la mediana de su sector.
+
+    ``cuartiles`` es {indicador: {"q1", "mediana", "q3", ...}} para CEE, HCE, SCE y VAIC.
+    """
+    ejes = ["CEE", "HCE", "SCE", "VAIC"]
+    theta = ['CEE', 'HCE', 'SCE', 'VAIC™']
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(
+        r=[cuartiles[k]["q3"] for k in ejes], theta=theta, fill='toself', name="Q3 sector",
+        line=dict(color="rgba(100, 116, 139, 0.6)", width=1), fillcolor="rgba(148, 163, 184, 0.30)"
+    ))
+    fig.add_trace(go.Scatterpolar(
+        r=[cuartiles[k]["q1"] for k in ejes], theta=theta, fill='toself', name="Q1 sector",
+        line=dict(color="rgba(100, 116, 139, 0.6)", width=1), fillcolor="rgba(255, 255, 255, 0.85)"
+    ))
+    fig.add_trace(go.Scatterpolar(
+        r=[cuartiles[k]["mediana"] for k in ejes], theta=theta, name="Mediana sector",
+        line=dict(color="#475569", dash="dash")
+    ))
+    base = figura_radar(indicadores, sector)
+    fig.add_trace(go.Scatterpolar(base.data[0]).update(name="Empresa"))
+    valores = [indicadores[k] for k in ejes] + [cuartiles[k]["q3"] for k in ejes]
+    maximo = max([v for v in valores if math.isfinite(v)] + [1])
+    fig.update_layout(
+        polar=dict(radialaxis=dict(visible=True, range=[0, maximo + 0.5])),
+        showlegend=True, title="Perfil VAIC™ frente al sector", height=480
+    )
+    return fig
+
+
+@metricas.medido("figura.tendencias")
+def figura_tendencias(serie, ventana):
+    """Evolución anual de CEE, HCE, SCE y VAIC™ de una empresa, con la media móvil del VAIC™ (sin caché)."""
+    fig = go.Figure()
+    for indicador, nombre, color in (("CEE", "CEE", "#0EA5E9"), ("HCE", "HCE", "#1D4ED8"),
+                                     ("SCE", "SCE", "#F59E0B"), ("VAIC", "VAIC™", "#D8491D")):
+        fig.add_trace(go.Scatter(x=serie["anio"], y=serie[indicador], mode="lines+markers", name=nombre,
+                                 line=dict(color=color)))
+    fig.add_trace(go.Scatter(
+        x=serie["anio"], y=serie["VAIC_media_movil"], mode="lines", name=f"VAIC™ media {ventana} años",
+        line=dict(color="#D8491D", dash="dot")
+    ))
+    fig.update_layout(title="Tendencia VAIC™", height=480, xaxis=dict(dtick=1, title="Año"),
+                      legend=dict(orientation="h", y=-0.2))
+    return fig
@@ -0,0 +1,73 @@
+"""Gráficas del reporte dibujadas como vectores de ReportLab (sin kaleido ni PNG)."""
+import math
+
+from reportlab.graphics.shapes import Drawing, Line, Polygon, Rect, String
+from reportlab.lib import colors
+
+AZUL = colors.HexColor("#1D4ED8")
+ROJO = colors.HexColor("#DC2626")
+NARANJA = colors.HexColor("#D8491D")
+RELLENO_RADAR = colors.Color(29/255, 78/255, 216/255, alpha=0.25)
+GRIS_REJILLA = colors.HexColor("#E5E7EB")
+GRIS_TEXTO = colors.HexColor("#374151")
+
+
+def _finito(valor):
+    return valor if isinstance(valor, (int, float)) and math.isfinite(valor) else 0.0
+
+
+def dibujo_radar(indicadores, ancho=260, alto=260):
+    """Perfil VAIC™ (CEE, HCE, SCE, VAIC™) como polígono sobre una rejilla radial."""
+    etiquetas = ['CEE', 'HCE', 'SCE', 'VAIC™']
+    valores = [max(_finito(indicadores[k]), 0.0) for k in ("CEE", "HCE", "SCE", "VAIC")]
+    escala = max(max(valores), 1.0) * 1.1
+    d = Drawing(ancho, alto)
+    cx, cy = ancho / 2, alto / 2 - 8
+    radio = min(ancho, alto) / 2 - 30
+    # Ejes a 90°, empezando arriba y en sentido horario, como Plotly
+    angulos = [math.pi / 2 - i * 2 * math.pi / len(etiquetas) for i in range(len(etiquetas))]
+
+    for fraccion in (0.25, 0.5, 0.75, 1.0):
+        puntos = []
+        for a in angulos:
+            puntos += [cx + radio * fraccion * math.cos(a), cy + radio * fraccion * math.sin(a)]
+        d.add(Polygon(puntos, fillColor=None, strokeColor=GRIS_REJILLA, strokeWidth=0.8))
+        d.add(String(cx + 3, cy + radio * fraccion + 2, f"{escala * fraccion:.2f}", fontName="Helvetica", fontSize=6, fillColor=GRIS_TEXTO))
+    for a, etiqueta in zip(angulos, etiquetas):
+        d.add(Line(cx, cy, cx + radio * math.cos(a), cy + radio * math.sin(a), strokeColor=GRIS_REJILLA))
+        d.add(String(cx + (radio + 14) * math.cos(a), cy + (radio + 14) * math.sin(a) - 3, etiqueta,
+                     fontName="Helvetica-Bold", fontSize=9, textAnchor="middle", fillColor=GRIS_TEXTO))
+
+    puntos = []
+    for a, valor in zip(angulos, valores):
+        r = radio * valor / escala
+        puntos += [cx + r * math.cos(a), cy + r * math.sin(a)]
+    d.add(Polygon(puntos, fillColor=RELLENO_RADAR, strokeColor=NARANJA, strokeWidth=1.5))
+    d.add(String(ancho / 2, alto - 12, "Perfil VAIC™", fontName="Helvetica-Bold", fontSize=11, textAnchor="middle"))
+    return d
+
+
+def dibujo_barras(indicadores, ancho=260, alto=260):
+    """Barras horizontales de ROA y ROE, cada una con su nombre y valor encima."""
+    nombres = ["ROA", "ROE"]
+    valores = [indicadores["ROA"], indicadores["ROE"]]
+    finitos = [_finito(v) for v in valores]
+    d = Drawing(ancho, alto)
+    d.add(String(ancho / 2, alto - 12, "ROA y ROE Calculados", fontName="Helvetica-Bold", fontSize=11, textAnchor="middle"))
+
+    izquierda, derecha = 20, ancho - 20
+    minimo, maximo = min(min(finitos), 0.0), max(max(finitos), 0.0)
+    rango = (maximo - minimo) or 1.0
+    escala = (derecha - izquierda) / rango
+    x0 = izquierda - minimo * escala
+    alto_barra = (alto - 60) / 4
+    d.add(Line(x0, 20, x0, alto - 30, strokeColor=GRIS_TEXTO, strokeWidth=0.8))
+
+    for i, (nombre, valor, finito, color) in enumerate(zip(nombres, valores, finitos, [AZUL, ROJO])):
+        y = alto - 40 - (i + 1) * alto_barra * 1.6
+        ancho_barra = finito * escala
+        d.add(Rect(min(x0, x0 + ancho_barra), y, abs(ancho_barra), alto_barra, fillColor=color, strokeColor=None))
+        texto = f"{valor:.4f}" if math.isfinite(valor) else "n/d"
+        d.add(String(izquierda, y + alto_barra + 4, f"{nombre}: {texto}", fontName="Helvetica-Bold", fontSize=9,
+                     fillColor=GRIS_TEXTO))
+    return d
@@ -0,0 +1,135 @@
+"""Instrumentación de los caminos calientes: tramos cronometrados e histogramas por proceso.
+
+``Tramo("nombre")`` (gestor de contexto) y ``@medido("nombre")`` (decorador)
+registran la duración en un histograma compartido por todas las sesiones. Los
+histogramas tienen cubetas exponenciales (factor 1.25 desde 1 µs), así que
+registrar cuesta O(1) y los percentiles p50/p95/p99 tienen un error relativo
+acotado (~12 %). ``Perfil()`` envuelve un bloque en cProfile bajo demanda.
+"""
+import functools
+import io
+import math
+import threading
+import time
+
+MINIMO = 1e-6
+FACTOR = 1.25
+CUBETAS = 100  # hasta ~4 horas
+PERCENTILES = (50, 95, 99)
+
+
+class Histograma:
+    def __init__(self):
+        self.cuentas = [0] * CUBETAS
+        self.n = 0
+        self.total = 0.0
+        self.maximo = 0.0
+
+    def registrar(self, segundos):
+        indice = 0 if segundos <= MINIMO else min(int(math.log(segundos / MINIMO, FACTOR)) + 1, CUBETAS - 1)
+        self.cuentas[indice] += 1
+        self.n += 1
+        self.total += segundos
+        self.maximo = max(self.maximo, segundos)
+
+    def percentil(self, p):
+        """Centro geométrico de la cubeta que contiene el percentil ``p`` (acotado por el máximo)."""
+        if self.n == 0:
+            return 0.0
+        objetivo = p / 100 * self.n
+        acumulado = 0
+        for indice, cuenta in enumerate(self.cuentas):
+            acumulado += cuenta
+            if acumulado >= objetivo and cuenta:
+                if indice == 0:
+                    return MINIMO
+                return min(MINIMO * FACTOR ** (indice - 0.5), self.maximo)
+        return self.maximo
+
+
+_HISTOGRAMAS = {}
+_CANDADO = threading.Lock()
+
+
+def registrar(nombre, segundos):
+    with _CANDADO:
+        histograma = _HISTOGRAMAS.get(nombre)
+        if histograma is None:
+            histograma = _HISTOGRAMAS[nombre] = Histograma()
+        histograma.registrar(segundos)
+
+
+class Tramo:
+    """Cronometra un bloque; ``nombre`` puede cambiarse dentro del bloque (p. ej. la página final del rerun)."""
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        registrar(self.nombre, time.perf_counter() - self.inicio)
+        return False
+
+
+def medido(nombre):
+    """Decorador: cada llamada a la función se registra como un tramo ``nombre``."""
+    def decorar(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with Tramo(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorar
+
+
+def resumen():
+    """Una fila por tramo: n, total, media, p50/p95/p99 y máximo (en milisegundos)."""
+    with _CANDADO:
+        filas = []
+        for nombre, h in sorted(_HISTOGRAMAS.items()):
+            fila = {"tramo": nombre, "n": h.n, "total_s": h.total, "media_ms": h.total / h.n * 1000}
+            fila.update({f"p{p}_ms": h.percentil(p) * 1000 for p in PERCENTILES})
+            fila["max_ms"] = h.maximo * 1000
+            filas.append(fila)
+        return filas
+
+
+def texto():
+    """Resumen en texto plano, una línea por tramo (para copiar o exponer tal cual)."""
+    lineas = [f"{'tramo':<32} {'n':>7} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9} {'max_ms':>9}"]
+    for f in resumen():
+        lineas.append(f"{f['tramo']:<32} {f['n']:>7} {f['p50_ms']:>9.2f} {f['p95_ms']:>9.2f} {f['p99_ms']:>9.2f} {f['max_ms']:>9.2f}")
+    return "\n".join(lineas)
+
+
+def limpiar():
+    with _CANDADO:
+        _HISTOGRAMAS.clear()
+
+
+class Perfil:
+    """cProfile sobre un bloque si ``activo``; al salir, ``texto`` tiene las funciones más costosas."""
+
+    def __init__(self, activo=True, lineas=40):
+        self.activo = activo
+        self.lineas = lineas
+        self.texto = None
+
+    def __enter__(self):
+        if self.activo:
+            import cProfile
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+        return self
+
+    def __exit__(self, *excepcion):
+        if self.activo:
+            import pstats
+            self._perfil.disable()
+            salida = io.StringIO()
+            pstats.Stats(self._perfil, stream=salida).sort_stats("cumulative").print_stats(self.lineas)
+            self.texto = salida.getvalue()
+        return False
@@ -0,0 +1,584 @@
+"""Núcleo de cálculo de los indicadores VAIC™, ROA y ROE.
+
+No depende de Streamlit: lo usan la aplicación (UTA.py), la línea de comandos
+(cli.py), el servicio de puntuación (servicio.py) y cualquier cuaderno o tarea
+programada.
+"""
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# ==============================================
+# === INDICADORES VAIC™ Y MODELOS SECTORIALES ===
+# ==============================================
+COLUMNAS_LOTE = ["IT", "CV", "HC", "CE", "sector"]
+INDICADORES_LOTE = ["VA", "HCE", "SCE", "CEE", "VAIC", "ROA", "ROE"]
+# Columnas opcionales que identifican la observación (empresa, año)
+ALIAS_IDENTIFICADORES = {"empresa": "empresa", "firma": "empresa", "firm": "empresa",
+                         "anio": "anio", "año": "anio", "year": "anio"}
+TAMANO_BLOQUE = 100_000
+LIMITE_FILAS_MEMORIA = 1_000_000
+
+def _dividir_seguro(numerador, denominador):
+    # Igual que "x / y if y != 0 else 0.0", pero sobre columnas completas
+    resultado = np.zeros_like(numerador, dtype=float)
+    np.divide(numerador, denominador, out=resultado, where=denominador != 0)
+    return resultado
+
+# Modelos sectoriales: ROA/ROE = intercepto + b_ICE * ICE + b_CEE * CEE
+COEFICIENTES_SECTOR = {
+    "Inmobiliario": {
+        "ROA": (-0.001171129, 0.005704393, 0.028213145),
+        "ROE": (0.010838631, 0.009842492, 0.069439342),
+    },
+    "Primario": {
+        "ROA": (0.027048998, -0.004791466, 0.083361825),
+        "ROE": (0.084135634, -0.008724684, 0.151617468),
+    },
+    "Comercial": {
+        "ROA": (0.017000167, 0.000090463, 0.065590993),
+        "ROE": (-0.15508027, 0.00774242, 0.930391243),
+    },
+}
+# Nombres alternativos que aparecen en los archivos de la Superintendencia
+ALIAS_SECTOR = {"Primaria": "Primario"}
+
+def normalizar_sector(sector):
+    sector = pd.Series(np.asarray(sector, dtype=object)).astype(str).str.strip()
+    return sector.replace(ALIAS_SECTOR).to_numpy(dtype=object)
+
+def _matriz_coeficientes(coeficientes, objetivo):
+    # Una fila por sector y una fila final de NaN para sectores desconocidos
+    filas = [coeficientes[s][objetivo] for s in coeficientes]
+    filas.append((np.nan, np.nan, np.nan))
+    return np.asarray(filas, dtype=float)
+
+def modelo_del_sector(sector, coeficientes=None):
+    """Coeficientes {"ROA": (...), "ROE": (...)} de un sector (NaN si no tiene modelo)."""
+    coeficientes = COEFICIENTES_SECTOR if coeficientes is None else coeficientes
+    sector = normalizar_sector([sector])[0]
+    return coeficientes.get(sector, {"ROA": (np.nan,) * 3, "ROE": (np.nan,) * 3})
+
+def cargar_coeficientes(ruta):
+    """Coeficientes sectoriales desde un JSON {sector: {"ROA": [...], "ROE": [...]}} (None si no hay ruta)."""
+    if ruta is None:
+        return None
+    with open(ruta, encoding="utf-8") as f:
+        datos = json.load(f)
+    return {sector: {obj: tuple(valores) for obj, valores in modelos.items()} for sector, modelos in datos.items()}
+
+def aplicar_modelo_sectorial(ice, cee, sector, coeficientes=None):
+    """Evalúa ROA y ROE buscando los coeficientes de cada fila por su sector."""
+    coeficientes = COEFICIENTES_SECTOR if coeficientes is None else coeficientes
+    # -1 (sector sin modelo) cae en la fila final de NaN de la matriz
+    codigos = pd.Index(list(coeficientes)).get_indexer(normalizar_sector(sector))
+    resultados = []
+    for objetivo in ("ROA", "ROE"):
+        b = _matriz_coeficientes(coeficientes, objetivo)[codigos]
+        resultados.append(b[:, 0] + b[:, 1] * ice + b[:, 2] * cee)
+    return resultados[0], resultados[1]
+
+def cadena_vaic(it, cv, hc, ce):
+    """VA, HCE, SCE, ICE, CEE y VAIC sobre columnas completas."""
+    it = np.asarray(it, dtype=float)
+    cv = np.asarray(cv, dtype=float)
+    hc = np.asarray(hc, dtype=float)
+    ce = np.asarray(ce, dtype=float)
+
+    va = np.maximum(it - cv, 0.0)
+    hce = _dividir_seguro(va, hc)
+    sc = np.maximum(va - hc, 0.0)
+    sce = _dividir_seguro(sc, va)
+    ice = hce + sce
+    cee = _dividir_seguro(va, ce)
+    vaic = ice + cee
+    return {"VA": va, "HCE": hce, "SCE": sce, "ICE": ice, "CEE": cee, "VAIC": vaic}
+
+def calcular_indicadores_lote(it, cv, hc, ce, sector, coeficientes=None):
+    """Calcula VA, HCE, SCE, CEE, VAIC, ROA y ROE sobre columnas completas."""
+    cadena = cadena_vaic(it, cv, hc, ce)
+    roa, roe = aplicar_modelo_sectorial(cadena["ICE"], cadena["CEE"], sector, coeficientes)
+    return pd.DataFrame({
+        "VA": cadena["VA"], "HCE": cadena["HCE"], "SCE": cadena["SCE"], "CEE": cadena["CEE"],
+        "VAIC": cadena["VAIC"], "ROA": roa, "ROE": roe
+    })
+
+# ==============================================
+# === LECTURA Y PUNTUACIÓN POR BLOQUES ===
+# ==============================================
+def _normalizar_columnas(df):
+    # Nombres de columna tolerantes a mayúsculas/minúsculas y espacios
+    renombres = {}
+    for col in df.columns:
+        limpio = str(col).strip()
+        if limpio.upper() in ("IT", "CV", "HC", "CE", "ROA", "ROE"):
+            renombres[col] = limpio.upper()
+        elif limpio.lower() == "sector":
+            renombres[col] = "sector"
+        elif limpio.lower() in ALIAS_IDENTIFICADORES:
+            renombres[col] = ALIAS_IDENTIFICADORES[limpio.lower()]
+    df = df.rename(columns=renombres)
+    faltantes = [c for c in COLUMNAS_LOTE if c not in df.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el archivo: {', '.join(faltantes)}")
+    return df
+
+def _nombre_fuente(fuente):
+    return getattr(fuente, "name", str(fuente)).lower()
+
+def _tamano_fuente(fuente):
+    if isinstance(fuente, (str, os.PathLike)):
+        return os.path.getsize(fuente)
+    try:
+        posicion = fuente.tell()
+        fuente.seek(0, os.SEEK_END)
+        tamano = fuente.tell()
+        fuente.seek(posicion)
+        return tamano
+    except Exception:
+        return None
+
+def _bloques_xlsx(fuente, tamano_bloque):
+    from openpyxl import load_workbook
+    libro = load_workbook(fuente, read_only=True, data_only=True)
+    try:
+        hoja = libro.active
+        total = max((hoja.max_row or 1) - 1, 1)
+        filas = hoja.iter_rows(values_only=True)
+        encabezado = next(filas, None)
+        if encabezado is None:
+            return
+        leidas = 0
+        bloque = []
+        for fila in filas:
+            bloque.append(fila)
+            if len(bloque) == tamano_bloque:
+                leidas += len(bloque)
+                yield pd.DataFrame(bloque, columns=encabezado), min(leidas / total, 1.0)
+                bloque = []
+        if bloque:
+            yield pd.DataFrame(bloque, columns=encabezado), 1.0
+    finally:
+        libro.close()
+
+def _bloques_csv(fuente, tamano_bloque):
+    tamano = _tamano_fuente(fuente)
+    propio = isinstance(fuente, (str, os.PathLike))
+    manejador = open(fuente, "rb") if propio else fuente
+    try:
+        for bloque in pd.read_csv(manejador, chunksize=tamano_bloque):
+            fraccion = min(manejador.tell() / tamano, 1.0) if tamano else 0.0
+            yield bloque, fraccion
+    finally:
+        if propio:
+            manejador.close()
+
+def iterar_bloques(fuente, tamano_bloque=TAMANO_BLOQUE):
+    """Lee un CSV/XLSX por bloques; devuelve (DataFrame, fracción leída) por bloque."""
+    if _nombre_fuente(fuente).endswith((".xlsx", ".xlsm")):
+        bloques = _bloques_xlsx(fuente, tamano_bloque)
+    else:
+        bloques = _bloques_csv(fuente, tamano_bloque)
+    for bloque, fraccion in bloques:
+        yield _normalizar_columnas(bloque), fraccion
+
+def leer_archivo_lote(archivo):
+    return pd.concat([bloque for bloque, _ in iterar_bloques(archivo)], ignore_index=True)
+
+def puntuar_lote(df, coeficientes=None):
+    df = df.assign(sector=normalizar_sector(df["sector"]))
+    resultados = calcular_indicadores_lote(
+        df["IT"].to_numpy(), df["CV"].to_numpy(), df["HC"].to_numpy(),
+        df["CE"].to_numpy(), df["sector"].to_numpy(), coeficientes
+    )
+    resultados.index = df.index
+    # ROA/ROE observados (si vienen en el archivo) se conservan junto a los estimados
+    df = df.rename(columns={"ROA": "ROA_observado", "ROE": "ROE_observado"})
+    return pd.concat([df, resultados], axis=1)
+
+# ==============================================
+# === VALIDACIÓN DE ENTRADAS ===
+# ==============================================
+# Cada motivo es un bit del código de rechazo de la fila (0 = fila válida)
+MOTIVOS_RECHAZO = {
+    "FALTANTE": "Falta IT, CV, HC, CE o el sector (o no es un número finito)",
+    "NEGATIVO": "IT o CV negativos",
+    "CV_MAYOR_IT": "CV mayor que IT: el VA sería negativo",
+    "VA_CERO": "IT igual a CV: VA cero (denominador de SCE)",
+    "HC_NO_POSITIVO": "HC cero o negativo (denominador de HCE)",
+    "CE_NO_POSITIVO": "CE cero o negativo (denominador de CEE)",
+    "ATIPICO": "HCE o CEE extremos para su sector (z robusto)",
+}
+_BITS = {motivo: np.uint16(1 << i) for i, motivo in enumerate(MOTIVOS_RECHAZO)}
+# |z| robusto a partir del cual una fila es atípica (3.5 es el umbral habitual de
+# "posible atípico"; aquí solo se rechazan los extremos)
+UMBRAL_ATIPICOS = 5.0
+
+# Filas válidas mínimas de un sector para aplicar la regla de atípicos: con menos,
+# la mediana y la MAD no dicen nada de la distribución del sector
+MINIMO_ATIPICOS = 10
+# Filas por sector con que se calculan la mediana y la MAD en entradas muy grandes
+MUESTRA_ATIPICOS = 200_000
+
+def _reglas_basicas(df):
+    """Códigos de las reglas fila a fila (sin atípicos) y las columnas ya convertidas."""
+    it, cv, hc, ce = (np.asarray(pd.to_numeric(df[c], errors="coerce"), dtype=float) for c in ("IT", "CV", "HC", "CE"))
+    sector = pd.Series(df["sector"]).astype("string").str.strip()
+    reglas = {
+        "FALTANTE": ~(np.isfinite(it) & np.isfinite(cv) & np.isfinite(hc) & np.isfinite(ce))
+                    | sector.fillna("").eq("").to_numpy(),
+        "NEGATIVO": (it < 0) | (cv < 0),
+        "CV_MAYOR_IT": cv > it,
+        "VA_CERO": cv == it,
+        "HC_NO_POSITIVO": hc <= 0,
+        "CE_NO_POSITIVO": ce <= 0,
+    }
+    codigos = np.zeros(len(it), dtype=np.uint16)
+    for motivo, mascara in reglas.items():
+        codigos[mascara] |= _BITS[motivo]
+    validas = np.flatnonzero(codigos == 0)
+    va = it[validas] - cv[validas]
+    # En logaritmos: HCE y CEE son cocientes positivos muy asimétricos
+    logaritmos = np.column_stack([np.log(va / hc[validas]), np.log(va / ce[validas])])
+    grupos = sector.replace(ALIAS_SECTOR).to_numpy(dtype=object)[validas]
+    return codigos, validas, grupos, logaritmos
+
+class ReferenciaAtipicos:
+    """Mediana y MAD por sector del log HCE y el log CEE de las filas válidas de toda la entrada.
+
+    Se alimenta bloque a bloque, así que el resultado no depende del tamaño de
+    bloque. Si un sector supera ``muestra`` filas se conserva una muestra
+    uniforme: las filas con menor clave aleatoria (una clave por fila leída).
+    """
+
+    def __init__(self, muestra=MUESTRA_ATIPICOS, semilla=0):
+        self.muestra = muestra
+        self.n = {}
+        self._azar = np.random.default_rng(semilla)
+        self._claves = {}
+        self._valores = {}
+        self._estadisticos = None
+
+    def actualizar(self, df):
+        _, validas, grupos, logaritmos = _reglas_basicas(df)
+        self.agregar(grupos, logaritmos, self._azar.random(len(df))[validas])
+
+    def agregar(self, grupos, logaritmos, claves=None):
+        if claves is None:
+            claves = self._azar.random(len(grupos))
+        codigos, sectores = pd.factorize(grupos)
+        for i, sector in enumerate(sectores):
+            filas = codigos == i
+            claves_s = np.concatenate([self._claves.get(sector, np.empty(0)), claves[filas]])
+            valores_s = np.concatenate([self._valores.get(sector, np.empty((0, 2))), logaritmos[filas]])
+            if len(claves_s) > self.muestra:
+                conservar = np.argpartition(claves_s, self.muestra)[:self.muestra]
+                claves_s, valores_s = claves_s[conservar], valores_s[conservar]
+            self._claves[sector], self._valores[sector] = claves_s, valores_s
+            self.n[sector] = self.n.get(sector, 0) + int(filas.sum())
+        self._estadisticos = None
+
+    def _calcular(self):
+        # Una fila por sector con datos suficientes y una final (MAD 0) para los demás
+        sectores = [s for s, n in self.n.items() if n >= MINIMO_ATIPICOS]
+        medianas = np.zeros((len(sectores) + 1, 2))
+        mads = np.zeros((len(sectores) + 1, 2))
+        for i, sector in enumerate(sectores):
+            medianas[i] = np.median(self._valores[sector], axis=0)
+            mads[i] = np.median(np.abs(self._valores[sector] - medianas[i]), axis=0)
+        self._estadisticos = pd.Index(sectores), medianas, mads
+
+    def z(self, grupos, logaritmos):
+        """Mayor |z| robusto, 0.6745·|x − mediana| / MAD, entre log HCE y log CEE (0 sin referencia o MAD 0)."""
+        if self._estadisticos is None:
+            self._calcular()
+        sectores, medianas, mads = self._estadisticos
+        fila = sectores.get_indexer(grupos)
+        desvio = np.abs(logaritmos - medianas[fila])
+        z = np.zeros_like(desvio)
+        np.divide(0.6745 * desvio, mads[fila], out=z, where=mads[fila] > 0)
+        return z.max(axis=1, initial=0.0)
+
+def validar_lote(df, umbral_atipicos=UMBRAL_ATIPICOS, referencia=None):
+    """Código de rechazo de cada fila: suma de los bits de MOTIVOS_RECHAZO (0 = válida).
+
+    Las reglas se evalúan sobre columnas completas. Los atípicos se buscan solo
+    entre las filas que pasan las demás reglas, comparando el logaritmo de su HCE
+    y su CEE con la mediana y la MAD de su sector en ``referencia`` (por
+    defecto, las propias filas de ``df``); los sectores con menos de
+    MINIMO_ATIPICOS filas válidas no se evalúan. ``umbral_atipicos=None`` omite
+    esa regla.
+    """
+    codigos, validas, grupos, logaritmos = _reglas_basicas(df)
+    if umbral_atipicos is not None and len(validas):
+        if referencia is None:
+            referencia = ReferenciaAtipicos()
+            referencia.agregar(grupos, logaritmos)
+        codigos[validas[referencia.z(grupos, logaritmos) > umbral_atipicos]] |= _BITS["ATIPICO"]
+    return codigos
+
+def motivos_rechazo(codigos):
+    """Texto "MOTIVO;MOTIVO" de cada código (vacío para las filas válidas)."""
+    distintos, inversa = np.unique(np.asarray(codigos, dtype=np.uint16), return_inverse=True)
+    textos = np.array([";".join(m for m, bit in _BITS.items() if c & bit) for c in distintos], dtype=object)
+    return textos[inversa.ravel()]
+
+class RegistroRechazos:
+    """Filas rechazadas y conteo por motivo, acumulados bloque a bloque."""
+
+    def __init__(self):
+        self.filas = 0
+        self.motivos = dict.fromkeys(MOTIVOS_RECHAZO, 0)
+
+    def actualizar(self, codigos):
+        rechazados = codigos[codigos != 0]
+        self.filas += len(rechazados)
+        for motivo, bit in _BITS.items():
+            self.motivos[motivo] += int(np.count_nonzero(rechazados & bit))
+
+    def resumen(self):
+        return pd.DataFrame(
+            [{"motivo": m, "descripcion": MOTIVOS_RECHAZO[m], "filas": n} for m, n in self.motivos.items() if n],
+            columns=["motivo", "descripcion", "filas"]
+        )
+
+class AcumuladorSectores:
+    """Estadísticos por sector (n, media, desviación, mínimo, máximo) acumulados bloque a bloque."""
+
+    def __init__(self, columnas=INDICADORES_LOTE):
+        self.columnas = list(columnas)
+        self.n = {}
+        self.media = {}
+        self.m2 = {}
+        self.minimo = {}
+        self.maximo = {}
+
+    def actualizar(self, df):
+        grupos = df.groupby("sector")[self.columnas]
+        n_b = grupos.count()
+        media_b = grupos.mean()
+        m2_b = grupos.var(ddof=0) * n_b
+        min_b = grupos.min()
+        max_b = grupos.max()
+        for sector in n_b.index:
+            nb = n_b.loc[sector].to_numpy(dtype=float)
+            mb = media_b.loc[sector].to_numpy(dtype=float)
+            m2b = m2_b.loc[sector].to_numpy(dtype=float)
+            if sector not in self.n:
+                self.n[sector] = nb
+                self.media[sector] = mb
+                self.m2[sector] = m2b
+                self.minimo[sector] = min_b.loc[sector].to_numpy(dtype=float)
+                self.maximo[sector] = max_b.loc[sector].to_numpy(dtype=float)
+                continue
+            # Combinación de Chan et al. para media y varianza por bloques
+            na = self.n[sector]
+            total = na + nb
+            delta = mb - self.media[sector]
+            peso = _dividir_seguro(nb, total)
+            self.media[sector] = self.media[sector] + delta * peso
+            self.m2[sector] = self.m2[sector] + m2b + delta ** 2 * na * peso
+            self.n[sector] = total
+            self.minimo[sector] = np.fmin(self.minimo[sector], min_b.loc[sector].to_numpy(dtype=float))
+            self.maximo[sector] = np.fmax(self.maximo[sector], max_b.loc[sector].to_numpy(dtype=float))
+
+    def resumen(self):
+        filas = []
+        for sector in sorted(self.n):
+            n = self.n[sector]
+            desviacion = np.sqrt(_dividir_seguro(self.m2[sector], np.maximum(n - 1, 0)))
+            for i, columna in enumerate(self.columnas):
+                filas.append({
+                    "sector": sector, "indicador": columna, "n": int(n[i]),
+                    "media": self.media[sector][i], "desviacion": desviacion[i],
+                    "minimo": self.minimo[sector][i], "maximo": self.maximo[sector][i]
+                })
+        return pd.DataFrame(filas, columns=["sector", "indicador", "n", "media", "desviacion", "minimo", "maximo"])
+
+class _EscritorCSV:
+    """CSV escrito por bloques con pyarrow; el primer bloque fija el esquema.
+
+    Con ``como_texto`` todas las columnas se escriben como texto, para bloques
+    cuyas columnas no tienen un tipo estable (p. ej. filas rechazadas).
+    """
+
+    def __init__(self, destino, como_texto=False):
+        self.destino = destino
+        self.como_texto = como_texto
+        self._escritor = None
+
+    def escribir(self, df):
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+
+        if self.como_texto:
+            # Las columnas object pueden mezclar números y texto; el resto se convierte en Arrow
+            mixtas = df.columns[df.dtypes == object]
+            df = df.astype(dict.fromkeys(mixtas, "string"))
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+        if self._escritor is None:
+            self._esquema = tabla.schema.remove_metadata()
+            if self.como_texto:
+                self._esquema = pa.schema([(nombre, pa.string()) for nombre in self._esquema.names])
+            self._escritor = pa_csv.CSVWriter(self.destino, self._esquema)
+        self._escritor.write_table(tabla.cast(self._esquema))
+
+    def cerrar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+
+def procesar_por_bloques(fuente, destino=None, tamano_bloque=TAMANO_BLOQUE,
+                         limite_memoria=LIMITE_FILAS_MEMORIA, al_avanzar=None, coeficientes=None,
+                         destino_rechazos=None, umbral_atipicos=UMBRAL_ATIPICOS):
+    """Lee, valida, puntúa y agrega el archivo bloque a bloque.
+
+    Los resultados se escriben en ``destino`` (CSV) a medida que se calculan y solo se
+    conservan en memoria mientras no superen ``limite_memoria`` filas. Las filas que no
+    pasan ``validar_lote`` no se puntúan: se cuentan en el registro de rechazos y, si
+    hay ``destino_rechazos``, se escriben allí con su número de fila y sus motivos.
+    Con la regla de atípicos activa, la entrada se lee dos veces: la primera solo para
+    la referencia por sector (``ReferenciaAtipicos``).
+    Devuelve (acumulador, resultados, filas puntuadas, rechazos).
+    """
+    acumulador = AcumuladorSectores()
+    rechazos = RegistroRechazos()
+    conservados = []
+    filas = 0
+    leidas = 0
+    inicio = time.perf_counter()
+    escritor = _EscritorCSV(destino) if destino is not None else None
+    escritor_rechazos = _EscritorCSV(destino_rechazos, como_texto=True) if destino_rechazos is not None else None
+    referencia = None
+    try:
+        if umbral_atipicos is not None:
+            # Primera pasada: la mediana y la MAD de cada sector salen de toda la entrada,
+            # no de cada bloque (si no, los rechazos dependerían de tamano_bloque)
+            referencia = ReferenciaAtipicos()
+            for bloque, fraccion in iterar_bloques(fuente, tamano_bloque):
+                referencia.actualizar(bloque)
+                if al_avanzar is not None:
+                    al_avanzar(0, fraccion / 2, time.perf_counter() - inicio)
+            if not isinstance(fuente, (str, os.PathLike)):
+                fuente.seek(0)
+        for bloque, fraccion in iterar_bloques(fuente, tamano_bloque):
+            if referencia is not None:
+                fraccion = 0.5 + fraccion / 2
+            codigos = validar_lote(bloque, umbral_atipicos, referencia)
+            rechazos.actualizar(codigos)
+            validas = codigos == 0
+            if not validas.all():
+                if escritor_rechazos is not None:
+                    rechazadas = bloque[~validas].assign(
+                        fila=leidas + np.flatnonzero(~validas) + 1, motivos=motivos_rechazo(codigos[~validas])
+                    )
+                    escritor_rechazos.escribir(rechazadas)
+                bloque = bloque[validas]
+            leidas += len(codigos)
+            if len(bloque):
+                puntuado = puntuar_lote(bloque, coeficientes)
+                acumulador.actualizar(puntuado)
+                if escritor is not None:
+                    escritor.escribir(puntuado)
+                filas += len(puntuado)
+                if conservados is not None:
+                    if filas <= limite_memoria:
+                        conservados.append(puntuado)
+                    else:
+                        conservados = None
+            if al_avanzar is not None:
+                al_avanzar(filas, fraccion, time.perf_counter() - inicio)
+    finally:
+        for abierto in (escritor, escritor_rechazos):
+            if abierto is not None:
+                abierto.cerrar()
+    resultados = None
+    if conservados:
+        resultados = pd.concat(conservados, ignore_index=True)
+    return acumulador, resultados, filas, rechazos
+
+
+# ==============================================
+# === RE-ESTIMACIÓN DE LOS MODELOS SECTORIALES ===
+# ==============================================
+def huella_datos(df):
+    """Hash estable del contenido de un DataFrame (clave de caché de los modelos)."""
+    filas = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha256(filas.tobytes() + "|".join(map(str, df.columns)).encode()).hexdigest()
+
+def datos_estimacion(df):
+    """(X, Y, sectores, validas): regresores ICE y CEE, objetivos ROA y ROE observados y filas utilizables."""
+    faltantes = [c for c in ["ROA", "ROE"] if c not in df.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas observadas para estimar: {', '.join(faltantes)}")
+    cadena = cadena_vaic(df["IT"].to_numpy(), df["CV"].to_numpy(), df["HC"].to_numpy(), df["CE"].to_numpy())
+    X = np.column_stack([cadena["ICE"], cadena["CEE"]])
+    Y = df[["ROA", "ROE"]].to_numpy(dtype=float)
+    sectores = normalizar_sector(df["sector"])
+    validas = np.isfinite(X).all(axis=1) & np.isfinite(Y).all(axis=1)
+    return X, Y, sectores, validas
+
+def estimar_coeficientes(df):
+    """Ajusta ROA y ROE sobre ICE y CEE por sector con un panel que trae ROA/ROE observados.
+
+    Las ecuaciones normales de cada sector se arman con sumas agrupadas
+    (``np.bincount``) sobre los datos centrados en la media del sector, y todos
+    los sectores se resuelven en un solo ``np.linalg.solve`` sobre los sistemas
+    (k, 2, 2) apilados; solo un sector singular (p. ej. CEE constante) se ajusta
+    aparte con ``lstsq``. Devuelve (coeficientes, diagnostico): el primero con la
+    misma forma que COEFICIENTES_SECTOR y el segundo con n y R² por sector y
+    objetivo.
+    """
+    X, Y, sectores, validas = datos_estimacion(df)
+    codigos, nombres = pd.factorize(sectores[validas])
+    n_sector = np.bincount(codigos, minlength=len(nombres))
+    # Sectores con menos de 3 filas no tienen un ajuste determinado: quedan fuera
+    usar = n_sector[codigos] >= 3
+    codigos, X, Y = codigos[usar], X[validas][usar], Y[validas][usar]
+    k = len(nombres)
+    n = np.maximum(n_sector, 1)[:, np.newaxis]
+
+    def sumas(columnas):
+        return np.column_stack([np.bincount(codigos, columnas[:, j], minlength=k) for j in range(columnas.shape[1])])
+
+    # Centrar por sector evita elevar al cuadrado la escala de ICE en X'X
+    media_x, media_y = sumas(X) / n, sumas(Y) / n
+    Xc, Yc = X - media_x[codigos], Y - media_y[codigos]
+    xtx = sumas(np.column_stack([Xc[:, 0] * Xc[:, 0], Xc[:, 0] * Xc[:, 1], Xc[:, 1] * Xc[:, 1]]))
+    xtx = xtx[:, [0, 1, 1, 2]].reshape(k, 2, 2)
+    xty = sumas(np.column_stack([Xc[:, i] * Yc[:, j] for i in range(2) for j in range(2)])).reshape(k, 2, 2)
+    with np.errstate(all="ignore"):
+        # NaN (sector vacío o descartado) cuenta como singular
+        singulares = ~(np.linalg.cond(xtx) < 1e12)
+    pendientes = np.zeros((k, 2, 2))
+    if (~singulares).any():
+        pendientes[~singulares] = np.linalg.solve(xtx[~singulares], xty[~singulares])
+    for i in np.flatnonzero(singulares & (n_sector >= 3)):
+        filas = codigos == i
+        pendientes[i] = np.linalg.lstsq(Xc[filas], Yc[filas], rcond=None)[0]
+    intercepto = media_y - np.einsum("kp,kpj->kj", media_x, pendientes)
+    beta = np.concatenate([intercepto[:, np.newaxis, :], pendientes], axis=1)
+    residuo = Yc - np.einsum("np,npj->nj", Xc, pendientes[codigos])
+
+    # R² por sector y objetivo con sumas agrupadas
+    suma_res, suma_tot = sumas(residuo ** 2), sumas(Yc ** 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2 = np.where(suma_tot > 0, 1.0 - suma_res / suma_tot, np.where(suma_res > 0, 0.0, 1.0))
+
+    coeficientes = {}
+    diagnostico = []
+    for i, sector in enumerate(nombres):
+        if n_sector[i] < 3:
+            continue
+        coeficientes[sector] = {}
+        for j, objetivo in enumerate(["ROA", "ROE"]):
+            intercepto, b_ice, b_cee = (float(v) for v in beta[i, :, j])
+            coeficientes[sector][objetivo] = (intercepto, b_ice, b_cee)
+            diagnostico.append({
+                "sector": sector, "objetivo": objetivo, "n": int(n_sector[i]),
+                "intercepto": intercepto, "b_ICE": b_ice, "b_CEE": b_cee, "R2": float(r2[i, j])
+            })
+    return coeficientes, pd.DataFrame(diagnostico)
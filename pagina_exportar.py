@@ -0,0 +1,150 @@
+"""Página Exportar: reporte PDF individual, reportes por lotes en un ZIP y datos completos (Parquet, Arrow, XLSX)."""
+import os
+import time
+from datetime import datetime
+
+import streamlit as st
+
+import metricas
+from exportacion import FORMATOS, exportar, lotes
+from nucleo import INDICADORES_LOTE
+from reporte_pdf import generar_reporte_pdf, reportes_en_zip
+from sesion import (
+    adoptar_lote, indicadores_sesion, lanzar_trabajo, mostrar_historial, mostrar_trabajo, trabajo_sesion
+)
+
+@metricas.medido("pagina.exportar")
+def mostrar_exportacion():
+    st.title("Exportar resultados en PDF")
+    st.markdown("""
+    <style>
+        div.stButton > button {
+            font-size: 20px !important; padding: 12px !important; background-color: #1D4ED8 !important;
+            color: white !important; border: 2px solid #1E3A8A !important; border-radius: 10px !important;
+            font-weight: bold !important;
+        }
+        div.stButton > button:hover {
+            background-color: #1E40AF !important; transform: translateY(-3px) !important;
+            box-shadow: 0 8px 20px rgba(29, 78, 216, 0.3) !important;
+        }
+    </style>
+    """, unsafe_allow_html=True)
+
+    lote = adoptar_lote()
+    if st.session_state.get("resultados_lote") is not None:
+        mostrar_exportacion_lote()
+    elif trabajo_sesion("lote") is not None:
+        mostrar_trabajo("lote")
+    if lote is not None:
+        mostrar_exportacion_datos(lote.resultado["filas"])
+
+    with st.expander("Cargar desde el histórico"):
+        mostrar_historial("exp")
+
+    if st.session_state.get("va", 0.0) == 0.0:
+        st.warning("Por favor, calcula los indicadores primero en la página de Indicadores.")
+        return
+
+    st.markdown("### Resultados Calculados")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown(f"**VA:** {st.session_state.va:,.2f}")
+        st.markdown(f"**HCE:** {st.session_state.hce:.4f}")
+        st.markdown(f"**SCE:** {st.session_state.sce:.4f}")
+    with col2:
+        st.markdown(f"**VAIC™:** {st.session_state.vaic:.4f}")
+        st.markdown(f"**ROA:** {st.session_state.roa:.4f}")
+        st.markdown(f"**ROE:** {st.session_state.roe:.4f}")
+
+    if st.button("Generar PDF", use_container_width=True, key="btn_pdf"):
+        buffer = generar_reporte_pdf(indicadores_sesion(), st.session_state.sector_indicadores)
+        st.success("¡PDF generado con éxito!")
+        st.download_button(
+            label="Descargar Reporte Completo (PDF)",
+            data=buffer,
+            file_name=f"Reporte_VAIC_{st.session_state.sector_indicadores}_{datetime.now().strftime('%Y%m%d')}.pdf",
+            mime="application/pdf",
+            use_container_width=True
+        )
+
+def _trabajo_zip(trabajo, resultados, columna_id):
+    destino = os.path.join(trabajo.carpeta(), "reportes.zip")
+    total = len(resultados)
+    inicio = time.perf_counter()
+
+    def al_avanzar(hechos):
+        if hechos % 25 == 0 or hechos == total:
+            velocidad = hechos / max(time.perf_counter() - inicio, 1e-9)
+            trabajo.avanzar(hechos / total, f"{hechos:,}/{total:,} reportes · {velocidad:,.0f} PDF/s")
+
+    def filas():
+        # Por tramos, para no materializar todos los registros a la vez
+        for desde in range(0, total, 1000):
+            yield from resultados.iloc[desde:desde + 1000].to_dict("records")
+
+    with open(destino, "wb") as f:
+        reportes_en_zip(filas(), f, al_avanzar=al_avanzar, columna_id=columna_id)
+    return {"destino": destino, "total": total}
+
+def mostrar_exportacion_lote():
+    resultados = st.session_state.resultados_lote
+    st.markdown("### Reportes por lotes")
+    st.caption(f"{len(resultados):,} empresas del último cálculo por lotes: un PDF por fila, empaquetados en un ZIP.")
+    opciones_id = ["(número de fila)"] + [c for c in resultados.columns if c not in INDICADORES_LOTE]
+    columna_id = st.selectbox("Nombrar cada reporte por:", opciones_id, key="columna_id_zip")
+    if st.button("Generar reportes (ZIP)", use_container_width=True, key="btn_zip"):
+        lanzar_trabajo("zip", f"Reportes PDF ({len(resultados):,})", _trabajo_zip, resultados,
+                       None if columna_id == "(número de fila)" else columna_id)
+
+    trabajo = mostrar_trabajo("zip")
+    if trabajo is not None:
+        st.success(f"¡{trabajo.resultado['total']:,} reportes generados en {trabajo.duracion:.1f} s!")
+        with open(trabajo.resultado["destino"], "rb") as f:
+            st.download_button(
+                label="Descargar reportes (ZIP)",
+                data=f,
+                file_name=f"Reportes_VAIC_{datetime.now().strftime('%Y%m%d')}.zip",
+                mime="application/zip",
+                use_container_width=True
+            )
+    st.markdown("---")
+
+def _trabajo_datos(trabajo, fuente, total, formato):
+    destino = os.path.join(trabajo.carpeta(), f"datos{FORMATOS[formato][1]}")
+    inicio = time.perf_counter()
+
+    def al_avanzar(filas):
+        velocidad = filas / max(time.perf_counter() - inicio, 1e-9)
+        trabajo.avanzar(filas / max(total, 1), f"{filas:,}/{total:,} filas · {velocidad:,.0f} filas/s")
+
+    with metricas.Tramo(f"exportar.{formato}"):
+        filas = exportar(lotes(fuente, formato), destino, formato, al_avanzar=al_avanzar)
+    return {"destino": destino, "formato": formato, "filas": filas}
+
+def mostrar_exportacion_datos(total):
+    st.markdown("### Datos completos")
+    st.caption(f"Las {total:,} filas del último cálculo por lotes (entradas, indicadores y sector) para R, Stata o Python.")
+    formato = st.selectbox("Formato:", list(FORMATOS), format_func=lambda f: FORMATOS[f][0], key="formato_datos")
+    if formato == "xlsx":
+        st.caption("XLSX se escribe fila por fila (unas 6.000 filas/s): para paneles grandes conviene Parquet o Arrow.")
+    if st.button("Exportar datos", use_container_width=True, key="btn_exportar_datos"):
+        # En memoria, las columnas numéricas se escriben sin copiarse; si no, se relee el CSV por bloques
+        fuente = st.session_state.get("resultados_lote")
+        if fuente is None:
+            fuente = st.session_state.archivo_resultados_lote
+        lanzar_trabajo("datos", f"Exportación {FORMATOS[formato][0]}", _trabajo_datos, fuente, total, formato)
+
+    trabajo = mostrar_trabajo("datos")
+    if trabajo is not None:
+        nombre, extension, mime = FORMATOS[trabajo.resultado["formato"]]
+        st.success(f"¡{trabajo.resultado['filas']:,} filas exportadas a {nombre} en {trabajo.duracion:.1f} s!")
+        with open(trabajo.resultado["destino"], "rb") as f:
+            st.download_button(
+                label=f"Descargar datos ({nombre})",
+                data=f,
+                file_name=f"Datos_VAIC_{datetime.now().strftime('%Y%m%d')}{extension}",
+                mime=mime,
+                use_container_width=True,
+                key="btn_descargar_datos"
+            )
+    st.markdown("---")
@@ -0,0 +1,715 @@
+"""Página de Indicadores: cálculo individual, por lotes, panel, sensibilidad, simulación y re-estimación."""
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+import metricas
+from almacen import huella_coeficientes
+from explorador import TAMANOS_PAGINA, TablaIndexada
+from graficos import (
+    figura_barras, figura_barras_bandas, figura_radar, figura_radar_pares, figura_tendencias, tabla_resumen
+)
+from nucleo import (
+    COEFICIENTES_SECTOR, INDICADORES_LOTE, LIMITE_FILAS_MEMORIA, MOTIVOS_RECHAZO, calcular_indicadores_lote,
+    estimar_coeficientes, huella_datos, leer_archivo_lote, motivos_rechazo, procesar_por_bloques, validar_lote
+)
+from panel import VENTANA_PANEL, actualizar_panel, calcular_panel
+from pares import INDICADORES_PARES, ReferenciaSectorial
+from sesion import (
+    adoptar_lote, almacen, coeficientes_activos, indicadores_sesion, lanzar_trabajo, mostrar_historial, mostrar_trabajo
+)
+from simulacion import DISTRIBUCIONES, PERCENTILES, VARIABLES_ENTRADA, malla_sensibilidad, simular_montecarlo
+from validacion import diagnosticar_modelos
+
+# Motivos de rechazo que el formulario individual puede producir: sus entradas son números
+# no negativos (min_value=0) y siempre hay un sector elegido, así que FALTANTE y NEGATIVO no aplican
+AVISOS_INDIVIDUAL = ("CV_MAYOR_IT", "VA_CERO", "HC_NO_POSITIVO", "CE_NO_POSITIVO")
+# Carpeta del servidor con paneles grandes que se pueden leer por ruta; sin ella, solo se admiten cargas
+CARPETA_DATOS = os.environ.get("UTA_DATOS")
+
+# ==============================================
+# === RE-ESTIMACIÓN DE LOS MODELOS SECTORIALES ===
+# ==============================================
+@st.cache_data(max_entries=16, show_spinner=False)
+def estimar_coeficientes_cache(huella, _df):
+    # Solo la huella forma la clave; _df no se vuelve a hashear en cada rerun
+    return estimar_coeficientes(_df)
+
+# Persistida en disco: tras el primer cálculo el diagnóstico abre al instante, incluso tras reiniciar
+@st.cache_data(max_entries=16, show_spinner=False, persist="disk")
+def diagnosticar_modelos_cache(huella, replicas, pliegues, semilla, _df):
+    return diagnosticar_modelos(_df, replicas=replicas, pliegues=pliegues, semilla=semilla)
+
+
+def mostrar_reestimacion():
+    st.markdown("### Re-estimación de los modelos sectoriales")
+    st.caption("Columnas requeridas: IT, CV, HC, CE, sector y los valores observados de ROA y ROE.")
+    archivo = st.file_uploader("Carga un panel CSV o XLSX", type=["csv", "xlsx"], key="archivo_panel_modelos")
+
+    if st.session_state.get("coeficientes_sector"):
+        st.info("Se están usando coeficientes re-estimados.")
+        if st.button("Restaurar coeficientes originales", key="btn_restaurar_coef"):
+            st.session_state.coeficientes_sector = None
+            st.rerun()
+    if archivo is None:
+        return
+
+    try:
+        df = leer_archivo_lote(archivo)
+        huella = huella_datos(df)
+        coeficientes, diagnostico = estimar_coeficientes_cache(huella, df)
+    except Exception as e:
+        st.error(f"No se pudo estimar: {e}")
+        return
+    if diagnostico.empty:
+        st.warning("No hay suficientes filas válidas por sector para estimar.")
+        return
+
+    st.dataframe(diagnostico, use_container_width=True, hide_index=True)
+    sin_modelo = [s for s in COEFICIENTES_SECTOR if s not in coeficientes]
+    if sin_modelo:
+        st.caption(f"Sin datos suficientes (se mantienen los originales): {', '.join(sin_modelo)}")
+    if st.button("Usar estos coeficientes", key="btn_usar_coef"):
+        st.session_state.coeficientes_sector = {**COEFICIENTES_SECTOR, **coeficientes}
+        st.success("¡Coeficientes actualizados!")
+
+    st.markdown("#### Diagnóstico: validación cruzada y bootstrap")
+    col_d1, col_d2, col_d3 = st.columns(3)
+    with col_d1: replicas = st.number_input("Réplicas bootstrap", 100, 20_000, 2000, step=100, key="diag_replicas")
+    with col_d2: pliegues = st.number_input("Pliegues (k)", 2, 20, 5, key="diag_pliegues")
+    with col_d3: semilla = st.number_input("Semilla", 0, 2**31 - 1, 0, key="diag_semilla")
+    if st.button("Diagnosticar modelos", key="btn_diagnosticar"):
+        st.session_state.diagnostico_huella = huella
+    if st.session_state.get("diagnostico_huella") != huella:
+        return
+    inicio = time.perf_counter()
+    with st.spinner("Ajustando réplicas…"):
+        intervalos, validacion = diagnosticar_modelos_cache(huella, int(replicas), int(pliegues), int(semilla), df)
+    st.caption(f"{int(replicas):,} réplicas por sector · {time.perf_counter() - inicio:.2f} s")
+    st.markdown("**R² en muestra y fuera de muestra (validación cruzada)**")
+    st.dataframe(validacion, use_container_width=True, hide_index=True)
+    st.markdown("**Intervalos de confianza al 95 % (percentiles bootstrap)**")
+    st.dataframe(intervalos, use_container_width=True, hide_index=True)
+
+def _trabajo_lote(trabajo, fuente, coeficientes):
+    def al_avanzar(filas, fraccion, duracion):
+        velocidad = filas / duracion if duracion > 0 else 0.0
+        trabajo.avanzar(fraccion, f"{filas:,} filas · {velocidad:,.0f} filas/s")
+
+    destino = os.path.join(trabajo.carpeta(), "resultados.csv")
+    destino_rechazos = os.path.join(trabajo.carpeta(), "rechazos.csv")
+    inicio = time.perf_counter()
+    with metricas.Tramo("calculo.lote"):
+        acumulador, resultados, filas, rechazos = procesar_por_bloques(
+            fuente, destino=destino, al_avanzar=al_avanzar, coeficientes=coeficientes,
+            destino_rechazos=destino_rechazos
+        )
+    return {"acumulador": acumulador, "resultados": resultados, "filas": filas, "rechazos": rechazos,
+            "destino": destino, "destino_rechazos": destino_rechazos, "duracion": time.perf_counter() - inicio}
+
+
+def ruta_datos(ruta):
+    """Ruta absoluta de ``ruta`` (relativa a CARPETA_DATOS) si queda dentro de esa carpeta; si no, None."""
+    from pathlib import Path
+
+    carpeta = Path(CARPETA_DATOS).resolve()
+    # resolve() sigue enlaces simbólicos y "..": lo que se compara es el destino real
+    destino = (carpeta / ruta).resolve()
+    return str(destino) if destino.is_relative_to(carpeta) else None
+
+def mostrar_indicadores_lote():
+    st.markdown("### Cálculo por lotes")
+    st.caption(f"Columnas requeridas: IT, CV, HC, CE y sector ({', '.join(COEFICIENTES_SECTOR)}).")
+    archivo = st.file_uploader("Carga un archivo CSV o XLSX", type=["csv", "xlsx"], key="archivo_lote")
+    ruta = ""
+    if CARPETA_DATOS:
+        ruta = st.text_input(f"…o archivo de {CARPETA_DATOS} en el servidor (paneles grandes):", key="ruta_lote").strip()
+    fuente = archivo if archivo is not None else (ruta or None)
+    if fuente is None:
+        return
+    if isinstance(fuente, str):
+        fuente = ruta_datos(fuente)
+        if fuente is None:
+            st.error(f"Solo se pueden leer archivos dentro de {CARPETA_DATOS}.")
+            return
+        if not os.path.isfile(fuente):
+            st.error(f"No existe el archivo: {ruta}")
+            return
+
+    # El cálculo corre en segundo plano: la página sigue respondiendo mientras tanto
+    origen = (archivo.file_id if archivo is not None else ruta, huella_coeficientes(coeficientes_activos()))
+    if st.session_state.get("origen_lote") != origen:
+        lanzar_trabajo("lote", "Cálculo por lotes", _trabajo_lote, fuente, coeficientes_activos())
+        st.session_state.origen_lote = origen
+    if mostrar_trabajo("lote") is None:
+        return
+    trabajo = adoptar_lote()
+    acumulador, resultados, filas = (trabajo.resultado[k] for k in ("acumulador", "resultados", "filas"))
+    destino = trabajo.resultado["destino"]
+    st.success(f"¡{filas:,} filas calculadas en {trabajo.resultado['duracion']:.2f} s!")
+    desconocidos = [s for s in acumulador.n if s not in coeficientes_activos()]
+    if desconocidos:
+        st.warning(f"Sectores sin modelo (ROA/ROE vacíos): {', '.join(map(str, desconocidos))}")
+    rechazos = trabajo.resultado["rechazos"]
+    if rechazos.filas:
+        st.warning(f"{rechazos.filas:,} filas rechazadas por la validación: no se puntuaron.")
+        with st.expander("Filas rechazadas"):
+            st.dataframe(rechazos.resumen(), use_container_width=True, hide_index=True)
+            with open(trabajo.resultado["destino_rechazos"], "rb") as f:
+                st.download_button(
+                    label="Descargar filas rechazadas (CSV)",
+                    data=f,
+                    file_name=f"Rechazos_VAIC_{datetime.now().strftime('%Y%m%d')}.csv",
+                    mime="text/csv",
+                    key="btn_descargar_rechazos"
+                )
+
+    st.markdown("#### Resumen por sector")
+    resumen = acumulador.resumen()
+    medias = resumen.pivot(index="sector", columns="indicador", values="media")[acumulador.columnas]
+    st.dataframe(medias, use_container_width=True)
+    with st.expander("Estadísticos completos por sector"):
+        st.dataframe(resumen, use_container_width=True, hide_index=True)
+
+    if resultados is None:
+        st.info(f"El resultado supera {LIMITE_FILAS_MEMORIA:,} filas; se guardó completo en: {destino}")
+        return
+    if {"empresa", "anio"} <= set(resultados.columns):
+        if st.button("Guardar en el histórico", key="btn_guardar_lote"):
+            puntuadas, sin_cambios = almacen().guardar_lote(resultados, coeficientes_activos())
+            st.success(f"Histórico actualizado: {puntuadas:,} filas puntuadas, {sin_cambios:,} sin cambios.")
+    else:
+        st.caption("Agrega las columnas empresa y anio para poder guardar el lote en el histórico.")
+    st.markdown("#### Resultados")
+    mostrar_explorador(tabla_explorador(trabajo.id, resultados), "explorador_lote")
+    with open(destino, "rb") as f:
+        st.download_button(
+            label="Descargar resultados (CSV)",
+            data=f,
+            file_name=f"Resultados_VAIC_{datetime.now().strftime('%Y%m%d')}.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
+
+# ==============================================
+# === EXPLORADOR DE RESULTADOS ===
+# ==============================================
+MONTOS = ["IT", "CV", "HC", "CE", "VA"]
+
+def formato_columnas(df):
+    """Formato de los números al mostrarlos; los datos que se envían siguen siendo numéricos."""
+    formatos = {}
+    for columna in df.columns:
+        if columna == "anio":
+            formatos[columna] = st.column_config.NumberColumn(format="%d")
+        elif columna in MONTOS:
+            formatos[columna] = st.column_config.NumberColumn(format="%.2f")
+        elif pd.api.types.is_float_dtype(df[columna]):
+            formatos[columna] = st.column_config.NumberColumn(format="%.4f")
+    return formatos
+
+# Una tabla indexada por trabajo, compartida por las sesiones que miran el mismo resultado
+@st.cache_resource(max_entries=4, show_spinner=False)
+def tabla_explorador(id_trabajo, _resultados):
+    return TablaIndexada(_resultados)
+
+# Fragmento: filtrar, ordenar o cambiar de página solo vuelve a ejecutar el explorador,
+# y al navegador solo viaja la página visible.
+@st.fragment
+def mostrar_explorador(tabla, prefijo):
+    col_f1, col_f2, col_o1, col_o2 = st.columns([2, 2, 2, 1])
+    filtros = {}
+    with col_f1:
+        if "sector" in tabla.indices:
+            filtros["sector"] = st.multiselect("Sector:", tabla.valores("sector"), key=f"{prefijo}_sector")
+    with col_f2:
+        if "anio" in tabla.indices:
+            filtros["anio"] = st.multiselect("Año:", tabla.valores("anio"), key=f"{prefijo}_anio")
+    with col_o1:
+        orden = st.selectbox("Ordenar por:", [None] + list(tabla.df.columns), key=f"{prefijo}_orden",
+                             format_func=lambda c: "(orden del archivo)" if c is None else c)
+    with col_o2:
+        descendente = st.checkbox("Descendente", key=f"{prefijo}_descendente")
+
+    filas = tabla.seleccionar(filtros, orden, descendente)
+    col_p1, col_p2 = st.columns([1, 1])
+    with col_p1:
+        tamano = st.selectbox("Filas por página:", TAMANOS_PAGINA, key=f"{prefijo}_tamano")
+    paginas = max(1, -(-len(filas) // tamano))
+    # Si un filtro dejó menos páginas, se vuelve a la última que existe
+    if st.session_state.get(f"{prefijo}_pagina", 1) > paginas:
+        st.session_state[f"{prefijo}_pagina"] = paginas
+    with col_p2:
+        numero = st.number_input(f"Página (de {paginas:,}):", min_value=1, max_value=paginas, step=1, key=f"{prefijo}_pagina")
+
+    pagina = tabla.pagina(filas, numero, tamano)
+    st.dataframe(pagina, column_config=formato_columnas(pagina), use_container_width=True, hide_index=True)
+    inicio = (numero - 1) * tamano
+    total = f" ({len(tabla):,} sin filtrar)" if len(filas) != len(tabla) else ""
+    st.caption(f"Filas {min(inicio + 1, len(filas)):,}–{inicio + len(pagina):,} de {len(filas):,}{total}")
+
+# ==============================================
+# === FUNCIÓN INDICADORES (CON BOTÓN REINICIAR) ===
+# ==============================================
+@metricas.medido("pagina.indicadores")
+def mostrar_indicadores():
+    st.title("Indicadores calculados")
+    
+    # === CSS LOCAL ===
+    st.markdown("""
+    <style>
+        div[data-testid="stNumberInput"] input {
+            font-size: 20px !important;
+            padding: 10px !important;
+            border: 2px solid #1D4ED8 !important;
+            border-radius: 8px !important;
+            background-color: #ffffff !important;
+            color: #111827 !important;
+            width: 100% !important;
+        }
+        div[data-testid="stNumberInput"] label {
+            font-size: 20px !important;
+            color: #111827 !important;
+            font-weight: bold !important;
+            text-align: center !important;
+        }
+        div[data-testid="column"] .stMarkdown.readonly {
+            font-size: 20px !important;
+            padding: 10px !important;
+            border: 2px solid #E5E7EB !important;
+            border-radius: 8px !important;
+            background-color: #F8FAFC !important;
+            color: #111827 !important;
+            margin-bottom: 10px !important;
+            text-align: center !important;
+        }
+        div.stButton > button, div.stFormSubmitButton > button {
+            font-size: 20px !important;
+            padding: 10px !important;
+            border: 2px solid #1E3A8A !important;
+            border-radius: 8px !important;
+            background-color: #1D4ED8 !important;
+            color: #ffffff !important;
+            width: 100% !important;
+            transition: all 0.3s ease !important;
+        }
+        div.stButton > button:hover, div.stFormSubmitButton > button:hover {
+            background-color: #1E40AF !important;
+            color: #ffffff !important;
+            border-color: #1E40AF !important;
+            transform: translateY(-2px) !important;
+            box-shadow: 0 4px 8px rgba(17,24,39,0.15) !important;
+        }
+        div.stButton > button:active, div.stFormSubmitButton > button:active {
+            transform: translateY(0) !important;
+            box-shadow: 0 2px 4px rgba(17,24,39,0.12) !important;
+        }
+        div[data-testid="stSelectbox"] select {
+            font-size: 20px !important;
+            padding: 10px !important;
+            border: 2px solid #1D4ED8 !important;
+            border-radius: 8px !important;
+            background-color: #ffffff !important;
+            color: #111827 !important;
+            width: 100% !important;
+        }
+    </style>
+    """, unsafe_allow_html=True)
+
+    # === MODO DE CÁLCULO ===
+    modo = st.radio("Modo de cálculo:", ["Individual", "Por lotes (archivo)", "Panel multianual", "Sensibilidad", "Simulación", "Re-estimar modelos"], horizontal=True, key="modo_indicadores")
+    if modo == "Por lotes (archivo)":
+        mostrar_indicadores_lote()
+        return
+    if modo == "Panel multianual":
+        mostrar_panel()
+        return
+    if modo == "Sensibilidad":
+        mostrar_sensibilidad()
+        return
+    if modo == "Simulación":
+        mostrar_simulacion()
+        mostrar_resultado_simulacion()
+        return
+    if modo == "Re-estimar modelos":
+        mostrar_reestimacion()
+        return
+
+    # === INICIALIZAR VARIABLES ===
+    keys = ["va", "hce", "sce", "vaic", "roa", "roe", "it", "cv", "hc", "ce", "sector_indicadores", "empresa", "anio"]
+    defaults = {
+        "va": 0.0, "hce": 0.0, "sce": 0.0, "vaic": 0.0, "roa": 0.0, "roe": 0.0,
+        "it": 0.0, "cv": 0.0, "hc": 0.0, "ce": 0.0, "sector_indicadores": "Inmobiliario",
+        "empresa": "", "anio": datetime.now().year
+    }
+    for k in keys:
+        if k not in st.session_state:
+            st.session_state[k] = defaults[k]
+
+    # === BOTÓN REINICIAR ===
+    if st.button("Reiniciar Todo", key="btn_reset"):
+        for k in keys:
+            st.session_state[k] = defaults[k]
+        st.success("¡Campos reiniciados! Listo para nuevo cálculo.")
+
+    with st.expander("Historial guardado"):
+        mostrar_historial("ind")
+
+    panel_calculo_individual()
+
+# ==============================================
+# === COMPARACIÓN CON PARES ===
+# ==============================================
+# La versión del histórico (filas, última actualización) forma parte de la clave:
+# la referencia se reconstruye solo cuando alguien guarda resultados nuevos.
+@st.cache_resource(max_entries=4, show_spinner=False)
+def referencia_historico(version):
+    return ReferenciaSectorial(almacen().indicadores_por_sector())
+
+# Tendencia de una empresa guardada: el histórico se consulta y el panel se recalcula solo
+# cuando cambia la versión del histórico, la empresa o los coeficientes
+@st.cache_data(max_entries=64, show_spinner=False)
+def tendencia_empresa(empresa, version, huella, _coeficientes):
+    historial = almacen().consultar(empresa=empresa)
+    if len(historial) < 2:
+        return None
+    return calcular_panel(historial, coeficientes=_coeficientes)
+
+def referencia_pares(fuente):
+    if fuente == "Histórico guardado":
+        return referencia_historico(almacen().version())
+    if st.session_state.get("resultados_lote") is None:
+        return None
+    if st.session_state.get("referencia_lote") is None:
+        st.session_state.referencia_lote = ReferenciaSectorial(st.session_state.resultados_lote)
+    return st.session_state.referencia_lote
+
+def mostrar_comparacion_pares(indicadores, sector):
+    fuentes = ["Histórico guardado"]
+    if st.session_state.get("resultados_lote") is not None:
+        fuentes.append("Último lote")
+    fuente = st.radio("Distribución de referencia:", fuentes, horizontal=True, key="pares_fuente")
+    referencia = referencia_pares(fuente)
+    if referencia is None or sector not in referencia:
+        st.caption(f"No hay empresas del sector {sector} en la referencia elegida.")
+        return
+    st.caption(f"{referencia.tamano(sector):,} empresas del sector {sector} en la referencia.")
+    percentiles = referencia.percentiles(sector, indicadores)
+    cuartiles = {k: referencia.cuartiles(sector, k) for k in INDICADORES_PARES}
+    tabla = pd.DataFrame({
+        "Indicador": [k.replace("VAIC", "VAIC™") for k in INDICADORES_PARES],
+        "Empresa": [indicadores[k] for k in INDICADORES_PARES],
+        "Percentil": [percentiles[k] for k in INDICADORES_PARES],
+        "Q1 sector": [cuartiles[k]["q1"] for k in INDICADORES_PARES],
+        "Mediana sector": [cuartiles[k]["mediana"] for k in INDICADORES_PARES],
+        "Q3 sector": [cuartiles[k]["q3"] for k in INDICADORES_PARES],
+    })
+    st.dataframe(
+        tabla.style.format({"Empresa": "{:.4f}", "Percentil": "{:.0f}", "Q1 sector": "{:.4f}",
+                            "Mediana sector": "{:.4f}", "Q3 sector": "{:.4f}"}, na_rep="n/d"),
+        use_container_width=True, hide_index=True
+    )
+    st.plotly_chart(figura_radar_pares(indicadores, sector, cuartiles), use_container_width=True)
+
+# ==============================================
+# === PANEL MULTIANUAL ===
+# ==============================================
+def panel_historico(ventana):
+    """Panel del histórico guardado; si solo cambiaron algunas filas, se actualizan esas empresas."""
+    version = almacen().version()
+    estado = st.session_state.get("panel")
+    contexto = ("historico", ventana, huella_coeficientes(coeficientes_activos()))
+    if estado is None or estado["contexto"] != contexto:
+        datos = calcular_panel(almacen().consultar(limite=-1), ventana, coeficientes_activos())
+    elif estado["version"] != version:
+        nuevas = almacen().consultar(desde=estado["version"][1], limite=-1)
+        datos = actualizar_panel(estado["datos"], nuevas, ventana, coeficientes_activos())
+    else:
+        return estado["datos"]
+    st.session_state.panel = {"contexto": contexto, "version": version, "datos": datos}
+    return datos
+
+def panel_archivo(ventana):
+    archivo = st.file_uploader("Panel (CSV o XLSX con empresa, anio, IT, CV, HC, CE y sector)", type=["csv", "xlsx"], key="archivo_panel")
+    if archivo is None:
+        return None
+    estado = st.session_state.get("panel")
+    contexto = ("archivo", archivo.file_id, ventana, huella_coeficientes(coeficientes_activos()))
+    if estado is None or estado["contexto"] != contexto:
+        estado = {"contexto": contexto, "version": None, "datos": calcular_panel(leer_archivo_lote(archivo), ventana, coeficientes_activos())}
+        st.session_state.panel = estado
+    nuevos = st.file_uploader("Agregar años (mismas columnas)", type=["csv", "xlsx"], key="archivo_panel_nuevos")
+    if nuevos is not None and estado["version"] != nuevos.file_id:
+        estado["datos"] = actualizar_panel(estado["datos"], leer_archivo_lote(nuevos), ventana, coeficientes_activos())
+        estado["version"] = nuevos.file_id
+    return estado["datos"]
+
+def mostrar_panel():
+    st.markdown("### Panel multianual")
+    st.caption("Variación interanual, media móvil y TCAC del VA por empresa, a partir de pares (empresa, año).")
+    col_f, col_v = st.columns(2)
+    with col_f:
+        fuente = st.radio("Datos:", ["Histórico guardado", "Archivo"], horizontal=True, key="panel_fuente")
+    with col_v:
+        ventana = st.slider("Años de la media móvil", 2, 10, VENTANA_PANEL, key="panel_ventana")
+    try:
+        datos = panel_historico(ventana) if fuente == "Histórico guardado" else panel_archivo(ventana)
+    except ValueError as e:
+        st.error(f"No se pudo construir el panel: {e}")
+        return
+    if datos is None:
+        return
+    if datos.empty:
+        st.caption("Aún no hay empresas guardadas en el histórico.")
+        return
+    st.caption(f"{datos['empresa'].nunique():,} empresas · {len(datos):,} empresa-años")
+
+    col_e, col_a = st.columns(2)
+    with col_e:
+        empresa = st.selectbox("Empresa:", datos["empresa"].unique().tolist(), key="panel_empresa")
+    serie = datos[datos["empresa"] == empresa]
+    with col_a:
+        anio = st.selectbox("Año:", serie["anio"].tolist()[::-1], key="panel_anio")
+    fila = serie[serie["anio"] == anio].iloc[0]
+
+    col_m1, col_m2, col_m3 = st.columns(3)
+    col_m1.metric("VAIC™", f"{fila['VAIC']:.4f}", None if pd.isna(fila["VAIC_var"]) else f"{fila['VAIC_var']:+.4f}")
+    col_m2.metric("VA", f"{fila['VA']:,.2f}", None if pd.isna(fila["VA_var"]) else f"{fila['VA_var']:+,.2f}")
+    col_m3.metric("TCAC del VA", "n/d" if pd.isna(fila["VA_TCAC"]) else f"{fila['VA_TCAC']:.2%}")
+
+    col_g1, col_g2 = st.columns(2)
+    with col_g1: st.plotly_chart(figura_radar(fila[INDICADORES_LOTE].to_dict(), fila["sector"]), use_container_width=True)
+    with col_g2: st.plotly_chart(figura_tendencias(serie, ventana), use_container_width=True)
+
+    columnas = ["anio", "sector"] + [c for k in ["VA", "VAIC", "ROA", "ROE"] for c in (k, f"{k}_var", f"{k}_media_movil")] + ["VA_TCAC"]
+    st.dataframe(serie[columnas], use_container_width=True, hide_index=True)
+    st.download_button(
+        label="Descargar panel (CSV)",
+        data=datos.to_csv(index=False).encode("utf-8"),
+        file_name=f"Panel_VAIC_{datetime.now().strftime('%Y%m%d')}.csv",
+        mime="text/csv",
+        use_container_width=True
+    )
+
+NOMBRES_ENTRADA = {"IT": "Ingresos Totales (IT)", "CV": "Costos de Ventas (CV)", "HC": "Sueldos y Salarios (HC)", "CE": "Activo Total (CE)"}
+
+@st.fragment
+def mostrar_sensibilidad():
+    st.markdown("### Análisis de sensibilidad")
+    st.caption("Parte de los valores del cálculo individual y varía una o dos entradas en un rango relativo.")
+    opciones = list(COEFICIENTES_SECTOR)
+    sector_actual = st.session_state.get("sector_indicadores", opciones[0])
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        sector = st.selectbox("Sector:", opciones, index=opciones.index(sector_actual) if sector_actual in opciones else 0, key="sens_sector")
+        objetivo = st.radio("Resultado:", ["ROA", "ROE", "VAIC"], horizontal=True, key="sens_objetivo")
+        resolucion = st.slider("Resolución de la malla:", 50, 500, 200, step=50, key="sens_resolucion")
+    with col2:
+        var_x = st.selectbox("Variable en X:", VARIABLES_ENTRADA, index=0, key="sens_var_x")
+        rango_x = st.slider("Rango X (± %):", 1, 100, 30, key="sens_rango_x")
+    with col3:
+        var_y = st.selectbox("Variable en Y:", ["(ninguna)"] + [v for v in VARIABLES_ENTRADA if v != var_x], index=1, key="sens_var_y")
+        rango_y = st.slider("Rango Y (± %):", 1, 100, 30, key="sens_rango_y")
+    var_y = None if var_y == "(ninguna)" else var_y
+
+    base = {}
+    cols = st.columns(4)
+    for col, variable in zip(cols, VARIABLES_ENTRADA):
+        with col:
+            base[variable] = st.number_input(NOMBRES_ENTRADA[variable], min_value=0.0, step=0.01, format="%.2f",
+                                             value=float(st.session_state.get(variable.lower(), 0.0)), key=f"sens_base_{variable}")
+    if base["IT"] == 0.0:
+        st.info("Ingresa valores base (o calcula primero en el modo Individual).")
+        return
+
+    inicio = time.perf_counter()
+    factores_x, factores_y, malla = malla_sensibilidad(
+        base, sector, var_x, rango_x / 100, var_y, rango_y / 100, resolucion, coeficientes_activos()
+    )
+    duracion = time.perf_counter() - inicio
+    eje_x = (factores_x - 1.0) * 100
+    if var_y is None:
+        fig = go.Figure(go.Scatter(x=eje_x, y=malla[objetivo][0], mode="lines", line_color="#1D4ED8"))
+        fig.update_layout(xaxis_title=f"Variación de {var_x} (%)", yaxis_title=objetivo, height=480)
+    else:
+        fig = go.Figure(go.Heatmap(
+            x=eje_x, y=(factores_y - 1.0) * 100, z=malla[objetivo], colorscale="RdBu", zmid=float(malla[objetivo][len(factores_y) // 2, len(factores_x) // 2]),
+            colorbar=dict(title=objetivo)
+        ))
+        fig.update_layout(xaxis_title=f"Variación de {var_x} (%)", yaxis_title=f"Variación de {var_y} (%)", height=560)
+    fig.update_layout(title=f"{objetivo} · {sector}")
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{malla[objetivo].size:,} escenarios evaluados en {duracion * 1000:.1f} ms.")
+
+@st.fragment
+def mostrar_simulacion():
+    st.markdown("### Simulación Monte Carlo")
+    st.caption("Propaga la incertidumbre de IT, CV, HC y CE hasta el ROA y el ROE del sector.")
+    opciones = list(COEFICIENTES_SECTOR)
+    sector_actual = st.session_state.get("sector_indicadores", opciones[0])
+    col1, col2 = st.columns(2)
+    with col1:
+        sector = st.selectbox("Sector:", opciones, index=opciones.index(sector_actual) if sector_actual in opciones else 0, key="mc_sector")
+    with col2:
+        n = st.select_slider("Escenarios:", [10_000, 100_000, 250_000, 500_000, 1_000_000], value=1_000_000, key="mc_n")
+    hay_lote = st.session_state.get("resultados_lote") is not None
+    origen = st.radio("Origen de las entradas:", ["Distribuciones"] + (["Bootstrap del último lote"] if hay_lote else []),
+                      horizontal=True, key="mc_origen")
+
+    distribuciones, historico = None, None
+    if origen == "Distribuciones":
+        distribuciones = {}
+        cols = st.columns(4)
+        for col, variable in zip(cols, VARIABLES_ENTRADA):
+            with col:
+                st.markdown(f"**{NOMBRES_ENTRADA[variable]}**")
+                tipo = st.selectbox("Distribución", DISTRIBUCIONES, index=1, key=f"mc_tipo_{variable}")
+                base = float(st.session_state.get(variable.lower(), 0.0))
+                if tipo == "Uniforme":
+                    minimo = st.number_input("Mínimo", min_value=0.0, value=base * 0.8, key=f"mc_min_{variable}")
+                    maximo = st.number_input("Máximo", min_value=0.0, value=base * 1.2, key=f"mc_max_{variable}")
+                    distribuciones[variable] = (tipo, minimo, max(maximo, minimo))
+                else:
+                    media = st.number_input("Media" if tipo != "Fija" else "Valor", min_value=0.0, value=base, key=f"mc_media_{variable}")
+                    if tipo == "Fija":
+                        distribuciones[variable] = (tipo, media)
+                    else:
+                        cv_pct = st.slider("Desviación (% de la media)", 1, 100, 10, key=f"mc_desv_{variable}")
+                        distribuciones[variable] = (tipo, media, media * cv_pct / 100)
+    else:
+        historico = st.session_state.resultados_lote[VARIABLES_ENTRADA].to_numpy(dtype=float)
+
+    if st.button("Simular", key="btn_simular", use_container_width=True):
+        lanzar_trabajo("simulacion", f"Simulación ({n:,} escenarios)", _trabajo_simulacion,
+                       sector, distribuciones, historico, n, coeficientes_activos())
+        st.rerun()
+
+def _trabajo_simulacion(trabajo, sector, distribuciones, historico, n, coeficientes):
+    def al_avanzar(hechos, total):
+        trabajo.avanzar(hechos / total, f"{hechos:,}/{total:,} bloques")
+
+    return simular_montecarlo(sector, distribuciones, historico, n=n, coeficientes=coeficientes, al_avanzar=al_avanzar)
+
+def mostrar_resultado_simulacion():
+    trabajo = mostrar_trabajo("simulacion")
+    if trabajo is None:
+        return
+    resumen = trabajo.resultado
+    st.success(f"¡{trabajo.nombre} en {trabajo.duracion:.2f} s!")
+
+    col_g1, col_g2 = st.columns([3, 2])
+    with col_g1:
+        st.plotly_chart(figura_barras_bandas(resumen), use_container_width=True)
+    with col_g2:
+        tabla = pd.DataFrame(resumen).T[["media"] + [f"P{p}" for p in PERCENTILES]]
+        st.dataframe(tabla.style.format("{:.4f}"), use_container_width=True)
+
+# Fragmento: enviar el formulario solo vuelve a ejecutar esta parte de la página,
+# y escribir en los campos no provoca ningún rerun hasta pulsar "Calcular".
+@st.fragment
+@metricas.medido("fragmento.calculo_individual")
+def panel_calculo_individual():
+    with st.form("form_indicadores", border=False):
+        # === SELECTOR DE SECTOR ===
+        opciones = list(COEFICIENTES_SECTOR)
+        sector_input = st.selectbox("Selecciona un sector:", opciones, index=opciones.index(st.session_state.sector_indicadores))
+
+        # === ENTRADAS ===
+        col2, col3 = st.columns(2)
+        with col2:
+            it_input = st.number_input("Ingresos Totales (IT)", min_value=0.0, value=st.session_state.it, step=0.01, format="%.2f")
+            cv_input = st.number_input("Costos de Ventas (CV)", min_value=0.0, value=st.session_state.cv, step=0.01, format="%.2f")
+        with col3:
+            hc_input = st.number_input("Sueldos y Salarios (HC)", min_value=0.0, value=st.session_state.hc, step=0.01, format="%.2f")
+            ce_input = st.number_input("Activo Total (CE)", min_value=0.0, value=st.session_state.ce, step=0.01, format="%.2f")
+
+        col_e1, col_e2 = st.columns(2)
+        with col_e1:
+            empresa_input = st.text_input("Empresa (opcional, para guardar en el histórico)", value=st.session_state.empresa)
+        with col_e2:
+            anio_input = st.number_input("Año", min_value=1900, max_value=2100, value=int(st.session_state.anio), step=1)
+
+        calcular = st.form_submit_button("Calcular Indicadores", key="btn_calcular", use_container_width=True)
+
+    # === CÁLCULO ===
+    if calcular:
+        st.session_state.update({
+            "sector_indicadores": sector_input,
+            "it": it_input, "cv": cv_input, "hc": hc_input, "ce": ce_input,
+            "empresa": empresa_input.strip(), "anio": int(anio_input)
+        })
+        # Mismo núcleo que el cálculo por lotes, sobre una sola fila. La validación solo avisa:
+        # la cadena VAIC ya protege sus denominadores, y una empresa con VA nulo se puntúa igual
+        with metricas.Tramo("calculo.individual"):
+            entrada = {"IT": [st.session_state.it], "CV": [st.session_state.cv], "HC": [st.session_state.hc],
+                       "CE": [st.session_state.ce], "sector": [st.session_state.sector_indicadores]}
+            fila = calcular_indicadores_lote(*entrada.values(), coeficientes_activos()).iloc[0]
+            # Sin la regla de atípicos (una fila sola no tiene sector con qué compararse)
+            codigo = validar_lote(entrada, umbral_atipicos=None)
+
+        st.session_state.update({
+            "va": float(fila["VA"]), "hce": float(fila["HCE"]), "sce": float(fila["SCE"]),
+            "vaic": float(fila["VAIC"]), "roa": float(fila["ROA"]), "roe": float(fila["ROE"])
+        })
+        st.success("¡Cálculo realizado!")
+        motivos = [m for m in motivos_rechazo(codigo)[0].split(";") if m in AVISOS_INDIVIDUAL]
+        if motivos:
+            st.warning("Revisa las entradas: en un lote esta fila se rechazaría.\n"
+                       + "\n".join(f"- {MOTIVOS_RECHAZO[m]}" for m in motivos))
+        if st.session_state.empresa:
+            with metricas.Tramo("almacen.guardar"):
+                almacen().guardar_lote(pd.DataFrame([{
+                    "empresa": st.session_state.empresa, "anio": st.session_state.anio,
+                    "sector": st.session_state.sector_indicadores, "IT": st.session_state.it,
+                    "CV": st.session_state.cv, "HC": st.session_state.hc, "CE": st.session_state.ce
+                }]), coeficientes_activos())
+            st.caption(f"Guardado en el histórico: {st.session_state.empresa} ({st.session_state.anio}).")
+
+    # === RESULTADOS ===
+    st.markdown("---")
+    col_r1, col_r2 = st.columns(2)
+    with col_r1:
+        st.markdown('<span style="font-weight:bold; font-size:22px; color:#111827;">ROA:</span>', unsafe_allow_html=True)
+        st.markdown(f'<div class="readonly" style="font-weight:bold; font-size:22px;margin-left: 1cm;"> {st.session_state.roa:.4f}</div>', unsafe_allow_html=True)
+    with col_r2:
+        st.markdown('<span style="font-weight:bold; font-size:22px; color:#111827;">ROE:</span>', unsafe_allow_html=True)
+        st.markdown(f'<div class="readonly" style="font-weight:bold; font-size:22px;margin-left: 1cm;"> {st.session_state.roe:.4f}</div>', unsafe_allow_html=True)
+
+    st.markdown("---")
+    col_a, col_b = st.columns(2)
+    with col_a:
+        st.markdown(f'<div class="readonly">Valor Añadido (VA): {st.session_state.va:,.2f}</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="readonly">VAIC™: {st.session_state.vaic:.4f}</div>', unsafe_allow_html=True)
+    with col_b:
+        st.markdown(f'<div class="readonly">HCE: {st.session_state.hce:.4f}</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="readonly">SCE: {st.session_state.sce:.4f}</div>', unsafe_allow_html=True)
+    st.markdown("---")
+
+    # === GRÁFICAS ===
+    st.markdown("### Visualización de Resultados")
+    indicadores = indicadores_sesion()
+    sector = st.session_state.sector_indicadores
+
+    col_g1, col_g2 = st.columns(2)
+    with col_g1: st.plotly_chart(figura_radar(indicadores, sector), use_container_width=True)
+    with col_g2: st.plotly_chart(figura_barras(indicadores, sector), use_container_width=True)
+
+    # Con varios años guardados de la empresa, su tendencia acompaña al perfil
+    if st.session_state.empresa:
+        coeficientes = coeficientes_activos()
+        tendencia = tendencia_empresa(st.session_state.empresa, almacen().version(), huella_coeficientes(coeficientes), coeficientes)
+        if tendencia is not None:
+            st.plotly_chart(figura_tendencias(tendencia, VENTANA_PANEL), use_container_width=True)
+
+    # === TABLA ===
+    st.markdown("### Resumen")
+    st.dataframe(tabla_resumen(indicadores, sector), use_container_width=True, hide_index=True,
+                 column_config={"Valor": st.column_config.NumberColumn(format="%.4f")})
+
+    with st.expander("Comparación con el sector"):
+        mostrar_comparacion_pares(indicadores, sector)
+
@@ -0,0 +1,95 @@
+"""Modo panel: las mismas empresas a lo largo de varios años, con clave (empresa, anio).
+
+Sobre los indicadores de cada año se calculan, por empresa y con operaciones
+agrupadas de pandas, la variación interanual, la media móvil y la tasa de
+crecimiento anual compuesta (TCAC) del VA desde el primer año observado.
+``actualizar_panel`` incorpora años nuevos recalculando solo las ventanas de las
+empresas afectadas.
+"""
+import numpy as np
+import pandas as pd
+
+from nucleo import COLUMNAS_LOTE, puntuar_lote
+
+CLAVE_PANEL = ["empresa", "anio"]
+INDICADORES_PANEL = ["VA", "HCE", "SCE", "CEE", "VAIC", "ROA", "ROE"]
+VENTANA_PANEL = 3
+
+
+def _entradas(df):
+    faltantes = [c for c in CLAVE_PANEL + COLUMNAS_LOTE if c not in df.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas para el panel: {', '.join(faltantes)}")
+    df = df[CLAVE_PANEL + COLUMNAS_LOTE].assign(empresa=df["empresa"].astype(str), anio=df["anio"].astype(int))
+    return df.drop_duplicates(CLAVE_PANEL, keep="last")
+
+
+def _medias_moviles(valores, posicion, ventana):
+    """Media de las últimas ``ventana`` observaciones de la misma empresa (ignora NaN).
+
+    ``posicion`` es el índice de cada fila dentro de su empresa; con el panel
+    ordenado, cada ventana es una resta de sumas acumuladas.
+    """
+    finitos = np.isfinite(valores)
+    sumas = np.vstack([np.zeros((1, valores.shape[1])), np.cumsum(np.where(finitos, valores, 0.0), axis=0)])
+    cuentas = np.vstack([np.zeros((1, valores.shape[1])), np.cumsum(finitos, axis=0)])
+    fila = np.arange(len(valores))
+    inicio = np.maximum(fila + 1 - ventana, fila - posicion)
+    cuenta = cuentas[fila + 1] - cuentas[inicio]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(cuenta > 0, (sumas[fila + 1] - sumas[inicio]) / cuenta, np.nan)
+
+
+def _derivadas(df, ventana):
+    """Añade variaciones, medias móviles y TCAC del VA a un panel ordenado por (empresa, anio)."""
+    df = df.reset_index(drop=True)
+    grupos = df.groupby("empresa", sort=False)
+    variaciones = grupos[INDICADORES_PANEL].diff().add_suffix("_var")
+    medias = pd.DataFrame(
+        _medias_moviles(df[INDICADORES_PANEL].to_numpy(dtype=float), grupos.cumcount().to_numpy(), ventana),
+        columns=[f"{k}_media_movil" for k in INDICADORES_PANEL]
+    )
+
+    va_inicial = grupos["VA"].transform("first").to_numpy()
+    anios = (df["anio"] - grupos["anio"].transform("first")).to_numpy()
+    va = df["VA"].to_numpy()
+    tcac = np.full(len(df), np.nan)
+    # Solo tiene sentido con VA positivo en ambos extremos y al menos un año de distancia
+    validas = (anios > 0) & (va > 0) & (va_inicial > 0)
+    tcac[validas] = (va[validas] / va_inicial[validas]) ** (1.0 / anios[validas]) - 1.0
+    return pd.concat([df, variaciones, medias], axis=1).assign(VA_TCAC=tcac)
+
+
+def calcular_panel(df, ventana=VENTANA_PANEL, coeficientes=None):
+    """Indicadores y derivadas de todo el panel; una fila por (empresa, anio)."""
+    puntuado = puntuar_lote(_entradas(df), coeficientes).sort_values(CLAVE_PANEL)
+    return _derivadas(puntuado, ventana)
+
+
+def actualizar_panel(panel, nuevas, ventana=VENTANA_PANEL, coeficientes=None):
+    """Incorpora (o reemplaza) filas en un panel ya calculado.
+
+    Por cada empresa afectada solo se recalculan los años desde el primero que
+    cambió; como contexto bastan los ``ventana - 1`` años anteriores (media móvil
+    y variación) y el primer año de la empresa (TCAC). Las demás empresas no se
+    tocan.
+    """
+    nuevas = puntuar_lote(_entradas(nuevas), coeficientes)
+    if nuevas.empty:
+        return panel
+    desde = nuevas.groupby("empresa")["anio"].min().rename("desde")
+    marcado = panel[CLAVE_PANEL].join(desde, on="empresa")
+    afectada = marcado["desde"].notna().to_numpy()
+    anteriores = afectada & (marcado["anio"] < marcado["desde"]).to_numpy()
+    posteriores = afectada & ~anteriores
+
+    columnas = list(nuevas.columns)
+    previas = panel[anteriores].groupby("empresa", sort=False)
+    contexto = pd.concat([previas.head(1), previas.tail(max(ventana - 1, 1))])[columnas]
+    recalcular = pd.concat([contexto, panel.loc[posteriores, columnas], nuevas])
+    recalcular = recalcular.drop_duplicates(CLAVE_PANEL, keep="last").sort_values(CLAVE_PANEL)
+    recalculado = _derivadas(recalcular, ventana)
+    recalculado = recalculado[recalculado["anio"].to_numpy() >= recalculado["empresa"].map(desde).to_numpy()]
+
+    return (pd.concat([panel[~posteriores], recalculado], ignore_index=True)
+            .sort_values(CLAVE_PANEL, ignore_index=True))
@@ -0,0 +1,52 @@
+"""Comparación con pares: percentiles de una empresa dentro de la distribución de su sector.
+
+Las distribuciones de referencia se guardan como arreglos ordenados por sector e
+indicador; cada consulta es una búsqueda binaria (np.searchsorted), no un recorrido.
+"""
+import numpy as np
+
+from nucleo import normalizar_sector
+
+INDICADORES_PARES = ["VAIC", "HCE", "SCE", "CEE", "ROA", "ROE"]
+
+
+class ReferenciaSectorial:
+    """Arreglos ordenados {sector: {indicador: np.ndarray}} construidos una vez."""
+
+    def __init__(self, df, indicadores=INDICADORES_PARES):
+        self.indicadores = list(indicadores)
+        self.ordenados = {}
+        sectores = normalizar_sector(df["sector"])
+        for sector in np.unique(sectores):
+            mascara = sectores == sector
+            self.ordenados[sector] = {}
+            for indicador in self.indicadores:
+                valores = df[indicador].to_numpy(dtype=float)[mascara]
+                self.ordenados[sector][indicador] = np.sort(valores[np.isfinite(valores)])
+
+    def __contains__(self, sector):
+        return normalizar_sector([sector])[0] in self.ordenados
+
+    def tamano(self, sector):
+        arreglos = self.ordenados.get(normalizar_sector([sector])[0], {})
+        return max((len(a) for a in arreglos.values()), default=0)
+
+    def percentil(self, sector, indicador, valor):
+        """Rango percentil (0–100) de ``valor``; los empates cuentan a medias."""
+        ordenado = self.ordenados[normalizar_sector([sector])[0]][indicador]
+        if len(ordenado) == 0 or not np.isfinite(valor):
+            return np.nan
+        debajo = np.searchsorted(ordenado, valor, side="left")
+        hasta = np.searchsorted(ordenado, valor, side="right")
+        return 100.0 * (debajo + hasta) / (2 * len(ordenado))
+
+    def percentiles(self, sector, indicadores):
+        return {k: self.percentil(sector, k, indicadores[k]) for k in self.indicadores}
+
+    def cuartiles(self, sector, indicador):
+        """Mínimo, Q1, mediana, Q3 y máximo leídos por índice del arreglo ordenado."""
+        ordenado = self.ordenados[normalizar_sector([sector])[0]][indicador]
+        if len(ordenado) == 0:
+            return {c: np.nan for c in ("min", "q1", "mediana", "q3", "max")}
+        posiciones = np.round(np.array([0.0, 0.25, 0.5, 0.75, 1.0]) * (len(ordenado) - 1)).astype(int)
+        return dict(zip(("min", "q1", "mediana", "q3", "max"), ordenado[posiciones].tolist()))
@@ -0,0 +1,227 @@
+"""Reporte PDF de los indicadores VAIC™ y rentabilidad (sin dependencia de Streamlit)."""
+import io
+import os
+from datetime import datetime
+
+from reportlab.graphics import renderPDF
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+import metricas
+from cache_lru import ACTIVOS, FIGURAS, clave_indicadores
+
+RUTA_LOGO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "UTA.png")
+COLOR_INSTITUCIONAL = (120/255, 31/255, 25/255)
+ANCHO_LOGO = 80
+# El logo se centra en esta línea (puntos desde el borde superior), sea cual sea su proporción
+CENTRO_LOGO = 35
+
+def logo_pdf():
+    """Logo reducido (ImageReader) y su proporción alto/ancho, cargados una vez por proceso.
+
+    Se reduce a 2x su ancho impreso; cada documento lo incrusta una sola vez, dentro
+    del formulario del membrete.
+    """
+    def cargar():
+        from PIL import Image
+        try:
+            with Image.open(RUTA_LOGO) as img:
+                proporcion = img.height / img.width
+                img = img.convert("RGB")
+                ancho_px = ANCHO_LOGO * 2
+                img = img.resize((ancho_px, max(round(ancho_px * proporcion), 1)), Image.LANCZOS)
+        except OSError:
+            return None
+        logo = ImageReader(img)
+        # Los bytes RGB se calculan ya, antes de compartir el lector entre hilos
+        logo.getRGBData()
+        return logo, proporcion
+    return ACTIVOS.obtener(("logo_pdf", RUTA_LOGO), cargar)
+
+def dibujar_membrete(c):
+    """Encabezado, logo y pie de página; cada documento los dibuja sobre su propio lienzo."""
+    width, height = letter
+    c.saveState()
+    c.setFillColorRGB(*COLOR_INSTITUCIONAL)
+    c.setStrokeColorRGB(0, 0, 0)
+    c.rect(0, height - 100, width, 100, fill=1, stroke=1)
+    logo = logo_pdf()
+    if logo is not None:
+        imagen, proporcion = logo
+        alto_logo = ANCHO_LOGO * proporcion
+        c.drawImage(imagen, 50, height - CENTRO_LOGO - alto_logo / 2, width=ANCHO_LOGO, height=alto_logo)
+    c.setFillColorRGB(1, 1, 1)
+    c.setFont("Helvetica-Bold", 20)
+    c.drawCentredString(width / 2, height - 60, " INDICADORES INTANGIBLES")
+    c.setFont("Helvetica", 14)
+    c.drawCentredString(width / 2, height - 85, "Universidad Técnica de Ambato | Ecuador")
+    c.setStrokeColorRGB(0.9, 0.9, 0.9)
+    c.setLineWidth(3)
+    c.line(50, height - 105, width - 50, height - 105)
+    c.setFillColorRGB(*COLOR_INSTITUCIONAL)
+    c.setStrokeColorRGB(0, 0, 0)
+    c.setLineWidth(1)
+    c.rect(0, 0, width, 70, fill=1, stroke=1)
+    c.setFillColorRGB(1, 1, 1)
+    c.setFont("Helvetica-Bold", 12)
+    c.drawCentredString(width / 2, 35, "Proyecto de Investigación - Universidad Técnica de Ambato")
+    c.restoreState()
+
+def _png_figura(tipo, indicadores, sector):
+    from graficos import figura_barras, figura_radar
+
+    def rasterizar():
+        figura = figura_radar if tipo == "radar" else figura_barras
+        imagen = io.BytesIO()
+        with metricas.Tramo("pdf.kaleido"):
+            figura(indicadores, sector, estilo="reporte").write_image(imagen, format="png")
+        return imagen.getvalue()
+    return FIGURAS.obtener(("png", tipo) + clave_indicadores(indicadores, sector), rasterizar)
+
+def _dibujar_graficas(c, indicadores, sector, y, motor):
+    # Radar y barras lado a lado, entre el bloque de indicadores y el pie de página
+    caja = 260
+    if motor == "raster":
+        radar_img = io.BytesIO(_png_figura("radar", indicadores, sector))
+        c.drawImage(ImageReader(radar_img), 40, y - caja - 20, width=caja, height=caja, preserveAspectRatio=True)
+        bar_img = io.BytesIO(_png_figura("barras", indicadores, sector))
+        c.drawImage(ImageReader(bar_img), 312, y - caja - 20, width=caja, height=caja, preserveAspectRatio=True)
+        return
+    from graficos_pdf import dibujo_barras, dibujo_radar
+
+    renderPDF.draw(dibujo_radar(indicadores, caja, caja), c, 40, y - caja - 20)
+    renderPDF.draw(dibujo_barras(indicadores, caja, caja), c, 312, y - caja - 20)
+
+def generar_reporte_pdf(indicadores, sector, destino=None, fecha=None, graficas="vectorial"):
+    """Dibuja el reporte de una empresa.
+
+    ``indicadores`` es un mapeo con VA, HCE, SCE, CEE, VAIC, ROA y ROE (por ejemplo,
+    una fila de ``nucleo.puntuar_lote``). Si ``destino`` es None se devuelve un BytesIO.
+    ``graficas`` elige el motor: "vectorial" (ReportLab, por defecto), "raster"
+    (Plotly + kaleido) o None para omitirlas.
+    """
+    fecha = fecha or datetime.now()
+    buffer = io.BytesIO() if destino is None else destino
+    c = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+    # Membrete: se dibuja una vez como objeto de formulario y se coloca en la página
+    with metricas.Tramo("pdf.membrete"):
+        c.beginForm("membrete")
+        dibujar_membrete(c)
+        c.endForm()
+        c.doForm("membrete")
+    with metricas.Tramo("pdf.texto"):
+        y = height - 140
+        c.setFillColorRGB(0, 0, 0)
+        c.setFont("Helvetica-Bold", 16)
+        c.drawString(70, y, "Resultados del Análisis VAIC™ y Rentabilidad")
+        y -= 30
+        c.setFont("Helvetica", 12)
+        c.drawString(70, y, f"Sector seleccionado: {sector}")
+        y -= 25
+        c.drawString(70, y, f"Fecha de generación: {fecha.strftime('%d/%m/%Y %H:%M')}")
+        y -= 40
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(70, y, "Indicadores Calculados:")
+        y -= 20
+        datos = [
+            ["Valor Añadido (VA)", f"${indicadores['VA']:,.2f}"],
+            ["Eficiencia Capital Humano (HCE)", f"{indicadores['HCE']:.4f}"],
+            ["Eficiencia Capital Estructural (SCE)", f"{indicadores['SCE']:.4f}"],
+            ["Eficiencia Capital Empleado (CEE)", f"{indicadores['CEE']:.4f}"],
+            ["VAIC™", f"{indicadores['VAIC']:.4f}"],
+            ["ROA", f"{indicadores['ROA']:.4f}"],
+            ["ROE", f"{indicadores['ROE']:.4f}"]
+        ]
+        c.setFont("Helvetica", 11)
+        for label, valor in datos:
+            c.drawString(90, y, f"• {label}:")
+            c.setFont("Helvetica-Bold", 11)
+            c.drawString(300, y, valor)
+            c.setFont("Helvetica", 11)
+            y -= 20
+    y -= 30
+    if graficas:
+        try:
+            with metricas.Tramo("pdf.graficas"):
+                _dibujar_graficas(c, indicadores, sector, y, graficas)
+        except Exception as e:
+            c.setFont("Helvetica", 10)
+            c.drawString(70, y - 40, f"Advertencia: No se pudieron generar las gráficas: {str(e)}")
+    with metricas.Tramo("pdf.guardar"):
+        c.save()
+    if destino is None:
+        buffer.seek(0)
+    return buffer
+
+# ==============================================
+# === REPORTES MASIVOS (POOL DE PROCESOS + ZIP) ===
+# ==============================================
+def _renderizar(tarea):
+    nombre, indicadores, sector, fecha, graficas = tarea
+    return nombre, generar_reporte_pdf(indicadores, sector, fecha=fecha, graficas=graficas).getvalue()
+
+def _nombre_reporte(fila, posicion, columna_id):
+    if not columna_id:
+        return f"Reporte_VAIC_{posicion}_{fila['sector']}.pdf"
+    # Una empresa con varios años tiene varias filas: el año (o la fila) distingue sus reportes
+    anio = fila.get("anio")
+    if anio is None or anio != anio or columna_id == "anio":
+        sufijo = posicion
+    else:
+        sufijo = int(anio) if float(anio).is_integer() else anio
+    return f"Reporte_VAIC_{fila.get(columna_id, posicion)}_{sufijo}_{fila['sector']}.pdf"
+
+def _tareas(filas, columna_id, fecha, graficas):
+    usados = set()
+    for posicion, fila in enumerate(filas):
+        nombre = _nombre_reporte(fila, posicion, columna_id)
+        if nombre in usados:
+            # (empresa, año) repetidos en el lote: la posición desempata
+            nombre = f"{nombre[:-4]}_{posicion}.pdf"
+        usados.add(nombre)
+        sector = fila["sector"]
+        indicadores = {k: float(fila[k]) for k in ("VA", "HCE", "SCE", "CEE", "VAIC", "ROA", "ROE")}
+        yield nombre, indicadores, sector, fecha, graficas
+
+def generar_reportes(filas, columna_id=None, procesos=None, graficas="vectorial", fecha=None):
+    """Renderiza un reporte por fila en un pool de procesos y los entrega en orden.
+
+    ``filas`` es cualquier iterable de mapeos (p. ej. registros de ``nucleo.puntuar_lote``).
+    Solo hay ``procesos * 4`` reportes en vuelo a la vez, así que la memoria no
+    depende del número de filas. Produce pares (nombre_archivo, bytes_pdf).
+    """
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    procesos = procesos or os.cpu_count() or 1
+    tareas = _tareas(filas, columna_id, fecha or datetime.now(), graficas)
+    if procesos == 1:
+        yield from map(_renderizar, tareas)
+        return
+    # "spawn": los procesos hijos no heredan los hilos del servidor de Streamlit
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+        en_vuelo = deque()
+        for tarea in tareas:
+            en_vuelo.append(pool.submit(_renderizar, tarea))
+            if len(en_vuelo) >= procesos * 4:
+                yield en_vuelo.popleft().result()
+        while en_vuelo:
+            yield en_vuelo.popleft().result()
+
+def reportes_en_zip(filas, salida, al_avanzar=None, **opciones):
+    """Escribe los reportes en un ZIP a medida que terminan; ``salida`` puede no ser buscable (stdout)."""
+    import zipfile
+
+    total = 0
+    with zipfile.ZipFile(salida, mode="w", compression=zipfile.ZIP_STORED) as archivo_zip:
+        for nombre, pdf in generar_reportes(filas, **opciones):
+            # Los PDF ya van comprimidos: ZIP_STORED evita recomprimir
+            archivo_zip.writestr(nombre, pdf)
+            total += 1
+            if al_avanzar is not None:
+                al_avanzar(total)
+    return total
@@ -0,0 +1,218 @@
+"""Servicio local de puntuación: JSON por líneas desde stdin o un socket local.
+
+Cada línea es un objeto con IT, CV, HC, CE y sector (los nombres no distinguen
+mayúsculas); la respuesta es una línea por registro, en el mismo orden, con el
+registro de entrada y VA, HCE, SCE, CEE, VAIC, ROA y ROE. Se aplican la misma
+validación que en el cálculo por lotes y los mismos modelos sectoriales (sin la
+regla de atípicos, que dependería de qué registros caen juntos en un
+microlote): un registro rechazado vuelve con ``motivos`` ("CV_MAYOR_IT;VA_CERO")
+en lugar de indicadores, y una línea ilegible con ``error``. Un sector sin
+modelo deja ROA y ROE en null.
+
+Los registros se puntúan en microlotes: todas las líneas completas que ya
+llegaron (hasta ``--lote``) pasan juntas por el núcleo vectorizado, así que un
+registro suelto se responde enseguida y un flujo continuo se procesa por miles.
+No se lee el siguiente microlote hasta haber entregado la respuesta del
+anterior: si quien consume no lee, el servicio deja de leer y quien produce se
+bloquea (contrapresión) en vez de acumular memoria.
+
+Ejemplos:
+    python servicio.py < empresas.jsonl > resultados.jsonl
+    python servicio.py --socket /tmp/vaic.sock
+    python servicio.py --puerto 8765 --coeficientes coeficientes.json
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from nucleo import (
+    COLUMNAS_LOTE, INDICADORES_LOTE, calcular_indicadores_lote, cargar_coeficientes, motivos_rechazo, validar_lote
+)
+
+TAMANO_LECTURA = 1 << 16
+LOTE_MAXIMO = 4096
+# Nombre de campo sin distinguir mayúsculas -> columna del núcleo
+CAMPOS = {c.lower(): c for c in COLUMNAS_LOTE}
+_CODIFICADOR = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+# ==============================================
+# === PUNTUACIÓN DE REGISTROS ===
+# ==============================================
+def puntuar_registros(registros, coeficientes=None):
+    """Completa cada registro (dict) con sus indicadores, o con ``motivos`` si no pasa la validación.
+
+    Modifica y devuelve los mismos dicts, en el mismo orden.
+    """
+    df = pd.DataFrame.from_records(registros)
+    fuentes = {}
+    for c in df.columns:
+        if isinstance(c, str) and c.strip().lower() in CAMPOS:
+            fuentes.setdefault(CAMPOS[c.strip().lower()], []).append(c)
+    entrada = {}
+    for columna in COLUMNAS_LOTE:
+        nombres = fuentes.get(columna, [])
+        if not nombres:
+            entrada[columna] = pd.Series(None, index=df.index, dtype=object)
+        elif len(nombres) == 1:
+            entrada[columna] = df[nombres[0]]
+        else:
+            # Registros del mismo microlote que escriben el campo distinto ("IT" e "it")
+            entrada[columna] = df[nombres].bfill(axis=1).iloc[:, 0]
+    codigos = validar_lote(entrada, umbral_atipicos=None)
+    validas = np.flatnonzero(codigos == 0)
+    it, cv, hc, ce = (np.asarray(pd.to_numeric(entrada[c], errors="coerce"), dtype=float)[validas] for c in COLUMNAS_LOTE[:-1])
+    sector = entrada["sector"].to_numpy(dtype=object)[validas]
+    indicadores = calcular_indicadores_lote(it, cv, hc, ce, sector, coeficientes)
+    valores = iter(indicadores.to_numpy().tolist())
+    for registro, codigo, motivos in zip(registros, codigos.tolist(), motivos_rechazo(codigos)):
+        if codigo:
+            registro["motivos"] = motivos
+        else:
+            # NaN (sector sin modelo) no es JSON válido: va como null
+            registro.update({k: None if v != v else v for k, v in zip(INDICADORES_LOTE, next(valores))})
+    return registros
+
+
+def _leer_lineas(lineas):
+    """Registros de un microlote y posiciones de las líneas ilegibles (que quedan como {"error": ...})."""
+    try:
+        # Camino rápido: todo el microlote de una vez, como un arreglo JSON
+        registros = json.loads(b"[" + b",".join(lineas) + b"]")
+        if len(registros) == len(lineas) and all(isinstance(r, dict) for r in registros):
+            return registros, set()
+    except ValueError:
+        pass
+    registros, ilegibles = [], set()
+    for i, linea in enumerate(lineas):
+        try:
+            registro = json.loads(linea)
+            if not isinstance(registro, dict):
+                registro = {"error": "Se esperaba un objeto JSON"}
+                ilegibles.add(i)
+        except ValueError as e:
+            registro = {"error": f"JSON inválido: {e}"}
+            ilegibles.add(i)
+        registros.append(registro)
+    return registros, ilegibles
+
+
+class Puntuador:
+    """Convierte bytes de entrada en bytes de respuesta, un microlote por vez, y lleva la cuenta."""
+
+    def __init__(self, coeficientes=None, lote=LOTE_MAXIMO):
+        self.coeficientes = coeficientes
+        self.lote = lote
+        self.pendiente = b""
+        self.registros = 0
+        self.rechazados = 0
+        self.errores = 0
+
+    def _responder(self, lineas):
+        salida = []
+        for desde in range(0, len(lineas), self.lote):
+            registros, ilegibles = _leer_lineas(lineas[desde:desde + self.lote])
+            legibles = [r for i, r in enumerate(registros) if i not in ilegibles] if ilegibles else registros
+            if legibles:
+                puntuar_registros(legibles, self.coeficientes)
+            self.registros += len(registros)
+            self.errores += len(ilegibles)
+            self.rechazados += sum("motivos" in r for r in legibles)
+            salida.extend(_CODIFICADOR.encode(r) for r in registros)
+        return ("\n".join(salida) + "\n").encode() if salida else b""
+
+    def alimentar(self, datos):
+        """Respuesta a las líneas completas de ``datos``; una línea cortada espera al siguiente trozo."""
+        lineas = (self.pendiente + datos).split(b"\n")
+        self.pendiente = lineas.pop()
+        return self._responder([l for l in lineas if l.strip()])
+
+    def terminar(self):
+        """Respuesta a la última línea si la entrada no terminó en salto de línea."""
+        linea, self.pendiente = self.pendiente, b""
+        return self._responder([linea] if linea.strip() else [])
+
+
+# ==============================================
+# === ENTRADA ESTÁNDAR Y SOCKETS ===
+# ==============================================
+def servir_stdio(puntuador, entrada=None, salida=None):
+    entrada = entrada or sys.stdin.buffer
+    salida = salida or sys.stdout.buffer
+    while True:
+        # read1: lo que ya está disponible, sin esperar a llenar el búfer
+        datos = entrada.read1(TAMANO_LECTURA)
+        if not datos:
+            break
+        salida.write(puntuador.alimentar(datos))
+        salida.flush()
+    salida.write(puntuador.terminar())
+    salida.flush()
+
+
+async def _atender(puntuador, lector, escritor):
+    try:
+        while True:
+            datos = await lector.read(TAMANO_LECTURA)
+            if not datos:
+                break
+            escritor.write(puntuador.alimentar(datos))
+            # Contrapresión: no se lee más mientras el cliente no consuma lo ya escrito
+            await escritor.drain()
+        escritor.write(puntuador.terminar())
+        await escritor.drain()
+    except ConnectionError:
+        pass
+    finally:
+        escritor.close()
+
+
+async def servir_socket(coeficientes, lote, ruta=None, puerto=None):
+    def conexion(lector, escritor):
+        # Cada conexión lleva su propio orden y sus propias líneas pendientes
+        return _atender(Puntuador(coeficientes, lote), lector, escritor)
+
+    if ruta is not None:
+        servidor = await asyncio.start_unix_server(conexion, path=ruta)
+        print(f"Escuchando en {ruta}", file=sys.stderr)
+    else:
+        servidor = await asyncio.start_server(conexion, host="127.0.0.1", port=puerto)
+        print(f"Escuchando en 127.0.0.1:{puerto}", file=sys.stderr)
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Puntúa registros JSON por líneas (VAIC™, ROA, ROE) sin Streamlit.")
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument("--socket", help="Ruta de un socket Unix donde escuchar (por defecto, stdin/stdout)")
+    grupo.add_argument("--puerto", type=int, help="Puerto TCP en 127.0.0.1 donde escuchar")
+    parser.add_argument("--coeficientes", help="JSON con coeficientes sectoriales alternativos")
+    parser.add_argument("--lote", type=int, default=LOTE_MAXIMO, help="Registros máximos por microlote")
+    args = parser.parse_args(argv)
+    coeficientes = cargar_coeficientes(args.coeficientes)
+
+    if args.socket is not None or args.puerto is not None:
+        try:
+            asyncio.run(servir_socket(coeficientes, args.lote, ruta=args.socket, puerto=args.puerto))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    puntuador = Puntuador(coeficientes, args.lote)
+    inicio = time.perf_counter()
+    servir_stdio(puntuador)
+    duracion = time.perf_counter() - inicio
+    velocidad = puntuador.registros / duracion if duracion > 0 else 0.0
+    print(f"{puntuador.registros:,} registros en {duracion:.2f} s ({velocidad:,.0f} registros/s); "
+          f"{puntuador.rechazados:,} rechazados, {puntuador.errores:,} ilegibles", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
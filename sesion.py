@@ -0,0 +1,104 @@
+"""Estado compartido entre páginas: coeficientes activos, histórico y trabajos en segundo plano."""
+import streamlit as st
+
+from almacen import AlmacenResultados
+from nucleo import COEFICIENTES_SECTOR
+from trabajos import CANCELADO, ESTADOS_FINALES, FALLIDO, GestorTrabajos
+
+def coeficientes_activos():
+    return st.session_state.get("coeficientes_sector") or COEFICIENTES_SECTOR
+
+# ==============================================
+# === TRABAJOS EN SEGUNDO PLANO ===
+# ==============================================
+@st.cache_resource
+def gestor_trabajos():
+    return GestorTrabajos()
+
+def lanzar_trabajo(tipo, nombre, funcion, *args, **kwargs):
+    """Lanza un trabajo de ``tipo`` para la sesión; el anterior del mismo tipo se cancela y sus archivos se borran."""
+    anterior = st.session_state.get("trabajos", {}).get(tipo)
+    if anterior is not None:
+        gestor_trabajos().descartar(anterior)
+    id_trabajo = gestor_trabajos().enviar(nombre, tipo, funcion, *args, **kwargs)
+    st.session_state.setdefault("trabajos", {})[tipo] = id_trabajo
+    return id_trabajo
+
+def trabajo_sesion(tipo):
+    """Último trabajo de ``tipo`` lanzado por esta sesión (None si no hay o ya se descartó)."""
+    id_trabajo = st.session_state.get("trabajos", {}).get(tipo)
+    return None if id_trabajo is None else gestor_trabajos().obtener(id_trabajo)
+
+# Solo este fragmento se vuelve a ejecutar mientras el trabajo avanza; al terminar, la página completa
+@st.fragment(run_every=0.5)
+def seguir_trabajo(id_trabajo):
+    estado = gestor_trabajos().estado(id_trabajo)
+    if estado is None or estado["estado"] in ESTADOS_FINALES:
+        st.rerun()
+    st.progress(estado["progreso"], text=f"{estado['nombre']}: {estado['mensaje'] or estado['estado']} · {estado['duracion']:.0f} s")
+    if st.button("Cancelar", key=f"btn_cancelar_{id_trabajo}"):
+        gestor_trabajos().cancelar(id_trabajo)
+
+def mostrar_trabajo(tipo):
+    """Muestra el progreso del trabajo de ``tipo``; lo devuelve solo si terminó bien."""
+    trabajo = trabajo_sesion(tipo)
+    if trabajo is None:
+        return None
+    if not trabajo.terminado:
+        seguir_trabajo(trabajo.id)
+        return None
+    if trabajo.estado == CANCELADO:
+        st.warning(f"{trabajo.nombre}: cancelado.")
+        return None
+    if trabajo.estado == FALLIDO:
+        st.error(f"{trabajo.nombre}: {trabajo.error}")
+        return None
+    return trabajo
+
+# ==============================================
+# === HISTÓRICO PERSISTENTE ===
+# ==============================================
+@st.cache_resource
+def almacen():
+    return AlmacenResultados()
+
+def cargar_en_sesion(fila):
+    st.session_state.update({
+        "empresa": fila["empresa"], "anio": int(fila["anio"]), "sector_indicadores": fila["sector"],
+        "it": float(fila["IT"]), "cv": float(fila["CV"]), "hc": float(fila["HC"]), "ce": float(fila["CE"]),
+        "va": float(fila["VA"]), "hce": float(fila["HCE"]), "sce": float(fila["SCE"]),
+        "vaic": float(fila["VAIC"]), "roa": float(fila["ROA"]), "roe": float(fila["ROE"])
+    })
+
+def mostrar_historial(prefijo):
+    empresas = almacen().empresas()
+    if not empresas:
+        st.caption("Aún no hay empresas guardadas. Indica la empresa y el año al calcular, o guarda un lote.")
+        return
+    empresa = st.selectbox("Empresa:", empresas, key=f"{prefijo}_hist_empresa")
+    historial = almacen().consultar(empresa=empresa)
+    st.dataframe(historial.drop(columns=["huella"]), use_container_width=True, hide_index=True)
+    anio = st.selectbox("Año:", historial["anio"].tolist()[::-1], key=f"{prefijo}_hist_anio")
+    if st.button("Cargar este año", key=f"{prefijo}_hist_cargar"):
+        cargar_en_sesion(historial[historial["anio"] == anio].iloc[0])
+        st.rerun()
+
+def adoptar_lote():
+    """Pasa a la sesión el resultado del último trabajo por lotes, una sola vez por trabajo."""
+    trabajo = trabajo_sesion("lote")
+    if trabajo is None or trabajo.estado in (CANCELADO, FALLIDO) or not trabajo.terminado:
+        return None
+    if st.session_state.get("lote_adoptado") != trabajo.id:
+        st.session_state.resultados_lote = trabajo.resultado["resultados"]
+        st.session_state.archivo_resultados_lote = trabajo.resultado["destino"]
+        st.session_state.referencia_lote = None
+        st.session_state.lote_adoptado = trabajo.id
+    return trabajo
+
+def indicadores_sesion():
+    return {
+        "VA": st.session_state.va, "HCE": st.session_state.hce, "SCE": st.session_state.sce,
+        "CEE": st.session_state.va / st.session_state.ce if st.session_state.ce != 0 else 0.0,
+        "VAIC": st.session_state.vaic, "ROA": st.session_state.roa, "ROE": st.session_state.roe
+    }
+
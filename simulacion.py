@@ -0,0 +1,130 @@
+"""Análisis de sensibilidad sobre la cadena VAIC™ y los modelos sectoriales ROA/ROE."""
+import numpy as np
+
+from nucleo import cadena_vaic, modelo_del_sector
+
+VARIABLES_ENTRADA = ["IT", "CV", "HC", "CE"]
+
+
+def malla_sensibilidad(base, sector, var_x, rango_x, var_y=None, rango_y=None,
+                       resolucion=500, coeficientes=None):
+    """Evalúa la cadena completa variando una o dos entradas alrededor de ``base``.
+
+    ``base`` es un mapeo con IT, CV, HC y CE; ``rango_x``/``rango_y`` son
+    variaciones relativas (p. ej. 0.3 para ±30 %). Toda la malla se calcula con
+    una sola difusión (broadcast) de NumPy. Devuelve los factores de cada eje y
+    un diccionario con VA, HCE, SCE, ICE, CEE, VAIC, ROA y ROE de forma
+    (len(factores_y), len(factores_x)); sin ``var_y`` el primer eje tiene largo 1.
+    """
+    factores_x = 1.0 + np.linspace(-rango_x, rango_x, resolucion)
+    factores_y = 1.0 + np.linspace(-rango_y, rango_y, resolucion) if var_y else np.ones(1)
+
+    entradas = {}
+    for variable in VARIABLES_ENTRADA:
+        valor = np.float64(base[variable])
+        if variable == var_x:
+            valor = valor * factores_x[np.newaxis, :]
+        if variable == var_y:
+            valor = valor * factores_y[:, np.newaxis]
+        entradas[variable] = valor
+    forma = np.broadcast_shapes(*(np.shape(v) for v in entradas.values()), (len(factores_y), len(factores_x)))
+    entradas = {k: np.broadcast_to(v, forma) for k, v in entradas.items()}
+
+    cadena = cadena_vaic(entradas["IT"], entradas["CV"], entradas["HC"], entradas["CE"])
+    # Un solo sector para toda la malla: los coeficientes se buscan una vez
+    modelo = modelo_del_sector(sector, coeficientes)
+    for objetivo in ("ROA", "ROE"):
+        intercepto, b_ice, b_cee = modelo[objetivo]
+        cadena[objetivo] = intercepto + b_ice * cadena["ICE"] + b_cee * cadena["CEE"]
+    return factores_x, factores_y, cadena
+
+
+# ==============================================
+# === SIMULACIÓN MONTE CARLO ===
+# ==============================================
+DISTRIBUCIONES = ["Fija", "Normal", "Lognormal", "Uniforme"]
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def _muestrear(rng, distribucion, n):
+    tipo, *parametros = distribucion
+    if tipo == "Fija":
+        return np.full(n, float(parametros[0]))
+    if tipo == "Normal":
+        media, desviacion = parametros
+        # Las entradas contables no pueden ser negativas
+        return np.maximum(rng.normal(media, desviacion, n), 0.0)
+    if tipo == "Lognormal":
+        media, desviacion = parametros
+        if media <= 0:
+            return np.zeros(n)
+        # Parámetros de la normal subyacente a partir de la media y desviación deseadas
+        sigma2 = np.log1p((desviacion / media) ** 2)
+        return rng.lognormal(np.log(media) - sigma2 / 2, np.sqrt(sigma2), n)
+    if tipo == "Uniforme":
+        minimo, maximo = parametros
+        return rng.uniform(minimo, maximo, n)
+    raise ValueError(f"Distribución desconocida: {tipo}")
+
+
+def _bloque_montecarlo(semilla, n, distribuciones, historico, modelo):
+    rng = np.random.default_rng(semilla)
+    if historico is not None:
+        # Bootstrap: filas completas, para conservar la correlación entre IT, CV, HC y CE
+        filas = historico[rng.integers(0, len(historico), n)]
+        entradas = dict(zip(VARIABLES_ENTRADA, filas.T))
+    else:
+        entradas = {v: _muestrear(rng, distribuciones[v], n) for v in VARIABLES_ENTRADA}
+    cadena = cadena_vaic(entradas["IT"], entradas["CV"], entradas["HC"], entradas["CE"])
+    salida = {"VAIC": cadena["VAIC"]}
+    for objetivo in ("ROA", "ROE"):
+        intercepto, b_ice, b_cee = modelo[objetivo]
+        salida[objetivo] = intercepto + b_ice * cadena["ICE"] + b_cee * cadena["CEE"]
+    return salida
+
+
+def simular_montecarlo(sector, distribuciones=None, historico=None, n=1_000_000, tamano_bloque=100_000,
+                       semilla=None, hilos=None, coeficientes=None, al_avanzar=None):
+    """Propaga ``n`` escenarios de IT, CV, HC y CE por la cadena VAIC™ y el modelo del sector.
+
+    Las entradas salen de ``distribuciones`` ({variable: (tipo, *parámetros)}, ver
+    DISTRIBUCIONES) o, si se da ``historico`` (matriz n×4 en el orden de
+    VARIABLES_ENTRADA), de un bootstrap de sus filas. Los bloques se reparten en un
+    pool de hilos (NumPy libera el GIL) con semillas independientes derivadas de
+    ``semilla``, así que el resultado es reproducible. Devuelve, para VAIC, ROA y
+    ROE, la media y los PERCENTILES. ``al_avanzar(bloques_hechos, total_bloques)``
+    se llama al terminar cada bloque.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import os
+
+    if historico is not None:
+        historico = np.asarray(historico, dtype=float)
+        historico = historico[np.isfinite(historico).all(axis=1)]
+        if len(historico) == 0:
+            raise ValueError("El histórico no tiene filas válidas.")
+    modelo = modelo_del_sector(sector, coeficientes)
+    tamanos = [tamano_bloque] * (n // tamano_bloque) + ([n % tamano_bloque] if n % tamano_bloque else [])
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    pool = ThreadPoolExecutor(max_workers=hilos or os.cpu_count() or 1)
+    try:
+        bloques = []
+        for bloque in pool.map(
+            lambda args: _bloque_montecarlo(args[0], args[1], distribuciones, historico, modelo),
+            zip(semillas, tamanos)
+        ):
+            bloques.append(bloque)
+            if al_avanzar is not None:
+                al_avanzar(len(bloques), len(tamanos))
+    finally:
+        # Si ``al_avanzar`` interrumpe (p. ej. cancelación), los bloques pendientes no se ejecutan
+        pool.shutdown(cancel_futures=True)
+
+    resumen = {}
+    for objetivo in ("VAIC", "ROA", "ROE"):
+        valores = np.concatenate([b[objetivo] for b in bloques])
+        resumen[objetivo] = {"media": float(np.mean(valores))}
+        resumen[objetivo].update(
+            {f"P{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(valores, PERCENTILES))}
+        )
+    return resumen
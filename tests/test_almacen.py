@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+
+from almacen import AlmacenResultados
+from nucleo import INDICADORES_LOTE, puntuar_lote
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    almacen = AlmacenResultados(str(tmp_path / "resultados.sqlite"))
+    yield almacen
+    almacen.cerrar()
+
+
+def lote(**cambios):
+    df = pd.DataFrame({
+        "empresa": ["A", "A", "B"], "anio": [2020, 2021, 2020], "sector": ["Comercial", "Comercial", "Primaria"],
+        "IT": [1000.0, 1100.0, 5000.0], "CV": [200.0, 250.0, 1200.0],
+        "HC": [100.0, 120.0, 800.0], "CE": [900.0, 950.0, 20000.0],
+    })
+    for columna, valores in cambios.items():
+        df[columna] = valores
+    return df
+
+
+def test_guardar_dos_veces_no_recalcula_ni_cambia_la_version(almacen):
+    assert almacen.guardar_lote(lote()) == (3, 0)
+    version = almacen.version()
+    guardado = almacen.consultar()
+    assert almacen.guardar_lote(lote()) == (0, 3)
+    assert almacen.version() == version
+    pd.testing.assert_frame_equal(almacen.consultar(), guardado)
+
+
+def test_guardado_coincide_con_el_nucleo(almacen):
+    almacen.guardar_lote(lote())
+    guardado = almacen.consultar()
+    esperado = puntuar_lote(lote()).sort_values(["empresa", "anio"], ignore_index=True)
+    assert guardado["sector"].tolist() == ["Comercial", "Comercial", "Primario"]
+    for columna in INDICADORES_LOTE:
+        assert guardado[columna].tolist() == pytest.approx(esperado[columna].tolist())
+
+
+def test_actualizar_una_fila_cambia_la_version_aunque_sea_en_el_mismo_segundo(almacen):
+    almacen.guardar_lote(lote())
+    version = almacen.version()
+    assert almacen.guardar_lote(lote(IT=[1000.0, 1100.0, 6000.0])) == (1, 2)
+    assert almacen.version() != version
+    assert almacen.total() == 3
+    assert almacen.consultar(empresa="B")["IT"].tolist() == [6000.0]
+
+
+def test_claves_repetidas_en_un_lote_se_queda_la_ultima(almacen):
+    df = pd.concat([lote(), lote(IT=[2000.0, 2100.0, 7000.0])], ignore_index=True)
+    assert almacen.guardar_lote(df) == (3, 0)
+    assert almacen.consultar()["IT"].tolist() == [2000.0, 2100.0, 7000.0]
+
+
+def test_coeficientes_distintos_vuelven_a_puntuar(almacen):
+    almacen.guardar_lote(lote())
+    coeficientes = {"Comercial": {"ROA": (1.0, 0.0, 0.0), "ROE": (1.0, 0.0, 0.0)}}
+    assert almacen.guardar_lote(lote(), coeficientes) == (3, 0)
+    assert almacen.consultar(empresa="A")["ROA"].tolist() == [1.0, 1.0]
+
+
+def test_faltan_empresa_o_anio(almacen):
+    with pytest.raises(ValueError, match="anio"):
+        almacen.guardar_lote(lote().drop(columns="anio"))
@@ -0,0 +1,259 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from nucleo import (
+    AcumuladorSectores, INDICADORES_LOTE, MINIMO_ATIPICOS, MOTIVOS_RECHAZO, ReferenciaAtipicos, aplicar_modelo_sectorial,
+    cadena_vaic, calcular_indicadores_lote, datos_estimacion, estimar_coeficientes, motivos_rechazo, procesar_por_bloques,
+    validar_lote
+)
+
+
+def indicadores_escalares(it, cv, hc, ce, sector):
+    """Fórmulas del cálculo individual original, fila por fila."""
+    va = max(it - cv, 0.0)
+    hce = va / hc if hc != 0 else 0.0
+    sc = max(va - hc, 0.0)
+    sce = sc / va if va != 0 else 0.0
+    ice = hce + sce
+    cee = va / ce if ce != 0 else 0.0
+    vaic = ice + cee
+    if sector == "Comercial":
+        roa = 0.017000167 + 0.000090463 * ice + 0.065590993 * cee
+        roe = -0.15508027 + 0.00774242 * ice + 0.930391243 * cee
+    elif sector in ("Primaria", "Primario"):
+        roa = 0.027048998 - 0.004791466 * ice + 0.083361825 * cee
+        roe = 0.084135634 - 0.008724684 * ice + 0.151617468 * cee
+    else:
+        roa = -0.001171129 + 0.005704393 * ice + 0.028213145 * cee
+        roe = 0.010838631 + 0.009842492 * ice + 0.069439342 * cee
+    return {"VA": va, "HCE": hce, "SCE": sce, "ICE": ice, "CEE": cee, "VAIC": vaic, "ROA": roa, "ROE": roe}
+
+
+CASOS = [
+    (1000.0, 200.0, 100.0, 900.0, "Comercial"),
+    (5000.0, 1200.0, 4000.0, 20000.0, "Primario"),
+    (5000.0, 1200.0, 800.0, 20000.0, "Primaria"),
+    (750.0, 10.0, 300.0, 1500.0, "Inmobiliario"),
+    (1000.0, 1000.0, 100.0, 900.0, "Comercial"),   # VA cero
+    (1000.0, 1500.0, 100.0, 900.0, "Primario"),    # CV > IT: VA recortado a cero
+    (1000.0, 200.0, 0.0, 900.0, "Inmobiliario"),   # HC cero
+    (1000.0, 200.0, 100.0, 0.0, "Comercial"),      # CE cero
+    (0.0, 0.0, 0.0, 0.0, "Primaria"),
+]
+
+
+def test_cadena_y_modelo_igualan_formulas_escalares():
+    it, cv, hc, ce, sector = (list(columna) for columna in zip(*CASOS))
+    cadena = cadena_vaic(it, cv, hc, ce)
+    roa, roe = aplicar_modelo_sectorial(cadena["ICE"], cadena["CEE"], sector)
+    for i, caso in enumerate(CASOS):
+        esperado = indicadores_escalares(*caso)
+        for clave in ("VA", "HCE", "SCE", "ICE", "CEE", "VAIC"):
+            assert cadena[clave][i] == pytest.approx(esperado[clave], abs=1e-12), (caso, clave)
+        assert roa[i] == pytest.approx(esperado["ROA"], abs=1e-12), caso
+        assert roe[i] == pytest.approx(esperado["ROE"], abs=1e-12), caso
+
+
+def test_alias_primaria_usa_el_modelo_primario():
+    cadena = cadena_vaic([5000.0, 5000.0], [1200.0, 1200.0], [800.0, 800.0], [20000.0, 20000.0])
+    roa, roe = aplicar_modelo_sectorial(cadena["ICE"], cadena["CEE"], ["Primaria", " Primario "])
+    assert roa[0] == roa[1] and roe[0] == roe[1]
+
+
+def test_sector_sin_modelo_deja_roa_y_roe_vacios():
+    resultado = calcular_indicadores_lote([1000.0], [200.0], [100.0], [900.0], ["Minero"])
+    assert list(resultado.columns) == INDICADORES_LOTE
+    assert np.isnan(resultado.loc[0, "ROA"]) and np.isnan(resultado.loc[0, "ROE"])
+    assert resultado.loc[0, "VA"] == 800.0
+
+
+def test_coeficientes_alternativos():
+    coeficientes = {"Comercial": {"ROA": (1.0, 0.0, 0.0), "ROE": (0.0, 1.0, 1.0)}}
+    cadena = cadena_vaic([1000.0], [200.0], [100.0], [900.0])
+    roa, roe = aplicar_modelo_sectorial(cadena["ICE"], cadena["CEE"], ["Comercial"], coeficientes)
+    assert roa[0] == 1.0
+    assert roe[0] == pytest.approx(cadena["ICE"][0] + cadena["CEE"][0])
+
+
+# ==============================================
+# === VALIDACIÓN ===
+# ==============================================
+def bit(motivo):
+    return 1 << list(MOTIVOS_RECHAZO).index(motivo)
+
+
+def test_validar_lote_marca_cada_regla_con_su_bit():
+    df = pd.DataFrame({
+        "IT": [1000.0, np.nan, -5.0, 100.0, 100.0, 1000.0, 1000.0, 1000.0],
+        "CV": [200.0, 10.0, 10.0, 300.0, 100.0, 200.0, 200.0, 200.0],
+        "HC": [100.0, 10.0, 10.0, 10.0, 10.0, 0.0, 100.0, 100.0],
+        "CE": [900.0, 10.0, 10.0, 10.0, 10.0, 900.0, -1.0, 900.0],
+        "sector": ["Comercial", "Comercial", "Comercial", "Comercial", "Comercial", "Comercial", "Comercial", " "],
+    })
+    codigos = validar_lote(df, umbral_atipicos=None)
+    assert codigos.dtype == np.uint16
+    assert codigos.tolist() == [
+        0,
+        bit("FALTANTE"),
+        bit("NEGATIVO") | bit("CV_MAYOR_IT"),
+        bit("CV_MAYOR_IT"),
+        bit("VA_CERO"),
+        bit("HC_NO_POSITIVO"),
+        bit("CE_NO_POSITIVO"),
+        bit("FALTANTE"),
+    ]
+    assert motivos_rechazo(codigos).tolist() == [
+        "", "FALTANTE", "NEGATIVO;CV_MAYOR_IT", "CV_MAYOR_IT", "VA_CERO", "HC_NO_POSITIVO", "CE_NO_POSITIVO", "FALTANTE"
+    ]
+
+
+def test_validar_lote_acepta_texto_no_numerico_como_faltante():
+    codigos = validar_lote({"IT": ["mil"], "CV": [1.0], "HC": [1.0], "CE": [1.0], "sector": ["Comercial"]})
+    assert codigos.tolist() == [bit("FALTANTE")]
+
+
+def test_atipicos_solo_entre_filas_validas_de_su_sector():
+    rng = np.random.default_rng(0)
+    n = 200
+    df = pd.DataFrame({
+        "IT": rng.uniform(900, 1100, n), "CV": rng.uniform(100, 200, n),
+        "HC": rng.uniform(90, 110, n), "CE": rng.uniform(800, 1000, n), "sector": ["Comercial"] * n,
+    })
+    df.loc[0, "HC"] = 1e-6       # HCE enorme
+    df.loc[1, "HC"] = 0.0        # ya rechazada por otra regla: no cuenta como atípica
+    codigos = validar_lote(df)
+    assert codigos[0] == bit("ATIPICO")
+    assert codigos[1] == bit("HC_NO_POSITIVO")
+    assert not codigos[2:].any()
+    assert not validar_lote(df, umbral_atipicos=None)[0]
+
+
+def panel_con_atipicos(n, semilla):
+    rng = np.random.default_rng(semilla)
+    it = rng.lognormal(8, 1, n)
+    df = pd.DataFrame({
+        "IT": it, "CV": it * rng.uniform(0.1, 1.05, n), "HC": rng.lognormal(6, 1, n), "CE": rng.lognormal(9, 1, n),
+        "sector": rng.choice(["Comercial", "Primario", "Primaria", "Inmobiliario", "Otro"], n, p=[.45, .2, .1, .24, .01]),
+    })
+    df.loc[rng.choice(n, 10, replace=False), "HC"] = 1e-4
+    return df
+
+
+@pytest.mark.parametrize("tamano_bloque", [3, 7, 100])
+def test_rechazos_no_dependen_del_tamano_de_bloque(tmp_path, tamano_bloque):
+    entrada = tmp_path / "panel.csv"
+    panel_con_atipicos(2000, 2).to_csv(entrada, index=False)
+
+    def rechazos(tamano):
+        destino = tmp_path / f"rechazos_{tamano}.csv"
+        _, _, filas, registro = procesar_por_bloques(str(entrada), tamano_bloque=tamano, destino_rechazos=str(destino))
+        return filas, registro.motivos, pd.read_csv(destino)[["fila", "motivos"]]
+
+    filas, motivos, detalle = rechazos(2000)
+    assert motivos["ATIPICO"] >= 5
+    otro_filas, otros_motivos, otro_detalle = rechazos(tamano_bloque)
+    assert (otro_filas, otros_motivos) == (filas, motivos)
+    pd.testing.assert_frame_equal(otro_detalle, detalle)
+
+
+def test_referencia_por_bloques_iguala_validar_todo_junto():
+    df = panel_con_atipicos(3000, 3)
+    referencia = ReferenciaAtipicos()
+    for desde in range(0, len(df), 250):
+        referencia.actualizar(df.iloc[desde:desde + 250])
+    por_bloques = np.concatenate([
+        validar_lote(df.iloc[desde:desde + 250], referencia=referencia) for desde in range(0, len(df), 250)
+    ])
+    assert np.array_equal(por_bloques, validar_lote(df))
+
+
+def test_muestra_de_la_referencia_no_depende_de_los_bloques():
+    df = panel_con_atipicos(3000, 4)
+    referencias = []
+    for tamano in (3000, 17):
+        referencia = ReferenciaAtipicos(muestra=100)
+        for desde in range(0, len(df), tamano):
+            referencia.actualizar(df.iloc[desde:desde + tamano])
+        referencias.append(referencia)
+    assert np.array_equal(validar_lote(df, referencia=referencias[0]), validar_lote(df, referencia=referencias[1]))
+
+
+def test_sectores_pequenos_no_se_evaluan_como_atipicos():
+    n = MINIMO_ATIPICOS
+    df = pd.DataFrame({"IT": [1000.0] * n, "CV": [200.0] * n, "HC": np.linspace(80.0, 120.0, n),
+                       "CE": [900.0] * n, "sector": ["Comercial"] * n})
+    df.loc[0, "HC"] = 1e-6
+    assert validar_lote(df)[0] == bit("ATIPICO")
+    # Con una fila menos el sector ya no tiene referencia
+    assert not validar_lote(df.iloc[:n - 1]).any()
+
+
+# ==============================================
+# === ACUMULADOR POR SECTOR ===
+# ==============================================
+def test_acumulador_por_bloques_iguala_una_pasada():
+    rng = np.random.default_rng(1)
+    n = 1000
+    df = pd.DataFrame(rng.normal(size=(n, len(INDICADORES_LOTE))), columns=INDICADORES_LOTE)
+    df["sector"] = rng.choice(["Comercial", "Primario", "Inmobiliario"], n)
+    df.loc[rng.choice(n, 50, replace=False), "ROA"] = np.nan   # sectores sin modelo dejan NaN
+
+    completo = AcumuladorSectores()
+    completo.actualizar(df)
+    por_bloques = AcumuladorSectores()
+    # Bloques desparejos, incluido uno de una sola fila
+    cortes = [0, 7, 400, 401, 999, n]
+    for desde, hasta in zip(cortes, cortes[1:]):
+        por_bloques.actualizar(df.iloc[desde:hasta])
+
+    a, b = completo.resumen(), por_bloques.resumen()
+    assert a[["sector", "indicador", "n"]].equals(b[["sector", "indicador", "n"]])
+    for columna in ("media", "desviacion", "minimo", "maximo"):
+        np.testing.assert_allclose(a[columna], b[columna], rtol=1e-12, atol=1e-12)
+
+    esperado = df.groupby("sector")[INDICADORES_LOTE].agg(["count", "mean", "std", "min", "max"])
+    for _, fila in b.iterrows():
+        referencia = esperado.loc[fila["sector"], fila["indicador"]]
+        assert fila["n"] == referencia["count"]
+        assert fila["media"] == pytest.approx(referencia["mean"])
+        assert fila["desviacion"] == pytest.approx(referencia["std"])
+        assert fila["minimo"] == referencia["min"] and fila["maximo"] == referencia["max"]
+
+
+# ==============================================
+# === RE-ESTIMACIÓN ===
+# ==============================================
+def panel_observado(n, semilla):
+    rng = np.random.default_rng(semilla)
+    it = rng.lognormal(8, 1, n)
+    df = pd.DataFrame({
+        "IT": it, "CV": it * rng.uniform(0.1, 0.9, n), "HC": rng.lognormal(6, 1, n), "CE": rng.lognormal(9, 1, n),
+        "sector": rng.choice(["Comercial", "Primario", "Primaria", "Inmobiliario"], n),
+    })
+    cadena = cadena_vaic(df["IT"], df["CV"], df["HC"], df["CE"])
+    df["ROA"] = 0.02 + 0.001 * cadena["ICE"] + 0.05 * cadena["CEE"] + rng.normal(0, 0.01, n)
+    df["ROE"] = rng.normal(0.1, 0.05, n)
+    # Un sector con CEE constante (singular) y otro con solo dos filas (sin ajuste)
+    constante = pd.DataFrame({"IT": [10.0, 20.0, 30.0, 40.0], "CV": [1.0, 2.0, 3.0, 4.0], "HC": [1.0, 2.0, 1.0, 3.0],
+                              "CE": [9.0, 18.0, 27.0, 36.0], "sector": "Minero", "ROA": [0.1, 0.2, 0.3, 0.5],
+                              "ROE": [1.0, 2.0, 3.0, 5.0]})
+    return pd.concat([df, constante, constante.iloc[:2].assign(sector="Pesca")], ignore_index=True)
+
+
+def test_estimar_coeficientes_iguala_lstsq_por_sector():
+    df = panel_observado(5000, 5)
+    coeficientes, diagnostico = estimar_coeficientes(df)
+    assert set(coeficientes) == {"Comercial", "Primario", "Inmobiliario", "Minero"}
+    X, Y, sectores, validas = datos_estimacion(df)
+    for sector, modelo in coeficientes.items():
+        filas = validas & (sectores == sector)
+        diseno = np.column_stack([np.ones(filas.sum()), X[filas]])
+        referencia = np.linalg.lstsq(diseno, Y[filas], rcond=None)[0]
+        beta = np.array([modelo["ROA"], modelo["ROE"]]).T
+        # En el sector singular los coeficientes no son únicos, pero sí los valores ajustados
+        np.testing.assert_allclose(diseno @ beta, diseno @ referencia, atol=1e-10)
+        if sector != "Minero":
+            np.testing.assert_allclose(beta, referencia, rtol=1e-9, atol=1e-12)
+        r2 = 1.0 - ((Y[filas] - diseno @ referencia) ** 2).sum(axis=0) / ((Y[filas] - Y[filas].mean(axis=0)) ** 2).sum(axis=0)
+        np.testing.assert_allclose(diagnostico.query("sector == @sector")["R2"], r2, rtol=1e-9)
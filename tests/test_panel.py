@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from panel import actualizar_panel, calcular_panel
+
+
+def panel_aleatorio(empresas, anios, semilla):
+    rng = np.random.default_rng(semilla)
+    claves = pd.MultiIndex.from_product([empresas, anios], names=["empresa", "anio"]).to_frame(index=False)
+    n = len(claves)
+    it = rng.uniform(500, 5000, n)
+    return claves.assign(
+        IT=it, CV=it * rng.uniform(0.1, 1.1, n), HC=rng.uniform(50, 500, n), CE=rng.uniform(1000, 9000, n),
+        sector=rng.choice(["Comercial", "Primario", "Inmobiliario", "Otro"], n)
+    )
+
+
+def comparar(a, b):
+    columnas = sorted(a.columns)
+    assert columnas == sorted(b.columns)
+    pd.testing.assert_frame_equal(
+        a[columnas].reset_index(drop=True), b[columnas].reset_index(drop=True), check_exact=False, rtol=1e-12
+    )
+
+
+@pytest.mark.parametrize("ventana", [1, 2, 3, 5])
+def test_actualizar_con_anios_nuevos_iguala_recalcular(ventana):
+    historico = panel_aleatorio(["A", "B", "C"], range(2010, 2018), 0)
+    nuevas = pd.concat([
+        panel_aleatorio(["A", "C"], range(2018, 2020), 1),
+        panel_aleatorio(["D"], range(2015, 2019), 2),
+    ], ignore_index=True)
+    actualizado = actualizar_panel(calcular_panel(historico, ventana), nuevas, ventana)
+    comparar(actualizado, calcular_panel(pd.concat([historico, nuevas]), ventana))
+
+
+def test_actualizar_un_anio_intermedio_recalcula_los_siguientes():
+    historico = panel_aleatorio(["A", "B"], range(2010, 2020), 3)
+    corregida = historico[(historico["empresa"] == "A") & (historico["anio"] == 2014)].assign(IT=99999.0)
+    actualizado = actualizar_panel(calcular_panel(historico), corregida)
+    comparar(actualizado, calcular_panel(pd.concat([historico, corregida])))
+    # La empresa no afectada queda tal cual
+    comparar(actualizado[actualizado["empresa"] == "B"], calcular_panel(historico).query("empresa == 'B'"))
+
+
+def test_actualizar_sin_filas_devuelve_el_mismo_panel():
+    panel = calcular_panel(panel_aleatorio(["A"], range(2010, 2013), 4))
+    assert actualizar_panel(panel, panel_aleatorio(["A"], [], 5)) is panel
+
+
+def test_tcac_solo_con_va_positivo_en_ambos_extremos():
+    df = pd.DataFrame({
+        "empresa": ["A"] * 3 + ["B"] * 2, "anio": [2018, 2019, 2020, 2019, 2020],
+        "IT": [1100.0, 1200.0, 1310.0, 100.0, 500.0], "CV": [100.0, 100.0, 100.0, 100.0, 100.0],
+        "HC": [10.0] * 5, "CE": [100.0] * 5, "sector": ["Comercial"] * 5,
+    })
+    panel = calcular_panel(df)
+    assert np.isnan(panel.loc[0, "VA_TCAC"])
+    assert panel.loc[2, "VA_TCAC"] == pytest.approx((1210.0 / 1000.0) ** 0.5 - 1.0)
+    assert np.isnan(panel.loc[4, "VA_TCAC"])   # VA inicial de B es cero
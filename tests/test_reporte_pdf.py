@@ -0,0 +1,52 @@
+import io
+import zipfile
+
+import pandas as pd
+
+from nucleo import puntuar_lote
+from reporte_pdf import generar_reporte_pdf, reportes_en_zip
+
+
+def lote_multianual():
+    return puntuar_lote(pd.DataFrame({
+        "empresa": ["A", "A", "A", "B", "B", "A"], "anio": [2019, 2020, 2021, 2020, 2021, 2021],
+        "IT": [1000.0, 1100.0, 1200.0, 5000.0, 5200.0, 1250.0], "CV": [200.0, 250.0, 260.0, 1200.0, 1300.0, 260.0],
+        "HC": [100.0, 120.0, 130.0, 800.0, 820.0, 130.0], "CE": [900.0, 950.0, 990.0, 20000.0, 21000.0, 990.0],
+        "sector": ["Comercial"] * 3 + ["Primario"] * 2 + ["Comercial"],
+    }))
+
+
+def nombres_zip(filas, **opciones):
+    salida = io.BytesIO()
+    total = reportes_en_zip(filas, salida, procesos=1, graficas=None, **opciones)
+    with zipfile.ZipFile(salida) as archivo_zip:
+        nombres = archivo_zip.namelist()
+        assert all(archivo_zip.read(n).startswith(b"%PDF") for n in nombres)
+    assert total == len(nombres) == len(filas)
+    return nombres
+
+
+def test_nombres_unicos_por_empresa_y_anio():
+    nombres = nombres_zip(lote_multianual().to_dict("records"), columna_id="empresa")
+    assert len(set(nombres)) == len(nombres)
+    assert nombres[:3] == [
+        "Reporte_VAIC_A_2019_Comercial.pdf", "Reporte_VAIC_A_2020_Comercial.pdf", "Reporte_VAIC_A_2021_Comercial.pdf"
+    ]
+    # (A, 2021) aparece dos veces en el lote
+    assert nombres[5] == "Reporte_VAIC_A_2021_Comercial_5.pdf"
+
+
+def test_nombres_unicos_sin_columna_de_anio():
+    filas = lote_multianual().drop(columns="anio").to_dict("records")
+    nombres = nombres_zip(filas, columna_id="empresa")
+    assert len(set(nombres)) == len(nombres)
+    assert nombres[0] == "Reporte_VAIC_A_0_Comercial.pdf"
+    assert len(set(nombres_zip(filas))) == len(filas)
+
+
+def test_membrete_incrusta_el_logo_una_vez_por_documento():
+    indicadores = lote_multianual().iloc[0].to_dict()
+    for _ in range(2):
+        pdf = generar_reporte_pdf(indicadores, "Comercial", graficas=None).getvalue()
+        assert pdf.startswith(b"%PDF") and pdf.rstrip().endswith(b"%%EOF")
+        assert pdf.count(b"/Subtype /Image") == 1
@@ -0,0 +1,59 @@
+import io
+import json
+
+import numpy as np
+
+from nucleo import INDICADORES_LOTE, calcular_indicadores_lote
+from servicio import Puntuador, puntuar_registros, servir_stdio
+
+
+def respuestas(salida):
+    return [json.loads(linea) for linea in salida.decode().splitlines()]
+
+
+def test_orden_y_lineas_ilegibles():
+    entrada = (
+        b'{"IT": 1000, "CV": 200, "HC": 100, "CE": 900, "sector": "Comercial", "id": 1}\n'
+        b'{"IT": 1000, "CV": 200\n'
+        b'[1, 2]\n'
+        b'{"it": 100, "cv": 300, "hc": 10, "ce": 10, "sector": "Primaria", "id": 4}\n'
+        b'\n'
+        b'{"IT": 5000, "CV": 1200, "HC": 800, "CE": 20000, "Sector": "Primaria", "id": 5}\n'
+        b'{"IT": 10, "CV": 1, "HC": 1, "CE": 1, "sector": "Minero", "id": 6}'
+    )
+    salida = io.BytesIO()
+    puntuador = Puntuador(lote=2)
+    servir_stdio(puntuador, io.BufferedReader(io.BytesIO(entrada)), salida)
+    filas = respuestas(salida.getvalue())
+
+    assert len(filas) == 6
+    assert filas[0]["id"] == 1 and "VAIC" in filas[0]
+    assert filas[1]["error"].startswith("JSON inválido")
+    assert filas[2] == {"error": "Se esperaba un objeto JSON"}
+    assert filas[3]["id"] == 4 and filas[3]["motivos"] == "CV_MAYOR_IT"
+    assert filas[4]["id"] == 5
+    esperado = calcular_indicadores_lote([5000.0], [1200.0], [800.0], [20000.0], ["Primario"]).iloc[0]
+    for clave in INDICADORES_LOTE:
+        assert np.isclose(filas[4][clave], esperado[clave])
+    # Sector sin modelo: ROA y ROE van como null, no como NaN
+    assert filas[5]["id"] == 6 and filas[5]["ROA"] is None and filas[5]["ROE"] is None
+    assert (puntuador.registros, puntuador.rechazados, puntuador.errores) == (6, 1, 2)
+
+
+def test_lineas_partidas_entre_lecturas():
+    puntuador = Puntuador()
+    linea = b'{"IT": 1000, "CV": 200, "HC": 100, "CE": 900, "sector": "Comercial", "id": %d}\n'
+    flujo = b"".join(linea % i for i in range(50))
+    salida = b"".join(puntuador.alimentar(flujo[desde:desde + 37]) for desde in range(0, len(flujo), 37))
+    salida += puntuador.terminar()
+    assert [fila["id"] for fila in respuestas(salida)] == list(range(50))
+
+
+def test_registros_con_mayusculas_mezcladas_en_un_microlote():
+    registros = puntuar_registros([
+        {"IT": 1000, "CV": 200, "HC": 100, "CE": 900, "sector": "Comercial"},
+        {"it": 1000, "cv": 200, "hc": 100, "ce": 900, "SECTOR": "Comercial"},
+        {"IT": 1000, "CV": 200, "HC": 100, "sector": "Comercial"},
+    ])
+    assert registros[0]["VAIC"] == registros[1]["VAIC"]
+    assert registros[2]["motivos"] == "FALTANTE"
@@ -0,0 +1,87 @@
+import gc
+import os
+import time
+import weakref
+
+import pandas as pd
+
+from trabajos import TERMINADO, GestorTrabajos
+
+
+def resultado_grande(trabajo, filas=100_000):
+    ruta = os.path.join(trabajo.carpeta(), "resultados.csv")
+    with open(ruta, "w") as f:
+        f.write("x\n")
+    return {"resultados": pd.DataFrame({"VA": range(filas)}), "destino": ruta}
+
+
+def esperar(gestor, id_trabajo):
+    while gestor.estado(id_trabajo)["estado"] != TERMINADO:
+        time.sleep(0.005)
+
+
+def referencias(gestor, id_trabajo):
+    # Sin quedarse con el Trabajo: solo referencias débiles a su resultado y la ruta de su carpeta
+    trabajo = gestor.obtener(id_trabajo)
+    return weakref.ref(trabajo.resultado["resultados"]), trabajo.resultado["destino"]
+
+
+def test_salir_por_capacidad_libera_resultado_y_archivos():
+    gestor = GestorTrabajos(hilos=1, capacidad=2)
+    primero = gestor.enviar("lote", "lote", resultado_grande)
+    esperar(gestor, primero)
+    resultado, destino = referencias(gestor, primero)
+    assert resultado() is not None and os.path.exists(destino)
+
+    for _ in range(2):
+        esperar(gestor, gestor.enviar("lote", "lote", resultado_grande))
+    gc.collect()
+    assert gestor.obtener(primero) is None
+    assert resultado() is None
+    assert not os.path.exists(destino)
+
+
+def test_trabajos_sin_consultar_vencen():
+    gestor = GestorTrabajos(hilos=1, vida=0.2)
+    id_trabajo = gestor.enviar("lote", "lote", resultado_grande)
+    esperar(gestor, id_trabajo)
+    resultado, destino = referencias(gestor, id_trabajo)
+    # Consultarlo a tiempo lo mantiene vivo
+    for _ in range(3):
+        time.sleep(0.1)
+        assert gestor.obtener(id_trabajo) is not None
+    time.sleep(0.3)
+    assert gestor.obtener(id_trabajo) is None
+    gc.collect()
+    assert resultado() is None
+    assert not os.path.exists(destino)
+
+
+def test_por_capacidad_sale_el_consultado_hace_mas_tiempo():
+    gestor = GestorTrabajos(hilos=1, capacidad=2)
+    viejo = gestor.enviar("a", "a", resultado_grande, 10)
+    nuevo = gestor.enviar("b", "b", resultado_grande, 10)
+    esperar(gestor, viejo)
+    esperar(gestor, nuevo)
+    time.sleep(0.01)
+    gestor.obtener(viejo)
+    esperar(gestor, gestor.enviar("c", "c", resultado_grande, 10))
+    assert gestor.obtener(viejo) is not None
+    assert gestor.obtener(nuevo) is None
+
+
+def test_trabajo_en_curso_no_sale_del_registro():
+    gestor = GestorTrabajos(hilos=2, capacidad=1, vida=0.0)
+
+    def lento(trabajo):
+        while True:
+            trabajo.avanzar(0.5)
+            time.sleep(0.01)
+
+    id_trabajo = gestor.enviar("lento", "lento", lento)
+    time.sleep(0.05)
+    try:
+        gestor.enviar("otro", "otro", resultado_grande, 10)
+        assert gestor.obtener(id_trabajo) is not None
+    finally:
+        gestor.cancelar(id_trabajo)
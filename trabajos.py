@@ -0,0 +1,191 @@
+"""Trabajos en segundo plano: cálculo por lotes, reportes masivos y simulaciones.
+
+Un ``GestorTrabajos`` por proceso reparte los trabajos en un pool de hilos y
+devuelve un identificador; la página consulta ``estado()`` (una copia barata de
+unos pocos campos) para mostrar el progreso. La cancelación es cooperativa: la
+función del trabajo llama a ``trabajo.avanzar(...)`` y, si se pidió cancelar,
+esa llamada lanza ``TrabajoCancelado``. Los trabajos terminados se conservan
+como caché de resultados que otras páginas pueden leer, hasta ``capacidad`` y
+mientras alguna sesión los consulte: un trabajo terminado que nadie pidió en
+``vida`` segundos (su sesión se cerró) sale del registro y libera su resultado.
+
+Los archivos de salida de un trabajo van en su propia carpeta temporal
+(``trabajo.carpeta()``), que se borra cuando el trabajo se cancela o falla,
+cuando se descarta (la sesión lanzó otro del mismo tipo) o cuando sale del
+registro.
+"""
+import atexit
+import itertools
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+EN_COLA = "en cola"
+EN_CURSO = "en curso"
+TERMINADO = "terminado"
+CANCELADO = "cancelado"
+FALLIDO = "error"
+ESTADOS_FINALES = (TERMINADO, CANCELADO, FALLIDO)
+# Segundos que un trabajo terminado sigue en el registro sin que nadie lo consulte
+VIDA_TRABAJOS = 30 * 60
+
+
+class TrabajoCancelado(Exception):
+    """Lanzada dentro del trabajo cuando el usuario pidió cancelarlo."""
+
+
+class Trabajo:
+    def __init__(self, id_trabajo, nombre, tipo):
+        self.id = id_trabajo
+        self.nombre = nombre
+        self.tipo = tipo
+        self.estado = EN_COLA
+        self.progreso = 0.0
+        self.mensaje = ""
+        self.resultado = None
+        self.error = None
+        self.creado = time.time()
+        self.consultado = self.creado
+        self.inicio = None
+        self.fin = None
+        self._cancelar = threading.Event()
+        self._descartado = False
+        self._carpeta = None
+
+    def avanzar(self, fraccion, mensaje=None):
+        """Informa el progreso (0–1); lanza TrabajoCancelado si se pidió cancelar."""
+        self.progreso = min(max(float(fraccion), 0.0), 1.0)
+        if mensaje is not None:
+            self.mensaje = mensaje
+        if self._cancelar.is_set():
+            raise TrabajoCancelado()
+
+    def carpeta(self):
+        """Carpeta temporal propia del trabajo para sus archivos de salida (se crea al pedirla)."""
+        if self._carpeta is None:
+            self._carpeta = tempfile.mkdtemp(prefix=f"uta_{self.id}_")
+        return self._carpeta
+
+    def _borrar_archivos(self):
+        carpeta, self._carpeta = self._carpeta, None
+        if carpeta is not None:
+            shutil.rmtree(carpeta, ignore_errors=True)
+
+    @property
+    def terminado(self):
+        return self.estado in ESTADOS_FINALES
+
+    @property
+    def duracion(self):
+        if self.inicio is None:
+            return 0.0
+        return (self.fin or time.time()) - self.inicio
+
+    def resumen(self):
+        return {
+            "id": self.id, "nombre": self.nombre, "tipo": self.tipo, "estado": self.estado,
+            "progreso": self.progreso, "mensaje": self.mensaje, "duracion": self.duracion
+        }
+
+
+class GestorTrabajos:
+    """Pool de hilos para trabajos largos, con registro acotado de los terminados."""
+
+    def __init__(self, hilos=2, capacidad=64, vida=VIDA_TRABAJOS):
+        self.capacidad = capacidad
+        self.vida = vida
+        self._pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="trabajo")
+        self._trabajos = OrderedDict()
+        self._contador = itertools.count(1)
+        self._candado = threading.Lock()
+        atexit.register(self._borrar_todo)
+
+    def enviar(self, nombre, tipo, funcion, *args, **kwargs):
+        """Encola ``funcion(trabajo, *args, **kwargs)`` y devuelve el id del trabajo."""
+        with self._candado:
+            trabajo = Trabajo(f"{tipo}-{next(self._contador)}", nombre, tipo)
+            self._trabajos[trabajo.id] = trabajo
+            sobrantes = self._descartar_terminados()
+        for sobrante in sobrantes:
+            sobrante._borrar_archivos()
+        self._pool.submit(self._ejecutar, trabajo, funcion, args, kwargs)
+        return trabajo.id
+
+    def _ejecutar(self, trabajo, funcion, args, kwargs):
+        if trabajo._cancelar.is_set():
+            trabajo.estado, trabajo.fin = CANCELADO, time.time()
+            return
+        trabajo.estado, trabajo.inicio = EN_CURSO, time.time()
+        try:
+            trabajo.resultado = funcion(trabajo, *args, **kwargs)
+            trabajo.progreso, trabajo.estado = 1.0, TERMINADO
+        except TrabajoCancelado:
+            trabajo.estado = CANCELADO
+        except Exception as e:
+            trabajo.error, trabajo.estado = str(e), FALLIDO
+        finally:
+            trabajo.fin = time.time()
+            # Salidas a medias (cancelado, fallido) o de un trabajo que ya nadie puede consultar
+            if trabajo.estado != TERMINADO or trabajo._descartado:
+                trabajo._borrar_archivos()
+
+    def _descartar_terminados(self):
+        """Saca del registro los terminados vencidos y, si aún sobran, los consultados hace más tiempo.
+
+        Se llama con el candado tomado y devuelve los que salieron, para borrar sus
+        archivos fuera del candado. Sin la referencia del registro, el resultado se
+        libera en cuanto ninguna sesión lo tiene.
+        """
+        limite = time.time() - self.vida
+        terminados = sorted((t for t in self._trabajos.values() if t.terminado), key=lambda t: t.consultado)
+        vencidos = [t for t in terminados if t.consultado < limite]
+        sobrantes = max(len(self._trabajos) - len(vencidos) - self.capacidad, 0)
+        salen = vencidos + terminados[len(vencidos):len(vencidos) + sobrantes]
+        for trabajo in salen:
+            del self._trabajos[trabajo.id]
+        return salen
+
+    def obtener(self, id_trabajo):
+        """El trabajo (None si no existe o ya salió del registro); consultarlo lo mantiene vivo."""
+        with self._candado:
+            sobrantes = self._descartar_terminados()
+            trabajo = self._trabajos.get(id_trabajo)
+            if trabajo is not None:
+                trabajo.consultado = time.time()
+        for sobrante in sobrantes:
+            sobrante._borrar_archivos()
+        return trabajo
+
+    def estado(self, id_trabajo):
+        trabajo = self.obtener(id_trabajo)
+        return None if trabajo is None else trabajo.resumen()
+
+    def cancelar(self, id_trabajo):
+        trabajo = self.obtener(id_trabajo)
+        if trabajo is not None and not trabajo.terminado:
+            trabajo._cancelar.set()
+
+    def descartar(self, id_trabajo):
+        """Cancela el trabajo si sigue en curso, lo quita del registro y borra sus archivos."""
+        with self._candado:
+            trabajo = self._trabajos.pop(id_trabajo, None)
+        if trabajo is None:
+            return
+        trabajo._descartado = True
+        trabajo._cancelar.set()
+        # Si aún corre, sus archivos se borran cuando termine (ver _ejecutar)
+        if trabajo.terminado:
+            trabajo._borrar_archivos()
+
+    def _borrar_todo(self):
+        with self._candado:
+            trabajos = list(self._trabajos.values())
+        for trabajo in trabajos:
+            trabajo._borrar_archivos()
+
+    def listar(self):
+        with self._candado:
+            return [t.resumen() for t in self._trabajos.values()]
@@ -0,0 +1,127 @@
+"""Diagnóstico de los modelos sectoriales ROA/ROE: validación cruzada y bootstrap.
+
+Cada réplica bootstrap es un ajuste por mínimos cuadrados ponderado por el
+número de veces que se remuestreó cada fila, así que un bloque de réplicas se
+resuelve con dos productos matriciales y un ``np.linalg.solve`` por lotes. Los
+bloques se reparten en un pool de hilos con semillas derivadas de ``semilla``:
+el resultado no depende del número de hilos.
+"""
+import numpy as np
+import pandas as pd
+
+from nucleo import COEFICIENTES_SECTOR, datos_estimacion
+
+OBJETIVOS = ["ROA", "ROE"]
+PARAMETROS = ["intercepto", "b_ICE", "b_CEE"]
+ELEMENTOS_POR_BLOQUE = 4_000_000
+
+
+def _diseno(X):
+    return np.column_stack([np.ones(len(X)), X])
+
+
+def _ajustar(Xa, Y):
+    """Coeficientes (3, 2) de ROA y ROE por mínimos cuadrados."""
+    return np.linalg.lstsq(Xa, Y, rcond=None)[0]
+
+
+def _bloque_bootstrap(semilla, replicas, Xa, Y):
+    rng = np.random.default_rng(semilla)
+    n = len(Xa)
+    indices = rng.integers(0, n, (replicas, n)) + (np.arange(replicas) * n)[:, np.newaxis]
+    pesos = np.bincount(indices.ravel(), minlength=replicas * n).reshape(replicas, n).astype(float)
+    # X'WX y X'WY de todas las réplicas a la vez
+    xtx = (pesos @ (Xa[:, :, np.newaxis] * Xa[:, np.newaxis, :]).reshape(n, -1)).reshape(replicas, 3, 3)
+    xty = (pesos @ (Xa[:, :, np.newaxis] * Y[:, np.newaxis, :]).reshape(n, -1)).reshape(replicas, 3, 2)
+    with np.errstate(all="ignore"):
+        try:
+            return np.linalg.solve(xtx, xty)
+        except np.linalg.LinAlgError:
+            # Alguna réplica singular (p. ej. un solo valor distinto): se resuelven una a una
+            return np.stack([np.linalg.lstsq(a, b, rcond=None)[0] for a, b in zip(xtx, xty)])
+
+
+def _validacion_cruzada(semilla, pliegues, Xa, Y):
+    """R² fuera de muestra (agregado y por pliegue) de ROA y ROE."""
+    rng = np.random.default_rng(semilla)
+    asignacion = rng.permutation(len(Xa)) % pliegues
+    prediccion = np.empty_like(Y)
+    r2_pliegues = []
+    for k in range(pliegues):
+        prueba = asignacion == k
+        coef = _ajustar(Xa[~prueba], Y[~prueba])
+        prediccion[prueba] = Xa[prueba] @ coef
+        residuo = ((Y[prueba] - prediccion[prueba]) ** 2).sum(axis=0)
+        total = ((Y[prueba] - Y[~prueba].mean(axis=0)) ** 2).sum(axis=0)
+        r2_pliegues.append(1.0 - residuo / total)
+    residuo = ((Y - prediccion) ** 2).sum(axis=0)
+    total = ((Y - Y.mean(axis=0)) ** 2).sum(axis=0)
+    return 1.0 - residuo / total, np.array(r2_pliegues)
+
+
+def diagnosticar_modelos(df, replicas=2000, pliegues=5, semilla=0, nivel=0.95, hilos=None):
+    """Intervalos bootstrap de los coeficientes y R² fuera de muestra por sector.
+
+    Devuelve (intervalos, validacion). ``intervalos`` tiene una fila por sector,
+    objetivo y parámetro con la estimación, su error estándar bootstrap, el
+    intervalo percentil al ``nivel`` pedido y el coeficiente original del sector
+    (si existe). ``validacion`` tiene n, R² en muestra y R² de la validación
+    cruzada con ``pliegues`` pliegues (agregado y media/desviación por pliegue).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import os
+
+    X, Y, sectores, validas = datos_estimacion(df)
+    grupos = {}
+    for sector in pd.unique(sectores[validas]):
+        mascara = validas & (sectores == sector)
+        if mascara.sum() >= max(pliegues, 4):
+            grupos[sector] = (_diseno(X[mascara]), Y[mascara])
+    if not grupos:
+        return pd.DataFrame(), pd.DataFrame()
+
+    # Tareas de tamaño fijo (no dependen de ``hilos``), cada una con su propia semilla
+    tareas = []
+    semillas = np.random.SeedSequence(semilla).spawn(len(grupos))
+    for (sector, (Xa, Y_s)), semilla_sector in zip(grupos.items(), semillas):
+        por_bloque = max(1, min(replicas, ELEMENTOS_POR_BLOQUE // len(Xa)))
+        tamanos = [por_bloque] * (replicas // por_bloque) + ([replicas % por_bloque] if replicas % por_bloque else [])
+        semilla_cv, *semillas_bloques = semilla_sector.spawn(len(tamanos) + 1)
+        tareas.append((sector, "cv", semilla_cv, pliegues))
+        tareas += [(sector, "bootstrap", s, r) for s, r in zip(semillas_bloques, tamanos)]
+
+    def ejecutar(tarea):
+        sector, tipo, semilla_tarea, parametro = tarea
+        Xa, Y_s = grupos[sector]
+        if tipo == "cv":
+            return _validacion_cruzada(semilla_tarea, parametro, Xa, Y_s)
+        return _bloque_bootstrap(semilla_tarea, parametro, Xa, Y_s)
+
+    with ThreadPoolExecutor(max_workers=hilos or os.cpu_count() or 1) as pool:
+        salidas = list(pool.map(ejecutar, tareas))
+
+    cola = (1.0 - nivel) / 2 * 100
+    intervalos, validacion = [], []
+    for sector, (Xa, Y_s) in grupos.items():
+        propias = [s for t, s in zip(tareas, salidas) if t[0] == sector]
+        (r2_cv, r2_pliegues), replicas_sector = propias[0], np.concatenate(propias[1:])
+        estimacion = _ajustar(Xa, Y_s)
+        r2_muestra = 1.0 - ((Y_s - Xa @ estimacion) ** 2).sum(axis=0) / ((Y_s - Y_s.mean(axis=0)) ** 2).sum(axis=0)
+        limites = np.nanpercentile(replicas_sector, [cola, 100 - cola], axis=0)
+        errores = np.nanstd(replicas_sector, axis=0, ddof=1)
+        for j, objetivo in enumerate(OBJETIVOS):
+            validacion.append({
+                "sector": sector, "objetivo": objetivo, "n": len(Xa), "R2": r2_muestra[j], "R2_cv": r2_cv[j],
+                "R2_cv_media": r2_pliegues[:, j].mean(), "R2_cv_desv": r2_pliegues[:, j].std(ddof=1)
+            })
+            originales = COEFICIENTES_SECTOR.get(sector, {}).get(objetivo, (np.nan,) * 3)
+            for i, parametro in enumerate(PARAMETROS):
+                intervalos.append({
+                    "sector": sector, "objetivo": objetivo, "parametro": parametro,
+                    "estimacion": estimacion[i, j], "error_estandar": errores[i, j],
+                    "limite_inferior": limites[0, i, j], "limite_superior": limites[1, i, j],
+                    "original": originales[i],
+                    "original_en_intervalo": (bool(limites[0, i, j] <= originales[i] <= limites[1, i, j])
+                                              if np.isfinite(originales[i]) else None)
+                })
+    return pd.DataFrame(intervalos), pd.DataFrame(validacion)